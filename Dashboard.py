@@ -4,10 +4,68 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import uuid
+import os
+import time
+from functools import wraps
+from wqcore.analytics import correlation_matrix, descriptive_stats, kde_trend
+from wqcore.data import (PHIVOLCS_EXCLUDED_COLUMNS, PHIVOLCS_FILE, WATER_QUALITY_FILE, filter_data,
+                         numeric_parameters, read_dataset)
+from wqcore.metrics import MetricsRegistry, start_exporters
+from wqcore.profiling import Profiler
+from wqcore.wqi import observed_wqi
 
 # ==== PAGE CONFIG ====
 st.set_page_config(page_title="Water Quality Dashboard", page_icon="📊", layout="wide")
 
+
+# ==== PROFILING ====
+# Section timings shared by all sessions; disabled (near-zero cost) unless WQ_PROFILE is set
+@st.cache_resource
+def shared_profiler():
+    return Profiler()
+
+
+profiler = shared_profiler()
+profiler.new_run()
+rerun_start = time.perf_counter()
+
+
+# ==== METRICS ====
+# Prometheus metrics of this process, exported as configured by WQ_METRICS_PORT / WQ_METRICS_FILE
+SESSION_TIMEOUT = 15 * 60
+
+
+@st.cache_resource
+def shared_metrics():
+    registry = MetricsRegistry()
+    start_exporters(registry)
+    return registry, {}
+
+
+def active_sessions():
+    now = time.time()
+    for session_id, seen in list(session_last_seen.items()):
+        if now - seen > SESSION_TIMEOUT:
+            session_last_seen.pop(session_id, None)
+    return len(session_last_seen)
+
+
+metrics, session_last_seen = shared_metrics()
+session_last_seen[st.session_state.setdefault("session_id", uuid.uuid4().hex)] = time.time()
+metrics.gauge("wq_active_sessions", f"Sessions with a rerun in the last {SESSION_TIMEOUT // 60} minutes",
+              function=active_sessions)
+rerun_seconds = metrics.histogram("wq_rerun_seconds", "Latency of full script reruns")
+render_seconds = metrics.histogram("wq_render_seconds", "Render latency of the current view of a tab", ("tab", "view"))
+load_data_calls = metrics.counter("wq_load_data_calls", "load_data calls, including cache hits")
+load_data_loads = metrics.counter("wq_load_data_loads", "load_data cache misses that read the parquet files")
+
+
+def plotly_chart(fig, **kwargs):
+    # st.plotly_chart serializes the figure, so it is timed apart from the code that built it
+    profiler.lap("figure")
+    with profiler.section("plotly_chart"):
+        return st.plotly_chart(fig, **kwargs)
+
 # ==== LOAD FONT ====
 font_base64 = None
 try:
@@ -26,19 +84,23 @@ except FileNotFoundError:
 
 
 # ==== LOAD DATA ====
+# Files are read from datasets/, or the copy WQ_DATA_DIR points at, e.g. one from benchmarks.generate_dataset
+
+
 @st.cache_data
 def load_data():
+    load_data_loads.inc()
     bfar_df = pd.DataFrame()
     philvolcs_df = pd.DataFrame()
     try:
-        bfar_df = pd.read_parquet('datasets/cleaned_dataset.parquet', engine='pyarrow')
+        bfar_df = read_dataset(WATER_QUALITY_FILE)
     except FileNotFoundError:
         st.error("cleaned_dataset.parquet not found.")
     except Exception as e:
         st.error(f"Error loading cleaned_dataset.parquet: {e}")
 
     try:
-        philvolcs_df = pd.read_parquet('datasets/PHIVOLCS.parquet', engine='pyarrow')
+        philvolcs_df = read_dataset(PHIVOLCS_FILE)
     except FileNotFoundError:
         st.error("PHIVOLCS.parquet not found.")
     except Exception as e:
@@ -47,7 +109,9 @@ def load_data():
     return bfar_df, philvolcs_df
 
 
-bfar_df, philvolcs_df = load_data()
+with profiler.section("load_data"):
+    bfar_df, philvolcs_df = load_data()
+load_data_calls.inc()
 
 # ==== LOAD TAAL INFO ====
 taal_info = ""
@@ -229,46 +293,11 @@ with tab3:
     if 'visualization' not in st.session_state:
         st.session_state.visualization = "Correlation Matrix"
 
-    # Function to calculate WQI for raw data
+    # Function to calculate WQI for raw data (see wqcore/wqi.py)
+    @profiler.timed()
     def calculate_wqi(values_dict, params):
         try:
-            normalized = []
-            for param in params:
-                values = values_dict[param]
-                # Remove NaN values for normalization
-                valid_values = values[~np.isnan(values)]
-                if len(valid_values) == 0:
-                    normalized.append(np.full_like(values, np.nan))
-                    continue
-                # Min-max normalization to [0, 1]
-                min_val = valid_values.min()
-                max_val = valid_values.max()
-                if max_val == min_val:
-                    normalized_values = np.zeros_like(values)
-                else:
-                    normalized_values = (values - min_val) / (max_val - min_val)
-                # Replace NaN values with 0 for WQI calculation
-                normalized_values = np.nan_to_num(normalized_values, nan=0.0)
-                normalized.append(normalized_values)
-            normalized = np.array(normalized)
-            # Calculate WQI as mean of normalized values, scaled to 0-100
-            wqi = np.mean(normalized, axis=0, where=~np.isnan(normalized)) * 100
-            wqi = np.clip(wqi, 0, 100)  # Ensure [0, 100]
-            remarks = []
-            for val in wqi:
-                if np.isnan(val):
-                    remarks.append("N/A")
-                elif val <= 20:
-                    remarks.append("Poor")
-                elif val <= 40:
-                    remarks.append("Fair")
-                elif val <= 60:
-                    remarks.append("Good")
-                elif val <= 80:
-                    remarks.append("Very Good")
-                else:
-                    remarks.append("Excellent")
-            return wqi, remarks
+            return observed_wqi(values_dict, params)
         except Exception as e:
             st.error(f"Error calculating WQI: {str(e)}")
             return np.zeros(len(values_dict[params[0]])), ["N/A"] * len(values_dict[params[0]])
@@ -346,14 +375,13 @@ with tab3:
             )
         visualization = st.session_state.visualization
 
+    visualization_timer = profiler.begin(f"visualization/{visualization}")
+    visualization_start = time.perf_counter()
     with colB:
         if visualization == "Correlation Matrix":
             if not bfar_df.empty:
                 available_sites = sorted(bfar_df['Site'].astype(str).unique())
-                numeric_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                         if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                        'Wind Direction']
-                                         and bfar_df[col].notna().any()])
+                numeric_params = numeric_parameters(bfar_df)
                 col1, col2 = st.columns([5, 2])
                 with col2:
                     st.markdown(
@@ -378,25 +406,18 @@ with tab3:
                                              key="heatmap_end_date")
                 with col1:
                     try:
-                        filtered_df = bfar_df.copy()
-                        if selected_site != 'All Sites':
-                            filtered_df = filtered_df[filtered_df['Site'] == selected_site]
-                        if start_date:
-                            start_date = pd.to_datetime(start_date)
-                            filtered_df = filtered_df[filtered_df['Date'] >= start_date]
-                        if end_date:
-                            end_date = pd.to_datetime(end_date)
-                            filtered_df = filtered_df[filtered_df['Date'] <= end_date]
+                        profiler.lap("controls")
+                        filtered_df = filter_data(bfar_df, selected_site, start_date, end_date)
                         if start_date and end_date and start_date > end_date:
                             st.error("Error: Start date cannot be after end date.")
                         elif len(selected_params) < 2:
                             st.info("Please select at least two parameters for the correlation heatmap.")
                         else:
-                            corr_df = filtered_df[selected_params].dropna()
-                            if len(corr_df) < 2:
+                            corr_matrix = correlation_matrix(filtered_df, selected_params)
+                            profiler.lap("filter")
+                            if corr_matrix is None:
                                 st.warning("Not enough data points after filtering to calculate correlation.")
                             else:
-                                corr_matrix = corr_df.corr().round(2)
                                 if not corr_matrix.empty:
                                     fig_heatmap = px.imshow(
                                         corr_matrix,
@@ -425,7 +446,7 @@ with tab3:
                                     )
                                     fig_heatmap.update_xaxes(tickangle=45)
                                     fig_heatmap.update_yaxes(tickangle=0)
-                                    st.plotly_chart(fig_heatmap, use_container_width=True)
+                                    plotly_chart(fig_heatmap, use_container_width=True)
                                 else:
                                     st.warning("No correlation data to display.")
                     except Exception as e:
@@ -434,10 +455,7 @@ with tab3:
                 st.error("Water Quality data not loaded. Cannot display heatmap.")
         elif visualization == "Scatter Plots":
             if not bfar_df.empty:
-                numeric_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                         if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                        'Wind Direction']
-                                         and bfar_df[col].notna().any()])
+                numeric_params = numeric_parameters(bfar_df)
                 if len(numeric_params) < 2:
                     st.warning("At least two numeric parameters are required for scatter plots.")
                 else:
@@ -462,22 +480,13 @@ with tab3:
 
                     with col1:
                         try:
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
-                            if start_date and end_date:
-                                start_date = pd.to_datetime(start_date)
-                                end_date = pd.to_datetime(end_date)
-                                if start_date > end_date:
-                                    st.error("Error: Start date cannot be after end date.")
-                                    st.stop()
-                                filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                          (filtered_df['Date'] <= end_date)]
-                            elif start_date:
-                                filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                            elif end_date:
-                                filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                            profiler.lap("controls")
+                            if start_date and end_date and start_date > end_date:
+                                st.error("Error: Start date cannot be after end date.")
+                                st.stop()
+                            filtered_df = filter_data(bfar_df, selected_site, start_date, end_date)
                             filtered_df = filtered_df.dropna(subset=[x_axis, y_axis])
+                            profiler.lap("filter")
                             if filtered_df.empty:
                                 st.warning("No data available for the selected parameters and filters.")
                                 st.stop()
@@ -519,7 +528,7 @@ with tab3:
                                 margin=dict(l=20, r=20, t=60, b=20),
                                 font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                             )
-                            st.plotly_chart(fig_scatter, use_container_width=True)
+                            plotly_chart(fig_scatter, use_container_width=True)
                         except Exception as e:
                             st.error(f"Error generating scatter plot: {str(e)}")
                             st.stop()
@@ -529,13 +538,8 @@ with tab3:
 
         elif visualization == "Distributions":
             if not bfar_df.empty or not philvolcs_df.empty:
-                bfar_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                      if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                     'Wind Direction']
-                                      and bfar_df[col].notna().any()])
-                philvolcs_params = sorted([col for col in philvolcs_df.select_dtypes(include=np.number).columns
-                                           if col not in ['Year', 'Month', 'Day', 'Latitude', 'Longitude']
-                                           and philvolcs_df[col].notna().any()])
+                bfar_params = numeric_parameters(bfar_df)
+                philvolcs_params = numeric_parameters(philvolcs_df, PHIVOLCS_EXCLUDED_COLUMNS)
                 param_options = ([f"{param} (Water Quality)" for param in bfar_params] +
                                  [f"{param} (PHIVOLCS)" for param in philvolcs_params])
                 if not param_options:
@@ -564,29 +568,21 @@ with tab3:
                                                  key="dist_end_date")
                     with col1:
                         param_name = selected_param.split(" (")[0]
+                        profiler.lap("controls")
                         dataset = selected_param.split(" (")[1].rstrip(")")
                         if dataset == "Water Quality" and not bfar_df.empty:
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
+                            filtered_df = filter_data(bfar_df, selected_site)
                         elif dataset == "PHIVOLCS" and not philvolcs_df.empty:
-                            filtered_df = philvolcs_df.copy()
+                            filtered_df = philvolcs_df
                         else:
                             filtered_df = pd.DataFrame()
                         if not filtered_df.empty:
-                            if start_date and end_date:
-                                start_date = pd.to_datetime(start_date)
-                                end_date = pd.to_datetime(end_date)
-                                if start_date > end_date:
-                                    st.error("Error: Start date cannot be after end date.")
-                                else:
-                                    filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                              (filtered_df['Date'] <= end_date)]
-                            elif start_date:
-                                filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                            elif end_date:
-                                filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                            if start_date and end_date and start_date > end_date:
+                                st.error("Error: Start date cannot be after end date.")
+                            else:
+                                filtered_df = filter_data(filtered_df, start_date=start_date, end_date=end_date)
                             data = filtered_df[param_name].dropna()
+                            profiler.lap("filter")
                             title = f"Distribution of {param_name} ({dataset}) in {selected_site}"
                             if not data.empty:
                                 fig_hist = px.histogram(data, x=param_name, nbins=30, title=title,
@@ -594,13 +590,9 @@ with tab3:
                                 fig_hist.update_traces(opacity=0.75)
                                 if show_trend_line:
                                     try:
-                                        from scipy.stats import gaussian_kde
-                                        import numpy as np
-
-                                        if len(data) >= 2 and data.nunique() > 1:
-                                            kde = gaussian_kde(data)
-                                            x_range = np.linspace(data.min(), data.max(), 100)
-                                            kde_vals = kde(x_range)
+                                        trend = kde_trend(data)
+                                        if trend is not None:
+                                            x_range, kde_vals = trend
                                             hist_height = data.size
                                             kde_vals_scaled = kde_vals * hist_height * (data.max() - data.min()) / 30
                                             fig_hist.add_scatter(
@@ -632,20 +624,15 @@ with tab3:
                                     yaxis_title="Count",
                                     font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                 )
-                                st.plotly_chart(fig_hist, use_container_width=True)
+                                plotly_chart(fig_hist, use_container_width=True)
                             else:
                                 st.warning(f"No data available for {selected_param} after applying filters.")
                         else:
                             st.warning(f"No data available for {selected_param}.")
         elif visualization == "Histogram":
             if not bfar_df.empty or not philvolcs_df.empty:
-                bfar_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                      if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                     'Wind Direction']
-                                      and bfar_df[col].notna().any()])
-                philvolcs_params = sorted([col for col in philvolcs_df.select_dtypes(include=np.number).columns
-                                           if col not in ['Year', 'Month', 'Day', 'Latitude', 'Longitude']
-                                           and philvolcs_df[col].notna().any()])
+                bfar_params = numeric_parameters(bfar_df)
+                philvolcs_params = numeric_parameters(philvolcs_df, PHIVOLCS_EXCLUDED_COLUMNS)
                 param_options = ([f"{param} (Water Quality)" for param in bfar_params] +
                                  [f"{param} (PHIVOLCS)" for param in philvolcs_params])
                 if not param_options:
@@ -673,29 +660,21 @@ with tab3:
                                                  key="hist_end_date")
                     with col1:
                         param_name = selected_param.split(" (")[0]
+                        profiler.lap("controls")
                         dataset = selected_param.split(" (")[1].rstrip(")")
                         if dataset == "Water Quality" and not bfar_df.empty:
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
+                            filtered_df = filter_data(bfar_df, selected_site)
                         elif dataset == "PHIVOLCS" and not philvolcs_df.empty:
-                            filtered_df = philvolcs_df.copy()
+                            filtered_df = philvolcs_df
                         else:
                             filtered_df = pd.DataFrame()
                         if not filtered_df.empty:
-                            if start_date and end_date:
-                                start_date = pd.to_datetime(start_date)
-                                end_date = pd.to_datetime(end_date)
-                                if start_date > end_date:
-                                    st.error("Error: Start date cannot be after end date.")
-                                else:
-                                    filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                              (filtered_df['Date'] <= end_date)]
-                            elif start_date:
-                                filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                            elif end_date:
-                                filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                            if start_date and end_date and start_date > end_date:
+                                st.error("Error: Start date cannot be after end date.")
+                            else:
+                                filtered_df = filter_data(filtered_df, start_date=start_date, end_date=end_date)
                             data = filtered_df[param_name].dropna()
+                            profiler.lap("filter")
                             title = f"Histogram of {param_name} ({dataset}) in {selected_site}"
                             if not data.empty:
                                 fig_hist = px.histogram(data, x=param_name, nbins=30, title=title,
@@ -716,7 +695,7 @@ with tab3:
                                     yaxis_title="Count",
                                     font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                 )
-                                st.plotly_chart(fig_hist, use_container_width=True)
+                                plotly_chart(fig_hist, use_container_width=True)
                             else:
                                 st.warning(f"No data available for {selected_param} after applying filters.")
                         else:
@@ -724,13 +703,8 @@ with tab3:
 
         elif visualization == "Box Plot":
             if not bfar_df.empty or not philvolcs_df.empty:
-                bfar_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                      if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                     'Wind Direction']
-                                      and bfar_df[col].notna().any()])
-                philvolcs_params = sorted([col for col in philvolcs_df.select_dtypes(include=np.number).columns
-                                           if col not in ['Year', 'Month', 'Day', 'Latitude', 'Longitude']
-                                           and philvolcs_df[col].notna().any()])
+                bfar_params = numeric_parameters(bfar_df)
+                philvolcs_params = numeric_parameters(philvolcs_df, PHIVOLCS_EXCLUDED_COLUMNS)
                 param_options = ([f"{param} (Water Quality)" for param in bfar_params] +
                                  [f"{param} (PHIVOLCS)" for param in philvolcs_params])
                 if not param_options:
@@ -758,29 +732,21 @@ with tab3:
                                                  key="box_end_date")
                     with col1:
                         param_name = selected_param.split(" (")[0]
+                        profiler.lap("controls")
                         dataset = selected_param.split(" (")[1].rstrip(")")
                         if dataset == "Water Quality" and not bfar_df.empty:
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
+                            filtered_df = filter_data(bfar_df, selected_site)
                         elif dataset == "PHIVOLCS" and not philvolcs_df.empty:
-                            filtered_df = philvolcs_df.copy()
+                            filtered_df = philvolcs_df
                         else:
                             filtered_df = pd.DataFrame()
                         if not filtered_df.empty:
-                            if start_date and end_date:
-                                start_date = pd.to_datetime(start_date)
-                                end_date = pd.to_datetime(end_date)
-                                if start_date > end_date:
-                                    st.error("Error: Start date cannot be after end date.")
-                                else:
-                                    filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                              (filtered_df['Date'] <= end_date)]
-                            elif start_date:
-                                filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                            elif end_date:
-                                filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                            if start_date and end_date and start_date > end_date:
+                                st.error("Error: Start date cannot be after end date.")
+                            else:
+                                filtered_df = filter_data(filtered_df, start_date=start_date, end_date=end_date)
                             data = filtered_df[[param_name]].dropna(subset=[param_name])
+                            profiler.lap("filter")
                             title = f"Box Plot of {param_name} ({dataset}) in {selected_site}"
                             if not data.empty:
                                 fig_box = px.box(data, x=param_name, title=title,
@@ -811,20 +777,15 @@ with tab3:
                                     yaxis_title="",
                                     font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                 )
-                                st.plotly_chart(fig_box, use_container_width=True)
+                                plotly_chart(fig_box, use_container_width=True)
                             else:
                                 st.warning(f"No data available for {selected_param} after applying filters.")
                         else:
                             st.warning(f"No data available for {selected_param}.")
         elif visualization == "Line Chart":
             if not bfar_df.empty or not philvolcs_df.empty:
-                bfar_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                      if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                     'Wind Direction']
-                                      and bfar_df[col].notna().any()])
-                philvolcs_params = sorted([col for col in philvolcs_df.select_dtypes(include=np.number).columns
-                                           if col not in ['Year', 'Month', 'Day', 'Latitude', 'Longitude']
-                                           and philvolcs_df[col].notna().any()])
+                bfar_params = numeric_parameters(bfar_df)
+                philvolcs_params = numeric_parameters(philvolcs_df, PHIVOLCS_EXCLUDED_COLUMNS)
                 param_options = ([f"{param} (Water Quality)" for param in bfar_params] +
                                  [f"{param} (PHIVOLCS)" for param in philvolcs_params])
                 if not param_options:
@@ -878,29 +839,22 @@ with tab3:
                                     st.error(
                                         "Please select parameters from the same dataset (either Water Quality or PHIVOLCS).")
                                 else:
+                                    profiler.lap("controls")
                                     dataset = datasets[0]
                                     if dataset == "Water Quality" and not bfar_df.empty:
-                                        filtered_df = bfar_df.copy()
-                                        if selected_site != 'All Sites':
-                                            filtered_df = filtered_df[filtered_df['Site'] == selected_site]
+                                        filtered_df = filter_data(bfar_df, selected_site)
                                     elif dataset == "PHIVOLCS" and not philvolcs_df.empty:
-                                        filtered_df = philvolcs_df.copy()
+                                        filtered_df = philvolcs_df
                                     else:
                                         filtered_df = pd.DataFrame()
                                     if not filtered_df.empty:
-                                        if start_date and end_date:
-                                            start_date = pd.to_datetime(start_date)
-                                            end_date = pd.to_datetime(end_date)
-                                            if start_date > end_date:
-                                                st.error("Error: Start date cannot be after end date.")
-                                            else:
-                                                filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                                          (filtered_df['Date'] <= end_date)]
-                                        elif start_date:
-                                            filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                                        elif end_date:
-                                            filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                                        if start_date and end_date and start_date > end_date:
+                                            st.error("Error: Start date cannot be after end date.")
+                                        else:
+                                            filtered_df = filter_data(filtered_df, start_date=start_date,
+                                                                      end_date=end_date)
                                         data = filtered_df[['Date'] + param_names].dropna(subset=param_names)
+                                        profiler.lap("filter")
                                         data = data.sort_values('Date')
                                         if not data.empty:
                                             melted_data = data.melt(id_vars=['Date'], value_vars=param_names,
@@ -924,7 +878,7 @@ with tab3:
                                                 yaxis_title="Value",
                                                 font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                             )
-                                            st.plotly_chart(fig_line, use_container_width=True)
+                                            plotly_chart(fig_line, use_container_width=True)
                                         else:
                                             st.warning(
                                                 f"No data available for the selected parameters after applying filters.")
@@ -940,21 +894,14 @@ with tab3:
                                     if dataset != "Water Quality":
                                         st.error("Site comparison is only available for Water Quality data.")
                                     else:
-                                        filtered_df = bfar_df.copy()
-                                        filtered_df = filtered_df[filtered_df['Site'].isin(selected_sites)]
-                                        if start_date and end_date:
-                                            start_date = pd.to_datetime(start_date)
-                                            end_date = pd.to_datetime(end_date)
-                                            if start_date > end_date:
-                                                st.error("Error: Start date cannot be after end date.")
-                                            else:
-                                                filtered_df = filtered_df[(filtered_df['Date'] >= start_date) &
-                                                                          (filtered_df['Date'] <= end_date)]
-                                        elif start_date:
-                                            filtered_df = filtered_df[filtered_df['Date'] >= pd.to_datetime(start_date)]
-                                        elif end_date:
-                                            filtered_df = filtered_df[filtered_df['Date'] <= pd.to_datetime(end_date)]
+                                        profiler.lap("controls")
+                                        if start_date and end_date and start_date > end_date:
+                                            st.error("Error: Start date cannot be after end date.")
+                                            start_date = end_date = None
+                                        filtered_df = filter_data(bfar_df, start_date=start_date, end_date=end_date,
+                                                                  sites=selected_sites)
                                         data = filtered_df[['Date', 'Site', param_name]].dropna(subset=[param_name])
+                                        profiler.lap("filter")
                                         data = data.sort_values('Date')
                                         if not data.empty:
                                             title = f"Line Chart of {param_name} Across Sites (Water Quality)"
@@ -976,7 +923,7 @@ with tab3:
                                                 yaxis_title=param_name,
                                                 font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                             )
-                                            st.plotly_chart(fig_line, use_container_width=True)
+                                            plotly_chart(fig_line, use_container_width=True)
                                         else:
                                             st.warning(
                                                 f"No data available for {param_name} at the selected sites after applying filters.")
@@ -985,10 +932,7 @@ with tab3:
 
         elif visualization == "WQI Over Time":
             if not bfar_df.empty:
-                numeric_params = sorted([col for col in bfar_df.select_dtypes(include=np.number).columns
-                                        if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition',
-                                                       'Wind Direction']
-                                        and bfar_df[col].notna().any()])
+                numeric_params = numeric_parameters(bfar_df)
                 if not numeric_params:
                     st.warning("No numeric parameters available for WQI calculation.")
                 else:
@@ -1015,21 +959,15 @@ with tab3:
                                                  max_value=max_date, key="wqi_end_date")
                     with col1:
                         try:
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
-                            if start_date:
-                                start_date = pd.to_datetime(start_date)
-                                filtered_df = filtered_df[filtered_df['Date'] >= start_date]
-                            if end_date:
-                                end_date = pd.to_datetime(end_date)
-                                filtered_df = filtered_df[filtered_df['Date'] <= end_date]
+                            profiler.lap("controls")
+                            filtered_df = filter_data(bfar_df, selected_site, start_date, end_date)
                             if start_date and end_date and start_date > end_date:
                                 st.error("Error: Start date cannot be after end date.")
                             elif not selected_params:
                                 st.info("Please select at least one parameter for WQI calculation.")
                             else:
                                 filtered_df = filtered_df.sort_values('Date')
+                                profiler.lap("filter")
                                 values_dict = {param: filtered_df[param].values for param in selected_params}
                                 wqi, wqi_remarks = calculate_wqi(values_dict, selected_params)
                                 wqi_df = pd.DataFrame({
@@ -1060,7 +998,7 @@ with tab3:
                                         yaxis_title="Water Quality Index",
                                         font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                                     )
-                                    st.plotly_chart(fig_wqi, use_container_width=True)
+                                    plotly_chart(fig_wqi, use_container_width=True)
 
                         except Exception as e:
                             st.error(f"Error generating WQI plot: {str(e)}")
@@ -1073,54 +1011,76 @@ with tab3:
                     "<div class='custom-text-primary' style='margin-bottom: 8px; margin-top: 0px; "
                     "font-size: 20px; text-align: justify;'>Descriptive Analytics</div>",
                     unsafe_allow_html=True)
-                numeric_params = [col for col in bfar_df.select_dtypes(include=np.number).columns
-                                  if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition', 'Wind Direction']
-                                  and bfar_df[col].notna().any()]
+                numeric_params = numeric_parameters(bfar_df)
                 if numeric_params:
-                    stats_df = bfar_df[numeric_params].describe().T
-                    stats_df = stats_df[['count', 'mean', 'std', 'min', '25%', '50%', '75%', 'max']]
-                    stats_df = stats_df.rename(columns={
-                        'count': 'Count',
-                        'mean': 'Mean',
-                        'std': 'Std Dev',
-                        'min': 'Min',
-                        '25%': 'Q1',
-                        '50%': 'Median',
-                        '75%': 'Q3',
-                        'max': 'Max'
-                    })
-                    stats_df = stats_df.round(2)
+                    stats_df = descriptive_stats(bfar_df, numeric_params)
                     st.dataframe(stats_df, use_container_width=True)
                 else:
                     st.warning("No numeric parameters available for descriptive analytics.")
                 st.markdown("</div>", unsafe_allow_html=True)
             else:
                 st.error("Water Quality data not loaded. Cannot display analytics or overview.")
+    visualization_timer.end()
+    render_seconds.observe(time.perf_counter() - visualization_start, tab="Visualizations", view=visualization)
 # ==== Prediction ====
 import plotly.express as px
 import plotly.graph_objects as go
 import os
-import json
 import logging
+import time
 import uuid
-from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 from scipy.stats import linregress
-from tensorflow.keras.models import Sequential
-from tensorflow.keras.layers import Input, Conv1D, MaxPooling1D, Flatten, Dense, LSTM, Dropout, BatchNormalization, Bidirectional
-from tensorflow.keras.optimizers import Adam
 from tensorflow.keras.callbacks import Callback, EarlyStopping, ReduceLROnPlateau
+from wqcore.models import DEFAULT_HYPERPARAMETERS, MODEL_BUILDERS, build_model
+from wqcore import forecasting
+from wqcore.analytics import UNSCORED, compute_metrics
+from wqcore.backtest import classical_forecaster, model_forecaster, run_backtest
+from wqcore.cache import ResultCache, dataset_version
+from wqcore.classical import CLASSICAL_FORECASTERS, grid_season_length
+from wqcore.forecasting import build_forecast_table, classical_site_forecasts
+from wqcore.lifecycle import ModelManager
+from wqcore.logs import configure_logging
+from wqcore.pipeline import training_datasets
+from wqcore.registry import ModelRegistry, grid_registry_key
+from wqcore.resample import (FREQUENCIES, INTERPOLATION_METHODS, forecast_dates, horizon_steps, regular_grid,
+                             site_mean)
+from wqcore.results_store import TrainingResultsStore
+from wqcore.session_store import SessionStore, compact
+from wqcore.runtime import export_model
+from wqcore.tfconfig import configure_tensorflow
+from wqcore.training import warm_start_model
+from wqcore.tuning import successive_halving, window_arrays
+from wqcore.uncertainty import MC_SAMPLES, QUANTILES
+from wqcore.windowing import (prepare_multivariate_data, prepare_multivariate_prediction_data,
+                              prepare_parameter_batch_data, prepare_prediction_data, prepare_site_batch_data,
+                              prepare_univariate_data)
+from wqcore.wqi import forecast_wqi
 
 with tab4:
     set_active_tab("Prediction")
 
-    # Setup logging
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[logging.StreamHandler(), logging.FileHandler('dashboard.log')]
-    )
+    # Setup logging; records are written by a background thread (see wqcore/logs.py)
+    @st.cache_resource
+    def logging_listener():
+        return configure_logging(debug_loggers=(__name__, 'wqcore'))
+
+    logging_listener()
     logger = logging.getLogger(__name__)
 
+    training_seconds = metrics.histogram("wq_training_seconds", "Model training duration", ("model", "mode"))
+    forecast_seconds = metrics.histogram("wq_forecast_seconds", "Forecast inference latency by horizon in steps",
+                                         ("function", "horizon"))
+    prediction_cache_requests = metrics.counter("wq_prediction_cache_requests",
+                                                "Train and Predict requests by shared result cache outcome",
+                                                ("result",))
+
+    # Size TensorFlow's thread pools once per process, before the first training (see wqcore/tfconfig.py)
+    @st.cache_resource
+    def tensorflow_settings():
+        return configure_tensorflow()
+
+    tensorflow_settings()
+
     # Custom callback to track loss
     class LossHistory(Callback):
         def __init__(self):
@@ -1132,171 +1092,275 @@ with tab4:
             self.losses.append(logs.get('loss'))
             self.val_losses.append(logs.get('val_loss'))
 
-    # Preprocessing functions
-    def prepare_univariate_data(data, param, window_size=7, val_split=0.2):
-        try:
-            values = data[param].dropna().values.reshape(-1, 1)
-            if len(values) < window_size + 1:
-                logger.warning(f"Insufficient data for {param}: {len(values)} rows")
-                return None, None, None, None
-            logger.info(f"Pre-normalized {param}: {values[:5].flatten()}")
-            X, y = [], []
-            for i in range(len(values) - window_size):
-                X.append(values[i:i + window_size])
-                y.append(values[i + window_size])
-            X, y = np.array(X), np.array(y)
-            if len(X) < 2:
-                logger.warning(f"Not enough data points for {param}: {len(X)} samples")
-                return None, None, None, None
-            split_idx = int(len(X) * (1 - val_split))
-            X_train, X_val = X[:split_idx], X[split_idx:]
-            y_train, y_val = y[:split_idx], y[split_idx:]
-            logger.info(f"Univariate {param}: {len(X_train)} train, {len(X_val)} val samples")
-            return X_train, y_train, X_val, y_val
-        except Exception as e:
-            logger.error(f"Error preparing univariate data for {param}: {str(e)}")
-            return None, None, None, None
+    # Custom callback to bound training by wall-clock time, keeping the best weights seen so far
+    class TrainingTimeBudget(Callback):
+        def __init__(self, budget_seconds, monitor='val_loss'):
+            super().__init__()
+            self.budget_seconds = budget_seconds
+            self.monitor = monitor
+            self.budget_exhausted = False
 
-    def prepare_multivariate_data(data, params, window_size=7, val_split=0.2):
-        try:
-            values = data[params].dropna().values
-            if len(values) < window_size + 1:
-                logger.warning(f"Insufficient multivariate data: {len(values)} rows")
-                return None, None, None, None
-            logger.info(f"Pre-normalized multivariate: {values[:5]}")
-            X, y = [], []
-            for i in range(len(values) - window_size):
-                X.append(values[i:i + window_size])
-                y.append(values[i + window_size])
-            X, y = np.array(X), np.array(y)
-            if len(X) < 2:
-                logger.warning(f"Not enough multivariate data points: {len(X)} samples")
-                return None, None, None, None
-            split_idx = int(len(X) * (1 - val_split))
-            X_train, X_val = X[:split_idx], X[split_idx:]
-            y_train, y_val = y[:split_idx], y[split_idx:]
-            logger.info(f"Multivariate: {len(X_train)} train, {len(X_val)} val samples")
-            return X_train, y_train, X_val, y_val
-        except Exception as e:
-            logger.error(f"Error preparing multivariate data: {str(e)}")
-            return None, None, None, None
+        def on_train_begin(self, logs=None):
+            self.start_time = time.monotonic()
+            self.best = np.inf
+            self.best_weights = None
+            self.budget_exhausted = False
 
-    # Optimized model building
-    def build_cnn(input_shape):
+        def on_epoch_end(self, epoch, logs=None):
+            current = logs.get(self.monitor)
+            if current is not None and current < self.best:
+                self.best = current
+                self.best_weights = self.model.get_weights()
+            if not self.budget_seconds:
+                return
+            # Stop if another epoch of average length would overrun the budget
+            elapsed = time.monotonic() - self.start_time
+            if elapsed + elapsed / (epoch + 1) > self.budget_seconds:
+                self.budget_exhausted = True
+                self.model.stop_training = True
+                logger.info(f"Training time budget of {self.budget_seconds}s reached after {epoch + 1} epochs")
+
+        def on_train_end(self, logs=None):
+            if self.budget_exhausted and self.best_weights is not None:
+                self.model.set_weights(self.best_weights)
+
+    # Describe what ended a training run
+    def training_stop_reason(callbacks, epochs_run, max_epochs):
+        for callback in callbacks:
+            if isinstance(callback, TrainingTimeBudget) and callback.budget_exhausted:
+                return "Time budget reached"
+            if isinstance(callback, EarlyStopping) and callback.stopped_epoch > 0:
+                return "Converged (early stopping)"
+        return "Epoch limit reached" if epochs_run >= max_epochs else "Converged"
+
+    # Save loss curves and validation predictions to the columnar store; session state only keeps the run ID
+    training_store = TrainingResultsStore('training_results')
+
+    def save_training_results(history, actual, predicted, params, **metadata):
+        training_results = {'run_id': None, 'epochs': len(history.losses), 'params': list(params)}
         try:
-            model = Sequential([
-                Input(shape=input_shape),
-                Conv1D(filters=128, kernel_size=3, activation='relu', padding='same'),
-                BatchNormalization(),
-                Conv1D(filters=64, kernel_size=3, activation='relu', padding='same'),
-                MaxPooling1D(pool_size=2),
-                Flatten(),
-                Dense(100, activation='relu'),
-                Dropout(0.3),
-                Dense(1 if input_shape[-1] == 1 else input_shape[-1])
-            ])
-            model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
-            logger.info(f"Optimized CNN built: {input_shape}")
-            return model
+            training_results['run_id'] = training_store.append(history.losses, history.val_losses, actual, predicted,
+                                                               params, **metadata)
         except Exception as e:
-            logger.error(f"Error building CNN: {str(e)}")
-            return None
+            logger.error(f"Failed to save training results: {str(e)}")
+        return training_results
 
-    def build_lstm(input_shape):
-        try:
-            model = Sequential([
-                Input(shape=input_shape),
-                Bidirectional(LSTM(100, activation='relu', return_sequences=True)),
-                Dropout(0.3),
-                Bidirectional(LSTM(50, activation='relu')),
-                Dropout(0.3),
-                Dense(1 if input_shape[-1] == 1 else input_shape[-1])
-            ])
-            model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
-            logger.info(f"Optimized LSTM built: {input_shape}")
-            return model
-        except Exception as e:
-            logger.error(f"Error building LSTM: {str(e)}")
-            return None
+    @st.cache_data(max_entries=64)
+    def load_training_history(run_id):
+        return training_store.history(run_id).rename(columns={
+            "epoch": "Epoch", "loss": "Training Loss", "val_loss": "Validation Loss"})
 
-    def build_hybrid(input_shape):
-        try:
-            model = Sequential([
-                Input(shape=input_shape),
-                Conv1D(filters=128, kernel_size=3, activation='relu', padding='same'),
-                BatchNormalization(),
-                Conv1D(filters=64, kernel_size=3, activation='relu', padding='same'),
-                MaxPooling1D(pool_size=2),
-                Bidirectional(LSTM(100, activation='relu', return_sequences=False)),
-                Dropout(0.3),
-                Dense(1 if input_shape[-1] == 1 else input_shape[-1])
-            ])
-            model.compile(optimizer=Adam(learning_rate=0.001), loss='mse')
-            logger.info(f"Optimized Hybrid built: {input_shape}")
-            return model
-        except Exception as e:
-            logger.error(f"Error building Hybrid: {str(e)}")
-            return None
+    @st.cache_data(max_entries=64)
+    def load_validation_predictions(run_id, param):
+        return training_store.predictions(run_id, param)
 
-    # Save JSON results
-    def save_training_results(results, file_path):
+    # Export a TensorFlow-free copy of the model and use it for the autoregressive forecast loop
+    def export_runtime_model(model, file_path, sample):
         try:
-            with open(file_path, 'w') as f:
-                json.dump(results, f)
-            logger.info(f"Saved {file_path}")
+            return export_model(model, file_path, sample=sample)
         except Exception as e:
-            logger.error(f"Failed to save {file_path}: {str(e)}")
+            logger.error(f"Failed to export {file_path}, forecasting with Keras: {str(e)}")
+            return model
 
-    # Compute metrics
-    def compute_metrics(true, pred):
+    # Train a model, warm-starting from the last registered version when requested, and register it
+    model_registry = ModelRegistry('models')
+
+    def model_hyperparameters(model_key, site, params, frequency="D", registry_key=None):
+        if model_key not in DEFAULT_HYPERPARAMETERS:
+            return {}
+        registry_key = registry_key or grid_registry_key(model_key, frequency)
+        return {**DEFAULT_HYPERPARAMETERS[model_key],
+                **(model_registry.hyperparameters(registry_key, site, params) or {})}
+
+    # Epoch limit of full trainings; WQ_TRAINING_EPOCHS lowers it, e.g. for load tests
+    TRAINING_EPOCHS = int(os.environ.get("WQ_TRAINING_EPOCHS", 50))
+
+    # Registered models are loaded through the model manager's LRU, keyed by their file path
+    def load_registered(entry):
+        return model_manager.get(entry['path'], lambda: model_registry.load(entry))
+
+    def load_registered_runtime(entry):
+        return model_manager.get(entry['runtime_path'], lambda: model_registry.load_runtime(entry))
+
+    # Keep a newly registered model and its runtime export in the LRU, as if they had been loaded
+    def cache_registered(entry, model, runtime_model):
+        model_manager.put(entry['path'], model)
+        if runtime_model is not model:
+            model_manager.put(entry['runtime_path'], runtime_model)
+        return runtime_model
+
+    # registry_key separates models that share an architecture but not their inputs, e.g. grouped univariate models
+    def train_and_register(model_key, site, params, X_train, y_train, X_val, y_val, target_dates,
+                           warm_start=False, time_budget=0, hyperparameters=None, registry_key=None):
+        registry_key = registry_key or model_key
+        training_start = time.perf_counter()
+        history = LossHistory()
+        model, outcome = None, None
+        if warm_start:
+            callbacks = [history, TrainingTimeBudget(time_budget)]
+            previous = model_registry.latest(registry_key, site, params)
+            model, outcome = warm_start_model(model_registry, registry_key, site, params, X_train, y_train,
+                                              X_val, y_val, target_dates, callbacks=callbacks, load=load_registered)
+            if outcome in ("fine_tuned", "drift"):
+                # Fine-tuning changed the cached model in place, so it no longer matches its file
+                model_manager.evict(previous['path'])
+        if outcome == "reused":
+            entry = model_registry.latest(registry_key, site, params)
+            return model, load_registered_runtime(entry), history, "Reused (no new data)", entry
+
+        if model is None:
+            history = LossHistory()
+            model = model_manager.track(build_model(model_key, (X_train.shape[1], X_train.shape[2]), hyperparameters))
+            if model is None:
+                return None, None, history, None, None
+            callbacks = [
+                history,
+                EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
+                ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5),
+                TrainingTimeBudget(time_budget)
+            ]
+            batch_size = (hyperparameters or {}).get('batch_size', DEFAULT_HYPERPARAMETERS[model_key]['batch_size'])
+            train_ds, val_ds = training_datasets((site, tuple(params), X_train.shape[1]), X_train, y_train,
+                                                 X_val, y_val, batch_size=batch_size)
+            with profiler.section("model.fit"):
+                model.fit(train_ds, epochs=TRAINING_EPOCHS, validation_data=val_ds, callbacks=callbacks, verbose=0)
+            training_mode = "Full training (validation loss drifted)" if outcome == "drift" else "Full training"
+            training_mode += f", {training_stop_reason(callbacks, len(history.losses), TRAINING_EPOCHS).lower()}"
+        else:
+            training_mode = "Fine-tuned on new data"
+            if callbacks[1].budget_exhausted:
+                training_mode += ", time budget reached"
+        training_seconds.observe(time.perf_counter() - training_start, model=registry_key,
+                                 mode="fine_tune" if training_mode.startswith("Fine-tuned") else "full")
+
+        _, val_ds = training_datasets((site, tuple(params), X_train.shape[1]), X_train, y_train, X_val, y_val)
+        entry = model_registry.register(model, registry_key, site, params,
+                                        trained_through=np.max(target_dates[:len(X_train)]) if len(X_train) else None,
+                                        val_loss=model.evaluate(val_ds, verbose=0), training_mode=training_mode,
+                                        hyperparameters=hyperparameters)
+        runtime_model = cache_registered(entry, model, export_runtime_model(model, entry['runtime_path'], X_val))
+        return model, runtime_model, history, training_mode, entry
+
+    # Successive-halving search over the model's hyperparameters on the training grid; the winner is
+    # registered with its configuration under the grid's registry key
+    def tune_and_register(model_key, site, params, frequency, data, n_candidates):
         try:
-            rmse = np.sqrt(mean_squared_error(true, pred))
-            mae = mean_absolute_error(true, pred)
-            r2 = r2_score(true, pred) if len(true) > 1 else 0
-            return rmse, mae, r2
+            data = data.dropna(subset=params)
+            values = data[params].values
+            best, trials = successive_halving(model_key, values, n_candidates=n_candidates)
+            window_size = best["config"]["window_size"]
+            model = model_manager.track(build_model(model_key, (window_size, len(params)), best["config"]))
+            model.set_weights(best["weights"])
+            entry = model_registry.register(model, grid_registry_key(model_key, frequency), site, params,
+                                            trained_through=data['Date'].iloc[-best["n_val"] - 1],
+                                            val_loss=best["val_loss"],
+                                            training_mode=f"Tuned ({len(trials)} trials, {best['epochs']} epochs)",
+                                            hyperparameters=best["config"])
+            cache_registered(entry, model,
+                             export_runtime_model(model, entry['runtime_path'], window_arrays(values, window_size, 1)[2]))
+            trials_df = pd.DataFrame([{**trial["config"], "Epochs": trial["epochs"], "Validation Loss": trial["val_loss"]}
+                                      for trial in trials])
+            return entry, trials_df.sort_values(["Epochs", "Validation Loss"], ascending=[False, True])
         except Exception as e:
-            logger.error(f"Error computing metrics: {str(e)}")
-            return 0, 0, 0
+            logger.error(f"Hyperparameter tuning failed for {model_key} at {site}: {str(e)}")
+            return None, None
+
+    # Prediction results shared across sessions, so identical requests train only once
+    @st.cache_resource
+    def shared_prediction_cache():
+        return ResultCache()
+
+    # Each session's results, accounted per session and spilled to disk past WQ_SESSION_MEMORY_MB or when idle
+    @st.cache_resource
+    def shared_session_store():
+        session_store = SessionStore()
+        metrics.gauge("wq_session_result_bytes", "Bytes of prediction and comparison results held by sessions",
+                      function=session_store.memory_bytes)
+        return session_store
+
+    session_store = shared_session_store()
+    session_results = session_store.session(st.session_state.session_id)
+    session_store.enforce(current=st.session_state.session_id)
+
+    # Keras models of this process; memory is released after each training so it does not grow across reruns
+    @st.cache_resource
+    def shared_model_manager():
+        return ModelManager()
+
+    model_manager = shared_model_manager()
+
+    # Per-site regular time grids, computed once per dataset version and grid settings
+    @st.cache_data(show_spinner=False)
+    def resampled_dataset(version, frequency, interpolation):
+        return regular_grid(bfar_df, available_params, frequency, interpolation)
+
+    def grid_data(site, frequency="D", interpolation="linear"):
+        grid, gaps = resampled_dataset(dataset_version(bfar_df), frequency, interpolation)
+        if site == 'All Sites':
+            return site_mean(grid, gaps, available_params)
+        if site == 'Batch':
+            return grid, gaps
+        in_site = (grid['Site'] == site).values
+        return grid[in_site], gaps[in_site]
+
+    # Rolling-origin backtest of the model behind the current prediction results; registered models are
+    # only scored on cutoffs after their training cutoff
+    def backtest_prediction(results, prediction_params, n_folds):
+        if prediction_params["mode"] == "Individual Parameter":
+            params = [prediction_params["parameter"]]
+        else:
+            params = available_params
+        grid_site = 'Batch' if prediction_params["mode"] == "Batch Forecasting (All Sites)" else prediction_params["site"]
+        frequency = prediction_params.get("frequency", "D")
+        interpolation = prediction_params.get("interpolation", "linear")
+        grid, _ = grid_data(grid_site, frequency, interpolation)
+        groups = [site_df for _, site_df in grid.groupby('Site', sort=True)]
+        series, dates = [], []
+        for group in groups:
+            group = group.sort_values('Date', kind='stable').dropna(subset=params)
+            series.append(group[params].values)
+            dates.append(group['Date'].values)
+
+        horizon = len(results["dates"])
+        if results["model"] in CLASSICAL_FORECASTERS:
+            forecast = classical_forecaster(CLASSICAL_FORECASTERS[results["model"]], grid_season_length(frequency))
+            cache_path, after = None, None
+        elif results.get("model_entry"):
+            entry = results["model_entry"]
+            try:
+                model = load_registered_runtime(entry)
+            except Exception as e:
+                logger.error(f"Failed to load {entry['runtime_path']}, backtesting with Keras: {str(e)}")
+                model = load_registered(entry)
+            forecast = model_forecaster(model, (entry.get('hyperparameters') or {}).get('window_size', 7))
+            cache_path = entry['path'].replace(
+                '.keras', f'_backtest_{n_folds}x{horizon}_{interpolation}_{dataset_version(bfar_df)}.json')
+            after = entry['trained_through']
+        else:
+            return None
+        return run_backtest(series, forecast, horizon, n_folds, dates=dates, cache_path=cache_path, after=after)
 
-    # Calculate WQI with remarks
+    # Calculate WQI with remarks (see wqcore/wqi.py)
+    @profiler.timed()
     def calculate_wqi(values_dict, params):
         try:
-            normalized = []
-            for param in params:
-                values = values_dict[param]
-                normalized_values = np.clip(values, 0, 1)  # Ensure [0, 1]
-                logger.info(f"Using pre-normalized {param} for WQI: {normalized_values[:5]}")
-                normalized.append(normalized_values)
-            normalized = np.array(normalized)
-            wqi = np.mean(normalized, axis=0, where=~np.isnan(normalized)) * 100
-            wqi = np.clip(wqi, 0, 50)  # Ensure [0, 100]
-            remarks = []
-            for val in wqi:
-                if np.isnan(val):
-                    remarks.append("N/A")
-                elif val <= 10:
-                    remarks.append("Poor")
-                elif val <= 20:
-                    remarks.append("Fair")
-                elif val <= 30:
-                    remarks.append("Good")
-                elif val <= 40:
-                    remarks.append("Very Good")
-                else:
-                    remarks.append("Excellent")
-            logger.info(f"WQI: {wqi[:5]}, Remarks: {remarks[:5]}")
-            return wqi, remarks
+            return forecast_wqi(values_dict, params)
         except Exception as e:
             logger.error(f"Error calculating WQI: {str(e)}")
             return np.zeros(len(values_dict[params[0]])), ["N/A"] * len(values_dict[params[0]])
 
+    # Shaded band between two series, drawn beneath the existing traces of fig
+    def add_interval_band(fig, dates, lower, upper, color, name):
+        red, green, blue = (int(color.lstrip('#')[i:i + 2], 16) for i in (0, 2, 4))
+        fig.add_trace(go.Scatter(x=dates, y=upper, mode='lines', line=dict(width=0), showlegend=False,
+                                 hoverinfo='skip'))
+        fig.add_trace(go.Scatter(x=dates, y=lower, mode='lines', line=dict(width=0), fill='tonexty',
+                                 fillcolor=f'rgba({red}, {green}, {blue}, 0.2)', name=name))
+        fig.data = fig.data[-2:] + fig.data[:-2]
+
     # Get available parameters
     try:
-        available_params = sorted([
-            col for col in bfar_df.select_dtypes(include=np.number).columns
-            if col not in ['Date', 'Site', 'Year', 'Month', 'Weather Condition', 'Wind Direction']
-            and bfar_df[col].notna().any()
-        ])
+        available_params = numeric_parameters(bfar_df)
         logger.info(f"Found {len(available_params)} parameters: {available_params}")
     except Exception as e:
         logger.error(f"Error identifying parameters: {str(e)}")
@@ -1318,286 +1382,514 @@ with tab4:
                 unsafe_allow_html=True)
             prediction_mode = st.radio(
                 "Choose a mode for prediction:",
-                ["Time Series Forecasting", "Individual Parameter"],
+                ["Time Series Forecasting", "Individual Parameter", "Batch Forecasting (All Sites)"],
                 index=0,
                 key="prediction_mode",
                 horizontal=False
             )
             selected_model = st.selectbox(
                 "Select Model for Prediction:",
-                ["CNN", "LSTM", "Hybrid CNN-LSTM"],
+                ["CNN", "LSTM", "Hybrid CNN-LSTM"] + list(CLASSICAL_FORECASTERS),
                 key="pred_model"
             )
-
-            if 'prediction_results' not in st.session_state:
-                st.session_state.prediction_results = None
+            time_budget = st.number_input(
+                "Training Time Budget (seconds, 0 = no limit):",
+                min_value=0, max_value=3600, value=0, step=10,
+                key="pred_time_budget"
+            )
+            frequency = FREQUENCIES[st.selectbox("Time Grid:", list(FREQUENCIES), key="pred_frequency")]
+            interpolation = INTERPOLATION_METHODS[st.selectbox("Gap Filling:", list(INTERPOLATION_METHODS),
+                                                               key="pred_interpolation")]
+            _, grid_gaps = grid_data('Batch', frequency, interpolation)
+            st.caption(f"Models train on a regular {'daily' if frequency == 'D' else 'monthly'} grid per site; "
+                       f"{grid_gaps.to_numpy().mean():.1%} of its values had no observation.")
+            model_memory = model_manager.memory_usage()
+            rss_text = f", process {model_memory['process_rss'] / 2 ** 20:.0f} MB" if model_memory['process_rss'] else ""
+            st.caption(f"Models in memory: {model_memory['live_models']} "
+                       f"({model_memory['live_bytes'] / 2 ** 20:.1f} MB of weights){rss_text}")
+            session_usage = session_store.usage()
+            st.caption(f"Results in memory: {session_results.memory_bytes() / 2 ** 20:.2f} MB in this session, "
+                       f"{sum(u['memory_bytes'] for u in session_usage) / 2 ** 20:.2f} MB across "
+                       f"{len(session_usage)} sessions (limit {session_store.max_bytes / 2 ** 20:.0f} MB)")
+
+            if 'prediction_params' not in st.session_state:
                 st.session_state.prediction_params = {}
-            if 'comparison_results' not in st.session_state:
-                st.session_state.comparison_results = None
+
+            prediction_cache = shared_prediction_cache()
+
+            def prediction_cache_key(prediction_params, time_budget):
+                # Forecast dates start today, so cached results expire at midnight. The hyperparameters (and,
+                # for warm starts, the latest version) come from the registry key training registers under
+                model_key = prediction_params["model"].replace(' CNN-LSTM', '').lower()
+                frequency = prediction_params.get("frequency", "D")
+                if prediction_params.get("grouped"):
+                    registry_key, params = grid_registry_key(f"{model_key}_grouped", frequency), available_params
+                else:
+                    registry_key = grid_registry_key(model_key, frequency)
+                    params = [prediction_params["parameter"]] if "parameter" in prediction_params else available_params
+                hyperparameters = {} if prediction_params["mode"] == "Batch Forecasting (All Sites)" else \
+                    model_hyperparameters(model_key, prediction_params["site"], params, frequency, registry_key)
+                warm_start = prediction_params.get("warm_start", False)
+                latest = model_registry.latest(registry_key, prediction_params["site"], params) if warm_start else None
+                return (prediction_params["mode"], prediction_params["model"], prediction_params["site"],
+                        prediction_params.get("parameter"), prediction_params["horizon"],
+                        prediction_params.get("uncertainty", False), prediction_params.get("grouped", False),
+                        frequency, prediction_params.get("interpolation", "linear"),
+                        warm_start, latest["version"] if latest else None,
+                        dataset_version(bfar_df), time_budget, tuple(sorted(hyperparameters.items())),
+                        pd.Timestamp.today().date().isoformat())
 
             sites = ['All Sites'] + sorted(bfar_df['Site'].astype(str).unique())
 
-            # Prediction functions
-            def prepare_prediction_data(data, param, window_size=7):
-                try:
-                    values = data[param].dropna().values.reshape(-1, 1)
-                    if len(values) < window_size + 1:
-                        logger.warning(f"Insufficient data for {param}: {len(values)} rows")
-                        return np.array([])
-                    logger.info(f"Pre-normalized prediction data for {param}: {values[:5].flatten()}")
-                    X = []
-                    for i in range(len(values) - window_size):
-                        X.append(values[i:i + window_size])
-                    return np.array(X)
-                except Exception as e:
-                    logger.error(f"Error preparing prediction data for {param}: {str(e)}")
-                    return np.array([])
-
-            def prepare_multivariate_prediction_data(data, params, window_size=7):
-                try:
-                    values = data[params].dropna().values
-                    if len(values) < window_size + 1:
-                        logger.warning(f"Insufficient multivariate data: {len(values)} rows")
-                        return np.array([])
-                    logger.info(f"Pre-normalized multivariate prediction data: {values[:5]}")
-                    X = []
-                    for i in range(len(values) - window_size):
-                        X.append(values[i:i + window_size])
-                    return np.array(X)
-                except Exception as e:
-                    logger.error(f"Error preparing multivariate prediction data: {str(e)}")
-                    return np.array([])
-
-            def predict_univariate(model, X, horizon):
-                try:
-                    predictions = []
-                    current_input = X[-1].copy()
-                    for _ in range(horizon):
-                        pred = model.predict(current_input.reshape(1, current_input.shape[0], 1), verbose=0)
-                        predictions.append(pred[0, 0])
-                        current_input = np.roll(current_input, -1)
-                        current_input[-1] = pred[0, 0]
-                    predictions = np.array(predictions).flatten()
-                    logger.info(f"Univariate predictions for {horizon} steps: {predictions[:5]}")
-                    return predictions
-                except Exception as e:
-                    logger.error(f"Error in univariate prediction: {str(e)}")
-                    return np.array([])
-
-            def predict_multivariate(model, X, horizon, params):
-                try:
-                    predictions = []
-                    current_input = X[-1].copy()
-                    for _ in range(horizon):
-                        pred = model.predict(current_input.reshape(1, current_input.shape[0], current_input.shape[1]), verbose=0)
-                        predictions.append(pred[0])
-                        current_input = np.roll(current_input, -1, axis=0)
-                        current_input[-1] = pred[0]
-                    predictions = np.array(predictions)
-                    logger.info(f"Multivariate predictions: {[f'{param}: {predictions[:5, i]}' for i, param in enumerate(params)]}")
-                    return predictions
-                except Exception as e:
-                    logger.error(f"Error in multivariate prediction: {str(e)}")
-                    return np.array([])
+            # Forecast latency by horizon, in grid steps
+            def forecast_timed(func):
+                @wraps(func)
+                def wrapper(model, inputs, horizon, *args, **kwargs):
+                    with forecast_seconds.time(function=func.__name__, horizon=horizon):
+                        return func(model, inputs, horizon, *args, **kwargs)
+                return wrapper
+
+            # Forecasting functions (see wqcore/forecasting.py), timed per call
+            predict_univariate = forecast_timed(profiler.timed()(forecasting.predict_univariate))
+            predict_multivariate = forecast_timed(profiler.timed()(forecasting.predict_multivariate))
+            predict_multivariate_batch = forecast_timed(profiler.timed()(forecasting.predict_multivariate_batch))
+            forecast_intervals = forecast_timed(profiler.timed()(forecasting.forecast_intervals))
 
             if prediction_mode == "Time Series Forecasting":
                 selected_site = st.selectbox("Select Site:", sites, key="pred_site_ts")
                 prediction_horizon = st.selectbox("Prediction Horizon:", ["1 Week", "2 Weeks", "1 Month", "3 Months",
                                                                          "6 Months", "9 Months", "1 Year"],
                                                   key="pred_horizon")
+                warm_start = st.checkbox("Warm-start from last registered model", key="pred_warm_start_ts")
+                uncertainty = st.checkbox("Show uncertainty bands (Monte-Carlo dropout)", key="pred_uncertainty_ts",
+                                          disabled=selected_model in CLASSICAL_FORECASTERS)
+                with st.expander("Hyperparameter Tuning"):
+                    tune_key = (selected_model.replace(' CNN-LSTM', '').lower(), selected_site, available_params,
+                                frequency)
+                    n_candidates = st.slider("Candidate Configurations:", min_value=3, max_value=27, value=9, step=3,
+                                             key="tune_candidates_ts")
+                    if st.button("Tune Hyperparameters", key="tune_hyperparameters_ts",
+                                 disabled=selected_model in CLASSICAL_FORECASTERS):
+                        with st.spinner("Tuning hyperparameters, this may take a while, please wait..."), \
+                                model_manager.training():
+                            filtered_df, _ = grid_data(selected_site, frequency, interpolation)
+                            os.makedirs('models', exist_ok=True)
+                            tuned_entry, trials_df = tune_and_register(*tune_key, filtered_df, n_candidates)
+                            if tuned_entry is None:
+                                st.error("Hyperparameter tuning failed.")
+                            else:
+                                st.session_state.tuning_results = {"key": tune_key, "entry": tuned_entry,
+                                                                   "trials": trials_df}
+                    tuning = st.session_state.get("tuning_results")
+                    if tuning and tuning["key"] == tune_key:
+                        st.success(f"Registered tuned model v{tuning['entry']['version']}, used for the next training.")
+                        st.dataframe(tuning["trials"], use_container_width=True)
                 if st.button("Train and Predict", key="train_predict_timeseries", type="primary"):
                     with col2:
-                        with st.spinner("Training model, please wait..."):
+                        with st.spinner("Training model, please wait..."), model_manager.training():
                             st.session_state.prediction_params = {
                                 "mode": "Time Series Forecasting",
-                                "model": selected_model,
-                                "site": selected_site,
-                                "horizon": prediction_horizon
-                            }
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
-                            filtered_df = filtered_df.sort_values('Date')
-
-                            # Train model
-                            os.makedirs('models', exist_ok=True)
-                            os.makedirs('training_results', exist_ok=True)
-                            X_train, y_train, X_val, y_val = prepare_multivariate_data(filtered_df, available_params)
-                            if X_train is None:
-                                st.error(f"Insufficient data for multivariate training at {selected_site}.")
-                                st.stop()
-
-                            model_key = selected_model.replace(' CNN-LSTM', '').lower()
-                            model_builders = {'cnn': build_cnn, 'lstm': build_lstm, 'hybrid': build_hybrid}
-                            model = model_builders[model_key]((X_train.shape[1], X_train.shape[2]))
-                            if model is None:
-                                st.error(f"Failed to build {selected_model}.")
-                                st.stop()
-
-                            callbacks = [
-                                LossHistory(),
-                                EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
-                                ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5)
-                            ]
-                            model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_val, y_val),
-                                      callbacks=callbacks, verbose=0)
-                            model.save(f"models/{model_key}_multivariate.keras")
-                            logger.info(f"Saved {model_key}_multivariate.keras")
-
-                            # Training results
-                            y_pred = model.predict(X_val, verbose=0)
-                            training_results = {
-                                'epochs': len(callbacks[0].losses),
-                                'loss': callbacks[0].losses,
-                                'val_loss': callbacks[0].val_losses,
-                                'actual': {param: y_val[:, i].tolist() for i, param in enumerate(available_params)},
-                                'predicted': {param: y_pred[:, i].tolist() for i, param in enumerate(available_params)}
-                            }
-                            training_results_path = f"training_results/{model_key}_multivariate_training_results.json"
-                            save_training_results(training_results, training_results_path)
-
-                            # Predict future
-                            horizon_days = {"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
-                                            "6 Months": 180, "9 Months": 270, "1 Year": 364}[prediction_horizon]
-                            X_pred = prepare_multivariate_prediction_data(filtered_df, available_params)
-                            if X_pred.shape[0] == 0:
-                                st.error("Insufficient data for prediction.")
-                                st.stop()
-                            predictions = predict_multivariate(model, X_pred, horizon_days, available_params)
-                            predictions_dict = {param: predictions[:, i] for i, param in enumerate(available_params)}
-                            wqi, wqi_remarks = calculate_wqi(predictions_dict, available_params)
-                            metrics = {}
-                            for param in available_params:
-                                validation_true = filtered_df[param].values[-horizon_days:] if len(
-                                    filtered_df) >= horizon_days else predictions_dict[param]
-                                validation_pred = predictions_dict[param][:len(validation_true)]
-                                rmse, mae, r2 = compute_metrics(validation_true, validation_pred)
-                                metrics[param] = {"rmse": rmse, "mae": mae, "r2": r2}
-
-                            dates = pd.date_range(start=pd.Timestamp.today(), periods=horizon_days, freq='D')
-                            st.session_state.prediction_results = {
                                 "model": selected_model,
                                 "site": selected_site,
                                 "horizon": prediction_horizon,
-                                "dates": dates,
-                                "values": predictions_dict,
-                                "wqi": wqi,
-                                "wqi_remarks": wqi_remarks,
-                                "rmse": {param: metrics[param]["rmse"] for param in metrics},
-                                "mae": {param: metrics[param]["mae"] for param in metrics},
-                                "r2": {param: metrics[param]["r2"] for param in metrics},
-                                "epochs": training_results['epochs'],
-                                "training_results": training_results
+                                "frequency": frequency,
+                                "interpolation": interpolation,
+                                "uncertainty": uncertainty and selected_model not in CLASSICAL_FORECASTERS,
+                                "warm_start": warm_start and selected_model not in CLASSICAL_FORECASTERS
                             }
-                            st.session_state.view = "Results"
-            else:
+                            cache_key = prediction_cache_key(st.session_state.prediction_params, time_budget)
+
+                            @profiler.timed()
+                            def train_and_predict():
+                                filtered_df, _ = grid_data(selected_site, frequency, interpolation)
+
+                                # Train model
+                                os.makedirs('models', exist_ok=True)
+                                os.makedirs('training_results', exist_ok=True)
+                                model_key = selected_model.replace(' CNN-LSTM', '').lower()
+                                hyperparameters = model_hyperparameters(model_key, selected_site, available_params, frequency)
+                                window_size = hyperparameters.get('window_size', 7)
+                                X_train, y_train, X_val, y_val = prepare_multivariate_data(filtered_df, available_params,
+                                                                                           window_size)
+                                if X_train is None:
+                                    st.error(f"Insufficient data for multivariate training at {selected_site}.")
+                                    st.stop()
+
+                                horizon_days = horizon_steps({"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
+                                                              "6 Months": 180, "9 Months": 270,
+                                                              "1 Year": 364}[prediction_horizon], frequency)
+                                if selected_model in CLASSICAL_FORECASTERS:
+                                    _, forecasts, y_pred = classical_site_forecasts(
+                                        selected_model, filtered_df, available_params, horizon_days,
+                                        season_length=grid_season_length(frequency))
+                                    predictions = forecasts[0]
+                                    history, training_mode = LossHistory(), "No training (classical model)"
+                                    model_entry = None
+                                    intervals = None
+                                    model_key = selected_model.split(' (')[0].lower().replace(' ', '_')
+                                else:
+                                    target_dates = filtered_df.dropna(subset=available_params)['Date'].values[window_size:]
+                                    model, forecast_model, history, training_mode, model_entry = train_and_register(
+                                        model_key, selected_site, available_params, X_train, y_train, X_val, y_val,
+                                        target_dates, warm_start=warm_start, time_budget=time_budget,
+                                        hyperparameters=hyperparameters,
+                                        registry_key=grid_registry_key(model_key, frequency))
+                                    if model is None:
+                                        st.error(f"Failed to build {selected_model}.")
+                                        st.stop()
+
+                                    y_pred = model.predict(X_val, verbose=0)
+
+                                    # Predict future
+                                    X_pred = prepare_multivariate_prediction_data(filtered_df, available_params, window_size)
+                                    if X_pred.shape[0] == 0:
+                                        st.error("Insufficient data for prediction.")
+                                        st.stop()
+                                    predictions = predict_multivariate(forecast_model, X_pred, horizon_days, available_params)
+                                    intervals = forecast_intervals(forecast_model, X_pred[-1], horizon_days, available_params,
+                                                                   available_params) if uncertainty else None
+
+                                # Training results
+                                training_results = save_training_results(history, y_val, y_pred, available_params,
+                                                                         model=model_key, site=selected_site,
+                                                                         mode="multivariate")
+
+                                predictions_dict = {param: predictions[:, i] for i, param in enumerate(available_params)}
+                                wqi, wqi_remarks = calculate_wqi(predictions_dict, available_params)
+                                param_metrics = {}
+                                for i, param in enumerate(available_params):
+                                    rmse, mae, r2 = compute_metrics(y_val[:, i], y_pred[:, i]) or UNSCORED
+                                    param_metrics[param] = {"rmse": rmse, "mae": mae, "r2": r2}
+
+                                dates = forecast_dates(horizon_days, frequency)
+                                return {
+                                    "model": selected_model,
+                                    "site": selected_site,
+                                    "horizon": prediction_horizon,
+                                    "dates": dates,
+                                    "values": predictions_dict,
+                                    "wqi": wqi,
+                                    "wqi_remarks": wqi_remarks,
+                                    "rmse": {param: param_metrics[param]["rmse"] for param in param_metrics},
+                                    "mae": {param: param_metrics[param]["mae"] for param in param_metrics},
+                                    "r2": {param: param_metrics[param]["r2"] for param in param_metrics},
+                                    "epochs": training_results['epochs'],
+                                    "training_mode": training_mode,
+                                    "model_entry": model_entry,
+                                    "intervals": intervals,
+                                    "training_results": training_results
+                                }
+
+                            prediction_results, cached = prediction_cache.get_or_compute(
+                                cache_key, lambda: compact(train_and_predict()))
+                            session_results.set("prediction_results", prediction_results)
+                            session_results.set("backtests", {})
+                            prediction_cache_requests.inc(result="hit" if cached else "miss")
+                            if cached:
+                                logger.info(f"Served {cache_key} from the shared result cache")
+            elif prediction_mode == "Individual Parameter":
                 selected_param = st.selectbox("Select Parameter to Predict:", available_params, key="pred_param")
                 selected_site = st.selectbox("Select Site:", sites, key="pred_site")
                 prediction_horizon = st.selectbox("Prediction Horizon:", ["1 Week", "2 Weeks", "1 Month", "3 Months",
                                                                          "6 Months", "9 Months", "1 Year"],
                                                   key="pred_horizon")
+                warm_start = st.checkbox("Warm-start from last registered model", key="pred_warm_start")
+                uncertainty = st.checkbox("Show uncertainty bands (Monte-Carlo dropout)", key="pred_uncertainty",
+                                          disabled=selected_model in CLASSICAL_FORECASTERS)
+                grouped = st.checkbox("Forecast all parameters with one shared model", key="pred_grouped",
+                                      disabled=selected_model in CLASSICAL_FORECASTERS,
+                                      help="Trains one model on every parameter's series and forecasts them "
+                                           "together; the WQI then uses forecasts instead of recent history.")
+                with st.expander("Hyperparameter Tuning"):
+                    tune_key = (selected_model.replace(' CNN-LSTM', '').lower(), selected_site, [selected_param],
+                                frequency)
+                    n_candidates = st.slider("Candidate Configurations:", min_value=3, max_value=27, value=9, step=3,
+                                             key="tune_candidates")
+                    if st.button("Tune Hyperparameters", key="tune_hyperparameters",
+                                 disabled=selected_model in CLASSICAL_FORECASTERS):
+                        with st.spinner("Tuning hyperparameters, this may take a while, please wait..."), \
+                                model_manager.training():
+                            filtered_df, _ = grid_data(selected_site, frequency, interpolation)
+                            os.makedirs('models', exist_ok=True)
+                            tuned_entry, trials_df = tune_and_register(*tune_key, filtered_df, n_candidates)
+                            if tuned_entry is None:
+                                st.error("Hyperparameter tuning failed.")
+                            else:
+                                st.session_state.tuning_results = {"key": tune_key, "entry": tuned_entry,
+                                                                   "trials": trials_df}
+                    tuning = st.session_state.get("tuning_results")
+                    if tuning and tuning["key"] == tune_key:
+                        st.success(f"Registered tuned model v{tuning['entry']['version']}, used for the next training.")
+                        st.dataframe(tuning["trials"], use_container_width=True)
                 if st.button("Train and Predict", key="train_predict_individual", type="primary"):
                     with col2:
-                        with st.spinner("Training model, please wait..."):
+                        with st.spinner("Training model, please wait..."), model_manager.training():
                             st.session_state.prediction_params = {
                                 "mode": "Individual Parameter",
                                 "model": selected_model,
                                 "parameter": selected_param,
                                 "site": selected_site,
-                                "horizon": prediction_horizon
+                                "horizon": prediction_horizon,
+                                "frequency": frequency,
+                                "interpolation": interpolation,
+                                "uncertainty": uncertainty and selected_model not in CLASSICAL_FORECASTERS,
+                                "grouped": grouped and selected_model not in CLASSICAL_FORECASTERS,
+                                "warm_start": warm_start and selected_model not in CLASSICAL_FORECASTERS
                             }
-                            filtered_df = bfar_df.copy()
-                            if selected_site != 'All Sites':
-                                filtered_df = filtered_df[filtered_df['Site'] == selected_site]
-                            filtered_df = filtered_df.sort_values('Date')
-
-                            # Train model
-                            os.makedirs('models', exist_ok=True)
-                            os.makedirs('training_results', exist_ok=True)
-                            X_train, y_train, X_val, y_val = prepare_univariate_data(filtered_df, selected_param)
-                            if X_train is None:
-                                st.error(f"Insufficient data for training {selected_param} at {selected_site}.")
-                                st.stop()
-
-                            model_key = selected_model.replace(' CNN-LSTM', '').lower()
-                            model_builders = {'cnn': build_cnn, 'lstm': build_lstm, 'hybrid': build_hybrid}
-                            model = model_builders[model_key]((X_train.shape[1], 1))
-                            if model is None:
-                                st.error(f"Failed to build {selected_model} for {selected_param}.")
-                                st.stop()
+                            cache_key = prediction_cache_key(st.session_state.prediction_params, time_budget)
+
+                            @profiler.timed()
+                            def train_and_predict():
+                                filtered_df, _ = grid_data(selected_site, frequency, interpolation)
+
+                                # Train model
+                                os.makedirs('models', exist_ok=True)
+                                os.makedirs('training_results', exist_ok=True)
+                                model_key = selected_model.replace(' CNN-LSTM', '').lower()
+                                # The grouped model is registered, and so tuned, under its own key
+                                if grouped:
+                                    hyperparameters = model_hyperparameters(
+                                        model_key, selected_site, available_params, frequency,
+                                        grid_registry_key(f"{model_key}_grouped", frequency))
+                                else:
+                                    hyperparameters = model_hyperparameters(model_key, selected_site, [selected_param],
+                                                                            frequency)
+                                window_size = hyperparameters.get('window_size', 7)
+                                X_train, y_train, X_val, y_val = prepare_univariate_data(filtered_df, selected_param,
+                                                                                         window_size)
+                                if X_train is None:
+                                    st.error(f"Insufficient data for training {selected_param} at {selected_site}.")
+                                    st.stop()
 
-                            callbacks = [
-                                LossHistory(),
-                                EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
-                                ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5)
-                            ]
-                            model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_val, y_val),
-                                      callbacks=callbacks, verbose=0)
-                            model.save(f"models/{model_key}_{selected_param}.keras")
-                            logger.info(f"Saved {model_key}_{selected_param}.keras")
-
-                            # Training results
-                            y_pred = model.predict(X_val, verbose=0).flatten()
-                            y_actual = y_val.flatten()
-                            logger.info(f"Training results for {selected_param}: actual={y_actual[:5]}, predicted={y_pred[:5]}")
-                            training_results = {
-                                'epochs': len(callbacks[0].losses),
-                                'loss': callbacks[0].losses,
-                                'val_loss': callbacks[0].val_losses,
-                                'actual': y_actual.tolist(),
-                                'predicted': y_pred.tolist()
-                            }
-                            training_results_path = f"training_results/{model_key}_{selected_param}_training_results.json"
-                            save_training_results(training_results, training_results_path)
-
-                            # Predict future
-                            horizon_days = {"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
-                                            "6 Months": 180, "9 Months": 270, "1 Year": 364}[prediction_horizon]
-                            X_pred = prepare_prediction_data(filtered_df, selected_param)
-                            if X_pred.shape[0] == 0:
-                                st.error("Insufficient data for prediction.")
-                                st.stop()
-                            predictions = predict_univariate(model, X_pred, horizon_days)
-
-                            # WQI
-                            wqi_values = {selected_param: predictions}
-                            for param in available_params:
-                                if param != selected_param:
-                                    recent_values = filtered_df[param].dropna().tail(horizon_days).values
-                                    wqi_values[param] = recent_values if len(recent_values) == horizon_days else np.full(horizon_days, np.nan)
-                                    if len(recent_values) != horizon_days:
-                                        logger.warning(f"Insufficient historical data for {param}")
-                            wqi, wqi_remarks = calculate_wqi(wqi_values, available_params)
-
-                            validation_true = filtered_df[selected_param].values[-horizon_days:] if len(
-                                filtered_df) >= horizon_days else predictions
-                            validation_pred = predictions[:len(validation_true)]
-                            rmse, mae, r2 = compute_metrics(validation_true, validation_pred)
-
-                            dates = pd.date_range(start=pd.Timestamp.today(), periods=horizon_days, freq='D')
-                            st.session_state.prediction_results = {
+                                horizon_days = horizon_steps({"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
+                                                              "6 Months": 180, "9 Months": 270,
+                                                              "1 Year": 364}[prediction_horizon], frequency)
+                                parameter_forecasts = {}
+                                if selected_model in CLASSICAL_FORECASTERS:
+                                    _, forecasts, y_pred = classical_site_forecasts(
+                                        selected_model, filtered_df, [selected_param], horizon_days,
+                                        season_length=grid_season_length(frequency))
+                                    predictions = forecasts[0].flatten()
+                                    y_pred = y_pred.flatten()
+                                    history, training_mode = LossHistory(), "No training (classical model)"
+                                    model_entry = None
+                                    model_key = selected_model.split(' (')[0].lower().replace(' ', '_')
+                                elif grouped:
+                                    (X_group_train, y_group_train, X_group_val, y_group_val, last_windows,
+                                     group_params, target_dates) = prepare_parameter_batch_data(
+                                        filtered_df, available_params, window_size)
+                                    if X_group_train is None or selected_param not in group_params:
+                                        st.error(f"Insufficient data for grouped training at {selected_site}.")
+                                        st.stop()
+                                    model, forecast_model, history, training_mode, model_entry = train_and_register(
+                                        model_key, selected_site, group_params, X_group_train, y_group_train,
+                                        X_group_val, y_group_val, target_dates, warm_start=warm_start,
+                                        time_budget=time_budget, hyperparameters=hyperparameters,
+                                        registry_key=grid_registry_key(f"{model_key}_grouped", frequency))
+                                    if model is None:
+                                        st.error(f"Failed to build {selected_model} for the grouped parameters.")
+                                        st.stop()
+
+                                    # The selected parameter's validation windows are the same as in univariate mode
+                                    y_pred = model.predict(X_val, verbose=0).flatten()
+
+                                    # Predict every parameter in one batched pass
+                                    group_predictions = predict_multivariate_batch(forecast_model, last_windows,
+                                                                                   horizon_days)
+                                    if group_predictions.size == 0:
+                                        st.error("Grouped prediction failed.")
+                                        st.stop()
+                                    parameter_forecasts = {param: group_predictions[i, :, 0]
+                                                           for i, param in enumerate(group_params)}
+                                    predictions = parameter_forecasts[selected_param]
+                                    X_pred = last_windows[[group_params.index(selected_param)]]
+                                else:
+                                    target_dates = filtered_df.dropna(subset=[selected_param])['Date'].values[window_size:]
+                                    model, forecast_model, history, training_mode, model_entry = train_and_register(
+                                        model_key, selected_site, [selected_param], X_train, y_train, X_val, y_val,
+                                        target_dates, warm_start=warm_start, time_budget=time_budget,
+                                        hyperparameters=hyperparameters,
+                                        registry_key=grid_registry_key(model_key, frequency))
+                                    if model is None:
+                                        st.error(f"Failed to build {selected_model} for {selected_param}.")
+                                        st.stop()
+
+                                    y_pred = model.predict(X_val, verbose=0).flatten()
+
+                                    # Predict future
+                                    X_pred = prepare_prediction_data(filtered_df, selected_param, window_size)
+                                    if X_pred.shape[0] == 0:
+                                        st.error("Insufficient data for prediction.")
+                                        st.stop()
+                                    predictions = predict_univariate(forecast_model, X_pred, horizon_days)
+
+                                # Training results
+                                y_actual = y_val.flatten()
+                                logger.debug("Training results for %s: actual=%s, predicted=%s", selected_param,
+                                             y_actual[:5], y_pred[:5])
+                                training_results = save_training_results(history, y_actual, y_pred, [selected_param],
+                                                                         model=model_key, site=selected_site,
+                                                                         mode="grouped" if parameter_forecasts
+                                                                         else "univariate")
+
+                                # WQI; parameters without a forecast are filled with their recent history
+                                wqi_values = {selected_param: predictions, **parameter_forecasts}
+                                for param in available_params:
+                                    if param not in wqi_values:
+                                        recent_values = filtered_df[param].dropna().tail(horizon_days).values
+                                        wqi_values[param] = recent_values if len(recent_values) == horizon_days else np.full(horizon_days, np.nan)
+                                        if len(recent_values) != horizon_days:
+                                            logger.warning(f"Insufficient historical data for {param}")
+                                wqi, wqi_remarks = calculate_wqi(wqi_values, available_params)
+                                intervals = None
+                                if uncertainty and selected_model not in CLASSICAL_FORECASTERS:
+                                    context = {param: values for param, values in wqi_values.items()
+                                               if param != selected_param}
+                                    intervals = forecast_intervals(forecast_model, X_pred[-1], horizon_days,
+                                                                   [selected_param], available_params,
+                                                                   context=context)
+
+                                rmse, mae, r2 = compute_metrics(y_actual, y_pred) or UNSCORED
+
+                                dates = forecast_dates(horizon_days, frequency)
+                                return {
+                                    "model": selected_model,
+                                    "parameter": selected_param,
+                                    "site": selected_site,
+                                    "horizon": prediction_horizon,
+                                    "dates": dates,
+                                    "values": predictions,
+                                    "wqi": wqi,
+                                    "wqi_remarks": wqi_remarks,
+                                    "rmse": rmse,
+                                    "mae": mae,
+                                    "r2": r2,
+                                    "epochs": training_results['epochs'],
+                                    "training_mode": training_mode,
+                                    "model_entry": model_entry,
+                                    "intervals": intervals,
+                                    "parameter_forecasts": parameter_forecasts,
+                                    "training_results": training_results
+                                }
+
+                            prediction_results, cached = prediction_cache.get_or_compute(
+                                cache_key, lambda: compact(train_and_predict()))
+                            session_results.set("prediction_results", prediction_results)
+                            session_results.set("backtests", {})
+                            prediction_cache_requests.inc(result="hit" if cached else "miss")
+                            if cached:
+                                logger.info(f"Served {cache_key} from the shared result cache")
+            else:
+                prediction_horizon = st.selectbox("Prediction Horizon:", ["1 Week", "2 Weeks", "1 Month", "3 Months",
+                                                                         "6 Months", "9 Months", "1 Year"],
+                                                  key="pred_horizon")
+                if st.button("Train and Predict", key="train_predict_batch", type="primary"):
+                    with col2:
+                        with st.spinner("Training model on every site, please wait..."), model_manager.training():
+                            st.session_state.prediction_params = {
+                                "mode": "Batch Forecasting (All Sites)",
                                 "model": selected_model,
-                                "parameter": selected_param,
-                                "site": selected_site,
+                                "site": "All Sites",
                                 "horizon": prediction_horizon,
-                                "dates": dates,
-                                "values": predictions,
-                                "wqi": wqi,
-                                "wqi_remarks": wqi_remarks,
-                                "rmse": rmse,
-                                "mae": mae,
-                                "r2": r2,
-                                "epochs": training_results['epochs'],
-                                "training_results": training_results
+                                "frequency": frequency,
+                                "interpolation": interpolation
                             }
-                            st.session_state.view = "Results"
+                            cache_key = prediction_cache_key(st.session_state.prediction_params, time_budget)
+
+                            @profiler.timed()
+                            def train_and_predict():
+
+                                # Train model on the windows of every site at once
+                                os.makedirs('models', exist_ok=True)
+                                os.makedirs('training_results', exist_ok=True)
+                                grid_df, _ = grid_data('Batch', frequency, interpolation)
+                                (X_train, y_train, X_val, y_val, last_windows, batch_sites,
+                                 target_dates) = prepare_site_batch_data(grid_df, available_params)
+                                if X_train is None:
+                                    st.error("Insufficient data for batch training.")
+                                    st.stop()
+
+                                model_key = selected_model.replace(' CNN-LSTM', '').lower()
+                                horizon_days = horizon_steps({"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
+                                                              "6 Months": 180, "9 Months": 270,
+                                                              "1 Year": 364}[prediction_horizon], frequency)
+                                if selected_model in CLASSICAL_FORECASTERS:
+                                    _, predictions, y_pred = classical_site_forecasts(
+                                        selected_model, grid_df, available_params, horizon_days, by_site=True,
+                                        season_length=grid_season_length(frequency))
+                                    history, training_mode = LossHistory(), "No training (classical model)"
+                                    model_entry = None
+                                    model_key = selected_model.split(' (')[0].lower().replace(' ', '_')
+                                else:
+                                    model, forecast_model, history, training_mode, model_entry = train_and_register(
+                                        model_key, 'Batch', available_params, X_train, y_train, X_val, y_val,
+                                        target_dates, time_budget=time_budget,
+                                        registry_key=grid_registry_key(model_key, frequency))
+                                    if model is None:
+                                        st.error(f"Failed to build {selected_model}.")
+                                        st.stop()
+                                    y_pred = model.predict(X_val, verbose=0)
+
+                                    # Predict future, one model call per step for all sites
+                                    predictions = predict_multivariate_batch(forecast_model, last_windows, horizon_days)
+                                    if predictions.size == 0:
+                                        st.error("Batch prediction failed.")
+                                        st.stop()
+
+                                # Training results
+                                training_results = save_training_results(history, y_val, y_pred, available_params,
+                                                                         model=model_key, site="All Sites",
+                                                                         mode="batch")
+                                param_metrics = {}
+                                for i, param in enumerate(available_params):
+                                    rmse, mae, r2 = compute_metrics(y_val[:, i], y_pred[:, i]) or UNSCORED
+                                    param_metrics[param] = {"rmse": rmse, "mae": mae, "r2": r2}
+
+                                dates = forecast_dates(horizon_days, frequency)
+                                forecast_table = build_forecast_table(predictions, batch_sites, dates, available_params)
+
+                                # WQI is computed element-wise, so all sites go through a single call
+                                wqi, wqi_remarks = calculate_wqi(
+                                    {param: predictions[:, :, i].reshape(-1) for i, param in enumerate(available_params)},
+                                    available_params)
+                                wqi_table = pd.DataFrame({
+                                    "Site": np.repeat(batch_sites, horizon_days),
+                                    "Date": np.tile(dates.values, len(batch_sites)),
+                                    "Water Quality Index": wqi,
+                                    "WQI Remarks": wqi_remarks
+                                })
+
+                                return {
+                                    "model": selected_model,
+                                    "site": "All Sites",
+                                    "horizon": prediction_horizon,
+                                    "dates": dates,
+                                    "sites": batch_sites,
+                                    "forecast_table": forecast_table,
+                                    "wqi_table": wqi_table,
+                                    "rmse": {param: param_metrics[param]["rmse"] for param in param_metrics},
+                                    "mae": {param: param_metrics[param]["mae"] for param in param_metrics},
+                                    "r2": {param: param_metrics[param]["r2"] for param in param_metrics},
+                                    "epochs": training_results['epochs'],
+                                    "training_mode": training_mode,
+                                    "model_entry": model_entry,
+                                    "training_results": training_results
+                                }
+
+                            prediction_results, cached = prediction_cache.get_or_compute(
+                                cache_key, lambda: compact(train_and_predict()))
+                            session_results.set("prediction_results", prediction_results)
+                            session_results.set("backtests", {})
+                            prediction_cache_requests.inc(result="hit" if cached else "miss")
+                            if cached:
+                                logger.info(f"Served {cache_key} from the shared result cache")
 
         with col2:
             st.markdown(
                 "<div class='custom-text-primary' style='margin-bottom: 0px; margin-top: 8px; "
                 "font-size: 15px; text-align: justify;'>Prediction Summary</div>",
                 unsafe_allow_html=True)
-            results = st.session_state.prediction_results
+            results = session_results.get("prediction_results")
             if results:
                 st.markdown(
                     f"<div class='custom-text-small'>Model Used:</div>"
@@ -1640,11 +1932,75 @@ with tab4:
                     type="primary" if is_selected else "secondary"
                 )
 
+    prediction_view_timer = profiler.begin(f"prediction/{st.session_state.view}")
+    prediction_view_start = time.perf_counter()
     with colB:
-        if st.session_state.prediction_results is None and st.session_state.view != "Comparison":
+        if session_results.get("prediction_results") is None and st.session_state.view != "Comparison":
             st.info("Please configure and run training/prediction to view results.")
         else:
-            if st.session_state.view == "Results":
+            if st.session_state.view == "Results" and \
+                    st.session_state.prediction_params["mode"] == "Batch Forecasting (All Sites)":
+                st.markdown(
+                    "<div class='custom-text-primary' style='margin-top: 3px; margin-bottom: 5px; font-size: 20px;'>Batch Prediction Results</div>",
+                    unsafe_allow_html=True)
+                forecast_table = results["forecast_table"]
+                st.markdown(f"**Predicted Values for {len(results['sites'])} Sites**")
+                st.dataframe(forecast_table, use_container_width=True)
+                st.download_button(
+                    "Download Forecast Table (CSV)",
+                    data=forecast_table.to_csv(index=False).encode('utf-8'),
+                    file_name=f"batch_forecast_{results['model'].replace(' ', '_').lower()}.csv",
+                    mime="text/csv",
+                    key="batch_forecast_download"
+                )
+                plot_param = st.selectbox("Select Parameter to Plot:", available_params, key="batch_plot_param")
+                fig_pred = px.line(forecast_table[forecast_table["Parameter"] == plot_param],
+                                   x="Date", y="Value", color="Site",
+                                   title=f"Predicted {plot_param} by Site")
+                fig_pred.update_traces(line=dict(width=2))
+                fig_pred.update_layout(
+                    showlegend=True,
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    height=400,
+                    title_font=dict(size=18, family='Montserrat' if font_base64 else 'sans-serif'),
+                    title_x=0.03,
+                    xaxis_title="Date",
+                    yaxis_title=plot_param,
+                    font=dict(family='Montserrat' if font_base64 else 'sans-serif')
+                )
+                plotly_chart(fig_pred, use_container_width=True)
+
+                st.markdown("<div class='custom-divider'></div>", unsafe_allow_html=True)
+                st.markdown(
+                    "<div class='custom-text-primary' style='margin-top: 0px; margin-bottom: 8px; font-size: 20px;'>Water Quality Index</div>",
+                    unsafe_allow_html=True)
+                wqi_table = results["wqi_table"]
+                wqi_summary = wqi_table.groupby("Site", observed=True).agg(
+                    **{"Average WQI": ("Water Quality Index", "mean"),
+                       "Predominant Remark": ("WQI Remarks", lambda remarks: remarks.mode().iat[0])}
+                ).reset_index()
+                st.dataframe(wqi_summary, use_container_width=True)
+                fig_wqi = px.line(wqi_table, x="Date", y="Water Quality Index", color="Site",
+                                  title="Water Quality Index by Site")
+                fig_wqi.update_traces(line=dict(width=2))
+                fig_wqi.update_layout(
+                    showlegend=True,
+                    plot_bgcolor='white',
+                    paper_bgcolor='white',
+                    height=400,
+                    title_font=dict(size=18, family='Montserrat' if font_base64 else 'sans-serif'),
+                    title_x=0.03,
+                    xaxis_title="Date",
+                    yaxis_title="Water Quality Index",
+                    font=dict(family='Montserrat' if font_base64 else 'sans-serif')
+                )
+                plotly_chart(fig_wqi, use_container_width=True)
+
+            elif st.session_state.view == "Results":
+                interval_level = round((QUANTILES[1] - QUANTILES[0]) * 100)
+                interval_caption = (f"Shaded bands: {interval_level}% prediction interval from {MC_SAMPLES} "
+                                    f"Monte-Carlo dropout samples.")
                 st.markdown(
                     "<div class='custom-text-primary' style='margin-top: 3px; margin-bottom: 5px; font-size: 20px;'>Prediction Results</div>",
                     unsafe_allow_html=True)
@@ -1670,7 +2026,18 @@ with tab4:
                         yaxis_title=results["parameter"],
                         font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                     )
-                    st.plotly_chart(fig_pred, use_container_width=True)
+                    intervals = results.get("intervals")
+                    if intervals:
+                        add_interval_band(fig_pred, results["dates"], intervals["lower"][results["parameter"]],
+                                          intervals["upper"][results["parameter"]], '#004A99',
+                                          f"{interval_level}% interval")
+                    plotly_chart(fig_pred, use_container_width=True)
+                    if intervals:
+                        st.caption(interval_caption)
+                    if results.get("parameter_forecasts"):
+                        with st.expander("All Parameters (shared model)"):
+                            st.dataframe(pd.DataFrame({"Date": results["dates"], **results["parameter_forecasts"]}),
+                                         use_container_width=True)
                 else:
                     selected_params = st.multiselect(
                         "Select Parameters to Plot and Display:",
@@ -1702,7 +2069,14 @@ with tab4:
                             yaxis_title="Value",
                             font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                         )
-                        st.plotly_chart(fig_pred, use_container_width=True)
+                        if results.get("intervals"):
+                            for trace in list(fig_pred.data):
+                                add_interval_band(fig_pred, results["dates"], results["intervals"]["lower"][trace.name],
+                                                  results["intervals"]["upper"][trace.name], trace.line.color,
+                                                  f"{trace.name} {interval_level}% interval")
+                        plotly_chart(fig_pred, use_container_width=True)
+                        if results.get("intervals"):
+                            st.caption(interval_caption)
 
                     st.markdown("<div class='custom-divider'></div>", unsafe_allow_html=True)
                     st.markdown(
@@ -1728,7 +2102,13 @@ with tab4:
                         yaxis_title="Water Quality Index",
                         font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                     )
-                    st.plotly_chart(fig_wqi, use_container_width=True)
+                    if results.get("intervals"):
+                        add_interval_band(fig_wqi, results["dates"], results["intervals"]["wqi_lower"],
+                                          results["intervals"]["wqi_upper"], '#004A99',
+                                          f"{interval_level}% interval")
+                    plotly_chart(fig_wqi, use_container_width=True)
+                    if results.get("intervals"):
+                        st.caption(interval_caption)
 
                     # Recommendations based on WQI
                     st.markdown("<div class='custom-divider'></div>", unsafe_allow_html=True)
@@ -1737,7 +2117,7 @@ with tab4:
                         unsafe_allow_html=True)
 
                     avg_wqi = np.mean(results["wqi"])
-                    primary_remark = max(set(results["wqi_remarks"]), key=results["wqi_remarks"].count)
+                    primary_remark = pd.Series(results["wqi_remarks"]).value_counts().idxmax()
                     site_text = f" at {results['site']}" if results['site'] != 'All Sites' else ""
                     params_text = ", ".join(selected_params) if selected_params else "multiple parameters"
                     timeframe = results["horizon"]
@@ -1801,7 +2181,7 @@ with tab4:
                     "<div class='custom-text-primary' style='margin-top: 3px; margin-bottom: 5px; font-size: 20px;'>Model Evaluation</div>",
                     unsafe_allow_html=True)
                 training_results = results.get('training_results')
-                if not training_results:
+                if not training_results or not training_results.get('run_id'):
                     st.error("Training results not available.")
                     st.stop()
 
@@ -1816,11 +2196,8 @@ with tab4:
 
                 if selected_eval_params:
                     for param in selected_eval_params:
-                        if param in training_results['actual']:
-                            actual_pred_df = pd.DataFrame({
-                                "Actual": training_results['actual'][param],
-                                "Predicted": training_results['predicted'][param]
-                            })
+                        if param in training_results['params']:
+                            actual_pred_df = load_validation_predictions(training_results['run_id'], param)
                             st.markdown(f"**Actual vs Predicted Values for {param}**")
                             st.dataframe(actual_pred_df, use_container_width=True)
 
@@ -1851,7 +2228,7 @@ with tab4:
                                 title_x=0.03,
                                 font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                             )
-                            st.plotly_chart(fig_actual_pred, use_container_width=True)
+                            plotly_chart(fig_actual_pred, use_container_width=True)
 
                     if st.session_state.prediction_params["mode"] == "Individual Parameter":
                         metrics_data = [
@@ -1876,7 +2253,7 @@ with tab4:
                             yaxis_title="Value",
                             font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                         )
-                        st.plotly_chart(fig_eval, use_container_width=True)
+                        plotly_chart(fig_eval, use_container_width=True)
                         if r2_hidden:
                             st.info(f"R² for {results['parameter']} cannot be displayed due to insufficient data.")
                     else:
@@ -1911,7 +2288,7 @@ with tab4:
                             yaxis_title="Value",
                             font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                         )
-                        st.plotly_chart(fig_eval, use_container_width=True)
+                        plotly_chart(fig_eval, use_container_width=True)
                         for param in r2_hidden_params:
                             st.info(f"R² for {param} cannot be displayed due to insufficient data.")
 
@@ -1920,11 +2297,9 @@ with tab4:
                     "<div class='custom-text-primary' style='margin-top: 0px; margin-bottom: 8px; font-size: 20px;'>Training Evaluation</div>",
                     unsafe_allow_html=True)
                 st.markdown(f"**Epochs Trained:** {results['epochs']}")
-                loss_df = pd.DataFrame({
-                    "Epoch": range(1, training_results['epochs'] + 1),
-                    "Training Loss": training_results['loss'],
-                    "Validation Loss": training_results['val_loss']
-                })
+                if results.get('training_mode'):
+                    st.markdown(f"**Training Mode:** {results['training_mode']}")
+                loss_df = load_training_history(training_results['run_id'])
                 melted_loss = loss_df.melt(id_vars="Epoch", value_vars=["Training Loss", "Validation Loss"],
                                            var_name="Loss Type", value_name="Loss")
                 fig_loss = px.line(melted_loss, x="Epoch", y="Loss", color="Loss Type",
@@ -1941,7 +2316,73 @@ with tab4:
                     yaxis_title="Loss",
                     font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                 )
-                st.plotly_chart(fig_loss, use_container_width=True)
+                plotly_chart(fig_loss, use_container_width=True)
+
+                st.markdown("<div class='custom-divider'></div>", unsafe_allow_html=True)
+                st.markdown(
+                    "<div class='custom-text-primary' style='margin-top: 0px; margin-bottom: 8px; font-size: 20px;'>Rolling-Origin Backtest</div>",
+                    unsafe_allow_html=True)
+                n_folds = st.slider("Number of Cutoffs:", min_value=2, max_value=10, value=5, key="backtest_folds")
+                # Backtests live in the session, since `results` may be shared with other sessions
+                backtests = session_results.get("backtests") or {}
+                if n_folds not in backtests:
+                    with st.spinner("Running backtest..."):
+                        backtests = {**backtests, n_folds: backtest_prediction(results, st.session_state.prediction_params,
+                                                                               n_folds)}
+                    session_results.set("backtests", backtests)
+                backtest = backtests[n_folds]
+                step_unit = "Months" if st.session_state.prediction_params.get("frequency", "D") == "MS" else "Days"
+                model_entry = results.get("model_entry")
+                if backtest is None:
+                    if model_entry:
+                        st.info(f"Not enough data after the model's training cutoff ({model_entry['trained_through']}) "
+                                f"to backtest it at the selected horizon.")
+                    else:
+                        st.info("Not enough history to backtest this model at the selected horizon.")
+                else:
+                    backtest_params = [results["parameter"]] if st.session_state.prediction_params["mode"] == \
+                        "Individual Parameter" else available_params
+                    batch_sites = results.get("sites")
+                    fold_df = pd.DataFrame({
+                        "Site": [batch_sites[fold["series"]] if batch_sites else results["site"]
+                                 for fold in backtest["folds"]],
+                        "Cutoff": [fold["cutoff"] for fold in backtest["folds"]],
+                        "RMSE": np.mean(backtest["rmse"], axis=1),
+                        "MAE": np.mean(backtest["mae"], axis=1)
+                    })
+                    summary_df = pd.DataFrame({
+                        "Parameter": backtest_params,
+                        "RMSE": np.mean(backtest["rmse"], axis=0),
+                        "MAE": np.mean(backtest["mae"], axis=0),
+                        "R²": pd.DataFrame(backtest["r2"], dtype=float).mean().values
+                    })
+                    st.markdown(f"**{len(fold_df)} forecasts of {backtest['horizon']} {step_unit.lower()} "
+                                f"from rolling cutoffs**")
+                    st.dataframe(summary_df, use_container_width=True)
+                    with st.expander("Metrics per Cutoff"):
+                        st.dataframe(fold_df, use_container_width=True)
+                    lead_df = pd.DataFrame({
+                        f"{step_unit} Ahead": np.arange(1, backtest["horizon"] + 1),
+                        "RMSE": np.mean(backtest["lead_rmse"], axis=1)
+                    })
+                    fig_lead = px.line(lead_df, x=f"{step_unit} Ahead", y="RMSE",
+                                       title=f"Backtest Error by Forecast Lead Time ({results['model']})")
+                    fig_lead.update_traces(line=dict(width=2, color='#004A99'))
+                    fig_lead.update_layout(
+                        showlegend=False,
+                        plot_bgcolor='white',
+                        paper_bgcolor='white',
+                        height=400,
+                        title_font=dict(size=18, family='Montserrat' if font_base64 else 'sans-serif'),
+                        title_x=0.03,
+                        xaxis_title=f"{step_unit} Ahead",
+                        yaxis_title="RMSE",
+                        font=dict(family='Montserrat' if font_base64 else 'sans-serif')
+                    )
+                    plotly_chart(fig_lead, use_container_width=True)
+                    if model_entry:
+                        st.caption(f"Only cutoffs after the model's training cutoff ({model_entry['trained_through']}) "
+                                   f"are scored, so every forecast is out of sample.")
 
             elif st.session_state.view == "Comparison":
                 st.markdown(
@@ -1952,13 +2393,14 @@ with tab4:
                     st.stop()
 
                 if st.button("Run Model Comparison", key="run_comparison", type="primary"):
-                    with st.spinner("Running model comparison, this may take a while, please wait..."):
+                    with st.spinner("Running model comparison, this may take a while, please wait..."), \
+                            model_manager.training():
                         comparison_results = []
-                        model_builders = {'cnn': build_cnn, 'lstm': build_lstm, 'hybrid': build_hybrid}
-                        filtered_df = bfar_df.copy()
-                        if st.session_state.prediction_params["site"] != 'All Sites':
-                            filtered_df = filtered_df[filtered_df['Site'] == st.session_state.prediction_params["site"]]
-                        filtered_df = filtered_df.sort_values('Date')
+                        grid_settings = (st.session_state.prediction_params.get("frequency", "D"),
+                                         st.session_state.prediction_params.get("interpolation", "linear"))
+                        filtered_df, _ = grid_data(st.session_state.prediction_params["site"], *grid_settings)
+                        grid_df, _ = grid_data('Batch', *grid_settings)
+                        data_site = st.session_state.prediction_params["site"]
                         horizon_days = {"1 Week": 7, "2 Weeks": 14, "1 Month": 30, "3 Months": 90,
                                         "6 Months": 180, "9 Months": 270, "1 Year": 364}[
                             st.session_state.prediction_params["horizon"]]
@@ -1970,53 +2412,79 @@ with tab4:
                                 st.error(f"Insufficient data for {selected_param}.")
                                 st.stop()
 
-                            for model_name, builder in model_builders.items():
-                                model = builder((X_train.shape[1], 1))
+                            for model_name, builder in MODEL_BUILDERS.items():
+                                model = model_manager.track(builder((X_train.shape[1], 1)))
                                 if model is None:
                                     logger.error(f"Failed to build {model_name}.")
                                     continue
                                 callbacks = [
                                     LossHistory(),
                                     EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
-                                    ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5)
+                                    ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5),
+                                    TrainingTimeBudget(st.session_state.get("pred_time_budget", 0))
                                 ]
-                                model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_val, y_val),
-                                          callbacks=callbacks, verbose=0)
+                                train_ds, val_ds = training_datasets((data_site, (selected_param,), 7), X_train, y_train,
+                                                                     X_val, y_val)
+                                with profiler.section("model.fit"):
+                                    model.fit(train_ds, epochs=TRAINING_EPOCHS, validation_data=val_ds,
+                                              callbacks=callbacks, verbose=0)
                                 y_pred = model.predict(X_val, verbose=0).flatten()
                                 y_actual = y_val.flatten()
-                                rmse, mae, r2 = compute_metrics(y_actual, y_pred)
+                                rmse, mae, r2 = compute_metrics(y_actual, y_pred) or UNSCORED
                                 comparison_results.append({
                                     "Model": model_name.upper(),
                                     "RMSE": rmse,
                                     "MAE": mae,
                                     "R²": r2
                                 })
+
+                            # Classical baselines on the same validation split
+                            for model_name in CLASSICAL_FORECASTERS:
+                                _, _, y_pred = classical_site_forecasts(
+                                    model_name, filtered_df, [selected_param], 1,
+                                    season_length=grid_season_length(grid_settings[0]))
+                                rmse, mae, r2 = compute_metrics(y_val.flatten(), y_pred.flatten()) or UNSCORED
+                                comparison_results.append({
+                                    "Model": model_name,
+                                    "RMSE": rmse,
+                                    "MAE": mae,
+                                    "R²": r2
+                                })
                         else:
-                            X_train, y_train, X_val, y_val = prepare_multivariate_data(filtered_df, available_params)
+                            by_site = st.session_state.prediction_params["mode"] == "Batch Forecasting (All Sites)"
+                            if by_site:
+                                data_site = 'Batch'
+                                X_train, y_train, X_val, y_val, _, _, _ = prepare_site_batch_data(grid_df, available_params)
+                            else:
+                                X_train, y_train, X_val, y_val = prepare_multivariate_data(filtered_df, available_params)
                             if X_train is None:
                                 st.error(f"Insufficient multivariate data.")
                                 st.stop()
 
-                            for model_name, builder in model_builders.items():
-                                model = builder((X_train.shape[1], X_train.shape[2]))
+                            for model_name, builder in MODEL_BUILDERS.items():
+                                model = model_manager.track(builder((X_train.shape[1], X_train.shape[2])))
                                 if model is None:
                                     logger.error(f"Failed to build {model_name}.")
                                     continue
                                 callbacks = [
                                     LossHistory(),
                                     EarlyStopping(monitor='val_loss', patience=10, restore_best_weights=True),
-                                    ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5)
+                                    ReduceLROnPlateau(monitor='val_loss', factor=0.5, patience=5),
+                                    TrainingTimeBudget(st.session_state.get("pred_time_budget", 0))
                                 ]
-                                model.fit(X_train, y_train, epochs=50, batch_size=16, validation_data=(X_val, y_val),
-                                          callbacks=callbacks, verbose=0)
+                                train_ds, val_ds = training_datasets((data_site, tuple(available_params), 7), X_train,
+                                                                     y_train, X_val, y_val)
+                                with profiler.section("model.fit"):
+                                    model.fit(train_ds, epochs=TRAINING_EPOCHS, validation_data=val_ds,
+                                              callbacks=callbacks, verbose=0)
                                 y_pred = model.predict(X_val, verbose=0)
-                                metrics = {}
+                                param_metrics = {}
                                 for i, param in enumerate(available_params):
-                                    rmse, mae, r2 = compute_metrics(y_val[:, i], y_pred[:, i])
-                                    metrics[param] = {"rmse": rmse, "mae": mae, "r2": r2}
-                                avg_rmse = np.mean([m["rmse"] for m in metrics.values()])
-                                avg_mae = np.mean([m["mae"] for m in metrics.values()])
-                                avg_r2 = np.mean([m["r2"] for m in metrics.values()])
+                                    rmse, mae, r2 = compute_metrics(y_val[:, i], y_pred[:, i]) or UNSCORED
+                                    param_metrics[param] = {"rmse": rmse, "mae": mae, "r2": r2}
+                                avg_rmse = np.mean([m["rmse"] for m in param_metrics.values()])
+                                avg_mae = np.mean([m["mae"] for m in param_metrics.values()])
+                                avg_r2 = np.mean([m["r2"] for m in param_metrics.values()])
                                 comparison_results.append({
                                     "Model": model_name.upper(),
                                     "RMSE": avg_rmse,
@@ -2024,10 +2492,26 @@ with tab4:
                                     "R²": avg_r2
                                 })
 
-                        st.session_state.comparison_results = comparison_results
+                            # Classical baselines on the same validation split
+                            for model_name in CLASSICAL_FORECASTERS:
+                                _, _, y_pred = classical_site_forecasts(
+                                    model_name, grid_df if by_site else filtered_df, available_params, 1,
+                                    by_site=by_site, season_length=grid_season_length(grid_settings[0]))
+                                param_metrics = [compute_metrics(y_val[:, i], y_pred[:, i]) or UNSCORED
+                                                 for i in range(len(available_params))]
+                                avg_rmse, avg_mae, avg_r2 = np.mean(param_metrics, axis=0)
+                                comparison_results.append({
+                                    "Model": model_name,
+                                    "RMSE": avg_rmse,
+                                    "MAE": avg_mae,
+                                    "R²": avg_r2
+                                })
+
+                        session_results.set("comparison_results", comparison_results)
 
-                if st.session_state.comparison_results:
-                    comp_df = pd.DataFrame(st.session_state.comparison_results)
+                comparison_results = session_results.get("comparison_results")
+                if comparison_results:
+                    comp_df = pd.DataFrame(comparison_results)
                     st.dataframe(comp_df, use_container_width=True)
                     melted_comp = comp_df.melt(id_vars="Model", value_vars=["RMSE", "MAE", "R²"],
                                                var_name="Metric", value_name="Value")
@@ -2045,12 +2529,14 @@ with tab4:
                         yaxis_title="Value",
                         font=dict(family='Montserrat' if font_base64 else 'sans-serif')
                     )
-                    st.plotly_chart(fig_comp, use_container_width=True)
+                    plotly_chart(fig_comp, use_container_width=True)
                 else:
                     st.info("Click 'Run Model Comparison' to compare models.")
 
 
 # ==== About ====
+    prediction_view_timer.end()
+    render_seconds.observe(time.perf_counter() - prediction_view_start, tab="Prediction", view=st.session_state.view)
 with tab_info:
     set_active_tab("About")
     st.markdown(
@@ -2060,14 +2546,14 @@ with tab_info:
     bfar_raw_df = pd.DataFrame()
     philvolcs_raw_df = pd.DataFrame()
     try:
-        bfar_raw_df = pd.read_parquet('datasets/BFAR.parquet', engine='pyarrow')
+        bfar_raw_df = read_dataset('BFAR.parquet')
     except FileNotFoundError:
         st.error("BFAR.parquet not found.")
     except Exception as e:
         st.error(f"Error loading BFAR.parquet: {e}")
 
     try:
-        philvolcs_raw_df = pd.read_parquet('datasets/PHIVOLCS.parquet', engine='pyarrow')
+        philvolcs_raw_df = read_dataset(PHIVOLCS_FILE)
     except FileNotFoundError:
         st.error("PHIVOLCS.parquet not found.")
     except Exception as e:
@@ -2207,6 +2693,19 @@ with tab_info:
                 st.error(f"Error loading {dev['img']}: {e}")
             st.markdown(f"**{dev['name']}**<br>Phone: {dev['phone']}<br>Email: {dev['email']}", unsafe_allow_html=True)
 
+    # Profiling panel for admins, opened with ?admin=<WQ_ADMIN_TOKEN>; timings cover all sessions of this process
+    admin_token = os.environ.get("WQ_ADMIN_TOKEN")
+    if profiler.enabled and admin_token and st.query_params.get("admin") == admin_token:
+        with st.expander("Profiling"):
+            profile_df = pd.DataFrame(profiler.summary())
+            if profile_df.empty:
+                st.info("No timings recorded yet.")
+            else:
+                st.dataframe(profile_df.round(2), use_container_width=True, hide_index=True)
+            st.caption("p50/p95 over the last 500 calls of each section; the rerun row excludes this rerun.")
+            if st.button("Reset Timings", key="reset_profiling"):
+                profiler.reset()
+
 # ==== FOOTER ====
 footer_img = "images/footer.png"
 try:
@@ -2221,3 +2720,7 @@ except FileNotFoundError:
 except Exception as e:
     st.error(f"Error loading {footer_img}: {e}")
 st.markdown("<div class='custom-divider'></div>", unsafe_allow_html=True)
+
+if profiler.enabled:
+    profiler.record("rerun", time.perf_counter() - rerun_start)
+rerun_seconds.observe(time.perf_counter() - rerun_start)
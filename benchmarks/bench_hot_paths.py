@@ -0,0 +1,211 @@
+"""Micro-benchmarks of the dashboard's data hot paths, checked against stored baselines.
+
+Covers both WQI functions, the site and date-range filtering of the
+visualizations, the `prepare_*` windowing functions, `compute_metrics`, and
+the KDE and histogram of the Distributions view. Each case runs on the shipped
+dataset and on copies scaled 10x, 100x and 1000x by adding jittered replicas
+of every site. The functions are imported from wqcore, which the dashboard
+calls too, so the benchmark always measures the code the app runs. Run from
+the repository root:
+
+    python -m benchmarks.bench_hot_paths                     # compare with the baseline, exit 1 on regression
+    python -m benchmarks.bench_hot_paths --save-baseline     # record a new baseline
+    python -m benchmarks.bench_hot_paths --cases calculate_wqi_raw --scales 1 10
+
+A case regresses when its best time exceeds the baseline by more than
+`--threshold` (25%) and by more than `--min-delta` seconds, which keeps
+sub-millisecond cases from failing on timer noise. Baselines are machine
+specific; record one on the machine that runs the comparison.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from wqcore.analytics import compute_metrics, kde_trend
+from wqcore.data import filter_data, numeric_parameters
+from wqcore.windowing import (prepare_multivariate_data, prepare_parameter_batch_data, prepare_site_batch_data,
+                              prepare_univariate_data)
+from wqcore.wqi import forecast_wqi, observed_wqi
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), 'baselines', 'hot_paths.json')
+# Windowing copies every window, about 7 x 14 floats per row; larger inputs are skipped rather than swapped
+MAX_WINDOW_ROWS = 1_000_000
+
+
+def load_dataset(path):
+    df = pd.read_parquet(path, engine='pyarrow')
+    return df, numeric_parameters(df)
+
+
+def scale_dataset(df, params, factor, seed=0):
+    """Append `factor - 1` replicas of every site, with values jittered by 5%, as sites "<site> #k".
+
+    Only Site, Date and `params` are kept, which is all the benchmarked code reads.
+    """
+    df = df[['Site', 'Date'] + params]
+    if factor <= 1:
+        return df.sort_values(['Site', 'Date'], kind='stable').reset_index(drop=True)
+    rng = np.random.default_rng(seed)
+    replicas = [df]
+    for k in range(1, factor):
+        replica = df.copy()
+        replica['Site'] = replica['Site'].astype(str) + f" #{k}"
+        replica[params] = replica[params].to_numpy() * rng.normal(1.0, 0.05, size=(len(df), len(params)))
+        replicas.append(replica)
+    return pd.concat(replicas, ignore_index=True).sort_values(['Site', 'Date'], kind='stable').reset_index(drop=True)
+
+
+def make_cases():
+    """{case: (setup(df, params) -> zero-argument callable, max_rows)}."""
+    def values_dict(df, params, normalized=False):
+        values = {param: df[param].to_numpy(dtype=np.float64) for param in params}
+        if normalized:
+            values = {param: (v - np.nanmin(v)) / (np.nanmax(v) - np.nanmin(v)) for param, v in values.items()}
+        return values
+
+    def wqi_case(wqi, normalized):
+        def setup(df, params):
+            values = values_dict(df, params, normalized)
+            return lambda: wqi(values, params)
+        return setup
+
+    def filter_case(df, params):
+        dates = df['Date'].sort_values()
+        start, end = dates.iloc[len(dates) // 4], dates.iloc[3 * len(dates) // 4]
+        site = str(df['Site'].iloc[0])
+        # The filtering every visualization does before plotting
+        return lambda: filter_data(df, site, start, end)
+
+    def prepare_case(prepare, multi):
+        def setup(df, params):
+            return lambda: prepare(df, params if multi else params[0])
+        return setup
+
+    def metrics_case(df, params):
+        true = df[params[0]].dropna().to_numpy()
+        pred = true * np.random.default_rng(0).normal(1.0, 0.05, size=len(true))
+        return lambda: compute_metrics(true, pred)
+
+    def distribution_case(compute):
+        def setup(df, params):
+            data = df[params[0]].dropna()
+            return lambda: compute(data)
+        return setup
+
+    return {
+        'calculate_wqi_raw': (wqi_case(observed_wqi, False), None),
+        'calculate_wqi_forecast': (wqi_case(forecast_wqi, True), None),
+        'filter_site_dates': (filter_case, None),
+        'prepare_univariate_data': (prepare_case(prepare_univariate_data, False), MAX_WINDOW_ROWS),
+        'prepare_multivariate_data': (prepare_case(prepare_multivariate_data, True), MAX_WINDOW_ROWS),
+        'prepare_site_batch_data': (prepare_case(prepare_site_batch_data, True), MAX_WINDOW_ROWS),
+        'prepare_parameter_batch_data': (prepare_case(prepare_parameter_batch_data, True), MAX_WINDOW_ROWS),
+        'compute_metrics': (metrics_case, None),
+        'kde_trend': (distribution_case(kde_trend), None),
+        'histogram': (distribution_case(lambda data: np.histogram(data, bins=30)), None),
+    }
+
+
+def measure(func, repeat, budget):
+    """Best wall time of up to `repeat` calls after a warm-up call, stopping early once `budget` seconds are spent.
+
+    The minimum is the least noisy estimate on a shared machine: other load only ever adds time.
+    """
+    start = time.perf_counter()
+    func()
+    spent = time.perf_counter() - start
+    times = [spent]
+    while len(times) <= repeat and spent < budget:
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+        spent += times[-1]
+    return float(min(times[1:] or times)), len(times)
+
+
+def load_baseline(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return None
+
+
+def compare(result, baseline, threshold, min_delta):
+    """'new', 'ok', 'faster' or 'REGRESSED' for one case against its baseline entry."""
+    if baseline is None:
+        return 'new'
+    delta = result['best_s'] - baseline['best_s']
+    if delta > threshold * baseline['best_s'] and delta > min_delta:
+        return 'REGRESSED'
+    if -delta > threshold * baseline['best_s'] and -delta > min_delta:
+        return 'faster'
+    return 'ok'
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default='datasets/cleaned_dataset.parquet')
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100, 1000])
+    parser.add_argument('--cases', nargs='+', help='run only these cases')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=5.0, help='seconds after which a case stops repeating')
+    parser.add_argument('--baseline', default=BASELINE_PATH)
+    parser.add_argument('--save-baseline', action='store_true', help='write the results as the new baseline')
+    parser.add_argument('--threshold', type=float, default=0.25, help='allowed slowdown, as a fraction')
+    parser.add_argument('--min-delta', type=float, default=0.005, help='slowdowns below this many seconds pass')
+    args = parser.parse_args()
+
+    cases = make_cases()
+    selected = args.cases or list(cases)
+    unknown = set(selected) - set(cases)
+    if unknown:
+        parser.error(f"unknown cases: {', '.join(sorted(unknown))}; choose from {', '.join(cases)}")
+    stored = load_baseline(args.baseline)
+    baseline_results = (stored or {}).get('results', {})
+    base_df, params = load_dataset(args.data)
+
+    results, regressions = {}, []
+    print(f"{'case':<30}{'scale':>7}{'rows':>10}{'runs':>6}{'best (s)':>13}{'baseline (s)':>14}{'change':>9}  status")
+    for scale in args.scales:
+        df = scale_dataset(base_df, params, scale)
+        for name in selected:
+            setup, max_rows = cases[name]
+            key = f"{name}@{scale}x"
+            if max_rows is not None and len(df) > max_rows:
+                print(f"{name:<30}{scale:>6}x{len(df):>10}{'':>6}{'':>13}{'':>14}{'':>9}  skipped")
+                continue
+            best, runs = measure(setup(df, params), args.repeat, args.budget)
+            results[key] = {'best_s': best, 'rows': len(df), 'runs': runs}
+            previous = baseline_results.get(key)
+            status = compare(results[key], previous, args.threshold, args.min_delta)
+            if status == 'REGRESSED':
+                regressions.append(key)
+            baseline_text = f"{previous['best_s']:>14.5f}" if previous else f"{'-':>14}"
+            change_text = f"{best / previous['best_s'] - 1:>+9.0%}" if previous else f"{'-':>9}"
+            print(f"{name:<30}{scale:>6}x{len(df):>10}{runs:>6}{best:>13.5f}{baseline_text}{change_text}  {status}")
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        merged = {**baseline_results, **results}
+        with open(args.baseline, 'w') as f:
+            json.dump({'recorded': datetime.now().isoformat(timespec='seconds'), 'python': platform.python_version(),
+                       'numpy': np.__version__, 'pandas': pd.__version__, 'machine': platform.machine(),
+                       'cpus': os.cpu_count(), 'results': merged}, f, indent=2, sort_keys=True)
+        print(f"Saved {len(results)} results to {args.baseline}")
+    elif stored is None:
+        print(f"No baseline at {args.baseline}; run with --save-baseline to record one")
+    if regressions:
+        print(f"{len(regressions)} regressions beyond {args.threshold:.0%}: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Epoch time of `model.fit` fed with raw float64 NumPy arrays vs the cached tf.data pipeline.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_input_pipeline --epochs 5 --models cnn lstm hybrid
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+from tensorflow.keras.callbacks import Callback
+
+from wqcore.models import MODEL_BUILDERS
+from wqcore.pipeline import BATCH_SIZE, clear_dataset_cache, training_datasets
+
+EXCLUDED_COLUMNS = ['Date', 'Site', 'Year', 'Month', 'Weather Condition', 'Wind Direction']
+
+
+class EpochTimer(Callback):
+    def __init__(self):
+        super().__init__()
+        self.times = []
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self._start = time.perf_counter()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.times.append(time.perf_counter() - self._start)
+
+
+def load_windows(path, window_size=7, val_split=0.2):
+    df = pd.read_parquet(path, engine='pyarrow').sort_values('Date')
+    params = sorted(col for col in df.select_dtypes(include=np.number).columns
+                    if col not in EXCLUDED_COLUMNS and df[col].notna().any())
+    values = df[params].dropna().values
+    windows = np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0).transpose(0, 2, 1)
+    X, y = windows[:-1], values[window_size:]
+    split_idx = int(len(X) * (1 - val_split))
+    return params, X[:split_idx], y[:split_idx], X[split_idx:], y[split_idx:]
+
+
+def steady_epoch_time(timer):
+    # The first epoch includes graph tracing, so it is reported separately
+    return np.median(timer.times[1:]) if len(timer.times) > 1 else timer.times[0]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default='datasets/cleaned_dataset.parquet')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE)
+    parser.add_argument('--models', nargs='+', default=list(MODEL_BUILDERS), choices=list(MODEL_BUILDERS))
+    args = parser.parse_args()
+
+    params, X_train, y_train, X_val, y_val = load_windows(args.data)
+    print(f"{len(X_train)} train / {len(X_val)} val windows, {len(params)} parameters, "
+          f"batch size {args.batch_size}, {args.epochs} epochs")
+    print(f"{'model':<8}{'input':<10}{'first epoch (s)':>18}{'steady epoch (s)':>18}")
+    for name in args.models:
+        for label in ('numpy', 'tf.data'):
+            clear_dataset_cache()
+            model = MODEL_BUILDERS[name]((X_train.shape[1], X_train.shape[2]))
+            timer = EpochTimer()
+            if label == 'numpy':
+                model.fit(X_train, y_train, epochs=args.epochs, batch_size=args.batch_size,
+                          validation_data=(X_val, y_val), callbacks=[timer], verbose=0)
+            else:
+                train_ds, val_ds = training_datasets(('All Sites', tuple(params), 7), X_train, y_train, X_val, y_val,
+                                                     batch_size=args.batch_size)
+                model.fit(train_ds, epochs=args.epochs, validation_data=val_ds, callbacks=[timer], verbose=0)
+            print(f"{name:<8}{label:<10}{timer.times[0]:>18.3f}{steady_epoch_time(timer):>18.3f}")
+
+
+if __name__ == '__main__':
+    main()
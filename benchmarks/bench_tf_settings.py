@@ -0,0 +1,82 @@
+"""Epochs per second of the CNN, LSTM and Hybrid models under different TensorFlow settings.
+
+Each setting runs in a fresh process, because thread pools cannot be resized
+once TensorFlow is initialized. Run from the repository root:
+
+    python -m benchmarks.bench_tf_settings --epochs 5 --threads 2
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+import numpy as np
+
+from benchmarks.bench_input_pipeline import load_windows
+
+
+def settings_matrix(threads):
+    """(label, settings, input dtype) for each benchmarked configuration."""
+    return [
+        ("default, float64", {}, "float64"),
+        ("default, float32", {}, "float32"),
+        (f"threads {threads}/1", {"intra_op_threads": threads, "inter_op_threads": 1}, "float32"),
+        (f"threads {threads}/1, XLA", {"intra_op_threads": threads, "inter_op_threads": 1, "jit_compile": True},
+         "float32"),
+    ]
+
+
+def run_worker(args):
+    from benchmarks.bench_input_pipeline import EpochTimer, steady_epoch_time
+    from wqcore.models import MODEL_BUILDERS
+    from wqcore.tfconfig import configure_tensorflow
+
+    # Settings are passed explicitly, so tf_config.json and WQ_TF_* variables do not apply here
+    configure_tensorflow(json.loads(args.settings))
+    _, X_train, y_train, X_val, y_val = load_windows(args.data)
+    X_train, y_train, X_val, y_val = (np.ascontiguousarray(a, dtype=args.dtype) for a in (X_train, y_train, X_val, y_val))
+    for name in args.models:
+        model = MODEL_BUILDERS[name]((X_train.shape[1], X_train.shape[2]))
+        timer = EpochTimer()
+        model.fit(X_train, y_train, epochs=args.epochs, batch_size=args.batch_size, validation_data=(X_val, y_val),
+                  callbacks=[timer], verbose=0)
+        print(json.dumps({"model": name, "epochs_per_second": 1.0 / steady_epoch_time(timer)}), flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--data', default='datasets/cleaned_dataset.parquet')
+    parser.add_argument('--epochs', type=int, default=5)
+    parser.add_argument('--batch-size', type=int, default=16)
+    parser.add_argument('--threads', type=int, default=os.cpu_count() or 1)
+    parser.add_argument('--models', nargs='+', default=['cnn', 'lstm', 'hybrid'], choices=['cnn', 'lstm', 'hybrid'])
+    parser.add_argument('--worker', action='store_true', help=argparse.SUPPRESS)
+    parser.add_argument('--settings', default='{}', help=argparse.SUPPRESS)
+    parser.add_argument('--dtype', default='float32', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        run_worker(args)
+        return
+
+    print(f"{args.epochs} epochs, batch size {args.batch_size}, {os.cpu_count()} CPUs")
+    print(f"{'setting':<26}" + "".join(f"{name + ' (ep/s)':>16}" for name in args.models))
+    for label, settings, dtype in settings_matrix(args.threads):
+        cmd = [sys.executable, '-m', 'benchmarks.bench_tf_settings', '--worker', '--data', args.data,
+               '--epochs', str(args.epochs), '--batch-size', str(args.batch_size), '--settings', json.dumps(settings),
+               '--dtype', dtype, '--models', *args.models]
+        proc = subprocess.run(cmd, capture_output=True, text=True)
+        rates = {}
+        for line in proc.stdout.splitlines():
+            if line.startswith('{'):
+                result = json.loads(line)
+                rates[result["model"]] = result["epochs_per_second"]
+        if proc.returncode != 0:
+            print(f"{label:<26}failed: {proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else proc.returncode}")
+            continue
+        print(f"{label:<26}" + "".join(f"{rates.get(name, float('nan')):>16.2f}" for name in args.models))
+
+
+if __name__ == '__main__':
+    main()
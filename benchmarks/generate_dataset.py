@@ -0,0 +1,37 @@
+"""Write a synthetic BFAR, PHIVOLCS and cleaned dataset of any size, in the shipped schemas.
+
+The output directory mirrors datasets/, so the dashboard and every benchmark can
+read it in place of the shipped data. Run from the repository root:
+
+    python -m benchmarks.generate_dataset --sites 100 --years 30 --out datasets/synthetic
+    WQ_DATA_DIR=datasets/synthetic streamlit run Dashboard.py
+    python -m benchmarks.bench_hot_paths --data datasets/synthetic/cleaned_dataset.parquet --scales 1
+"""
+import argparse
+import os
+import time
+
+from wqcore.synthetic import write_dataset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default='datasets/synthetic')
+    parser.add_argument('--sites', type=int, default=100)
+    parser.add_argument('--years', type=int, default=30)
+    parser.add_argument('--start', default='1995-01-01')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--sites-per-chunk', type=int, default=10, help='sites held in memory while writing')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    rows = write_dataset(args.out, args.sites, args.years, args.start, args.seed, args.sites_per_chunk)
+    elapsed = time.perf_counter() - started
+    for name, count in rows.items():
+        size = os.path.getsize(os.path.join(args.out, name)) / 2 ** 20
+        print(f"{name:<26}{count:>12,} rows{size:>10.1f} MB")
+    print(f"{args.sites} sites over {args.years} years written to {args.out} in {elapsed:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
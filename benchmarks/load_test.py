@@ -0,0 +1,192 @@
+"""Concurrent-session load test of Dashboard.py, driven headlessly with Streamlit's AppTest.
+
+Each simulated session opens the dashboard, then performs a random mix of
+interactions: switching visualizations, changing sites and date ranges,
+switching prediction views and running Train and Predict. Training is capped at
+`--epochs` through WQ_TRAINING_EPOCHS. AppTest installs a process-wide mock
+runtime for every run, so concurrent sessions cannot share one interpreter;
+each session runs in its own process and the sessions compete for the same
+CPUs. The report gives throughput, latency percentiles per action and memory
+growth per session from the first page load. Run from the repository root:
+
+    python -m benchmarks.load_test --sessions 4 --actions 20 --epochs 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+
+import numpy as np
+
+from wqcore.lifecycle import process_rss
+
+VISUALIZATIONS = ["Correlation Matrix", "Scatter Plots", "Distributions", "Histogram", "Box Plot", "Line Chart",
+                  "WQI Over Time", "Descriptive Analytics"]
+ACTION_WEIGHTS = {"visualization": 0.35, "site": 0.2, "date_range": 0.2, "prediction_view": 0.1,
+                  "train_predict": 0.15}
+TRAIN_MODELS = ["CNN", "LSTM", "Autoregressive (AR)", "Holt-Winters"]
+TRAIN_HORIZONS = ["1 Week", "2 Weeks", "1 Month"]
+DATA_START, DATA_END = date(2022, 1, 1), date(2023, 12, 31)
+
+
+def _widgets(elements, *suffixes):
+    return [element for element in elements if element.key and element.key.endswith(suffixes)]
+
+
+def switch_visualization(at, rng):
+    option = rng.choice(VISUALIZATIONS)
+    at.button(key=f"vis_button_{option.lower().replace(' ', '_')}").click().run()
+
+
+def change_site(at, rng):
+    selectboxes = _widgets(at.selectbox, "_site", "_site_filter")
+    if not selectboxes:
+        switch_visualization(at, rng)
+        return
+    selectbox = rng.choice(selectboxes)
+    selectbox.select(rng.choice(selectbox.options)).run()
+
+
+def change_date_range(at, rng):
+    starts = _widgets(at.date_input, "_start_date")
+    if not starts:
+        switch_visualization(at, rng)
+        return
+    start_input = rng.choice(starts)
+    end_input = at.date_input(key=start_input.key.replace("_start_date", "_end_date"))
+    start = DATA_START + timedelta(days=rng.randrange(0, 500))
+    start_input.set_value(start)
+    end_input.set_value(min(start + timedelta(days=rng.randrange(30, 365)), DATA_END)).run()
+
+
+def switch_prediction_view(at, rng):
+    at.button(key=f"view_{rng.choice(['results', 'evaluation'])}").click().run()
+
+
+def train_and_predict(at, rng):
+    at.radio(key="prediction_mode").set_value("Individual Parameter").run()
+    at.selectbox(key="pred_model").select(rng.choice(TRAIN_MODELS))
+    at.selectbox(key="pred_param").select(rng.choice(at.selectbox(key="pred_param").options))
+    at.selectbox(key="pred_site").select(rng.choice(at.selectbox(key="pred_site").options[1:]))
+    at.selectbox(key="pred_horizon").select(rng.choice(TRAIN_HORIZONS)).run()
+    at.button(key="train_predict_individual").click().run()
+
+
+ACTIONS = {
+    "visualization": switch_visualization,
+    "site": change_site,
+    "date_range": change_date_range,
+    "prediction_view": switch_prediction_view,
+    "train_predict": train_and_predict,
+}
+
+
+def sample_memory(samples, stop, interval=0.5):
+    while not stop.is_set():
+        samples.append(process_rss() or 0)
+        stop.wait(interval)
+
+
+def run_session(index, args):
+    """Open the dashboard and perform `args.actions` interactions; returns (records, RSS samples after opening)."""
+    from streamlit.testing.v1 import AppTest
+
+    os.environ["WQ_TRAINING_EPOCHS"] = str(args.epochs)
+    rng = random.Random(args.seed + index)
+    records, rss_samples, stop = [], [], threading.Event()
+    started = time.perf_counter()
+    at = AppTest.from_file(args.script, default_timeout=args.timeout)
+    at.run()
+    records.append(("open", time.perf_counter() - started, bool(at.exception)))
+    monitor = threading.Thread(target=sample_memory, args=(rss_samples, stop), daemon=True)
+    monitor.start()
+    names, weights = zip(*ACTION_WEIGHTS.items())
+    for _ in range(args.actions):
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        try:
+            ACTIONS[name](at, rng)
+            failed = bool(at.exception)
+        except Exception:
+            failed = True
+        records.append((name, time.perf_counter() - started, failed))
+    stop.set()
+    monitor.join()
+    rss_samples.append(process_rss() or 0)
+    return records, rss_samples
+
+
+def summarize(sessions, elapsed):
+    records = [record for session_records, _ in sessions for record in session_records]
+    by_action = {}
+    for name, seconds, failed in records:
+        by_action.setdefault(name, ([], []))
+        by_action[name][0].append(seconds)
+        by_action[name][1].append(failed)
+    actions = {}
+    for name, (latencies, failures) in sorted(by_action.items()):
+        p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+        actions[name] = {"count": len(latencies), "errors": int(sum(failures)), "p50_s": p50, "p95_s": p95,
+                         "p99_s": p99, "max_s": max(latencies)}
+    memory = []
+    for _, rss_samples in sessions:
+        rss = np.array(rss_samples, dtype=np.float64) / 2 ** 20
+        memory.append({"start_mb": rss[0], "end_mb": rss[-1], "peak_mb": rss.max(), "growth_mb": rss[-1] - rss[0]})
+    return {
+        "sessions": len(sessions),
+        "actions": len(records),
+        "errors": int(sum(failed for _, _, failed in records)),
+        "elapsed_s": elapsed,
+        "throughput_per_s": len(records) / elapsed if elapsed else 0.0,
+        "latency": actions,
+        "memory": memory,
+        "rss_total_end_mb": sum(session["end_mb"] for session in memory),
+        "rss_growth_mean_mb": float(np.mean([session["growth_mb"] for session in memory])) if memory else 0.0,
+    }
+
+
+def print_report(report):
+    print(f"{report['sessions']} sessions, {report['actions']} actions in {report['elapsed_s']:.1f}s "
+          f"({report['throughput_per_s']:.2f} actions/s), {report['errors']} errors")
+    print(f"{'action':<18}{'count':>7}{'errors':>8}{'p50 (s)':>10}{'p95 (s)':>10}{'p99 (s)':>10}{'max (s)':>10}")
+    for name, stats in report["latency"].items():
+        print(f"{name:<18}{stats['count']:>7}{stats['errors']:>8}{stats['p50_s']:>10.3f}{stats['p95_s']:>10.3f}"
+              f"{stats['p99_s']:>10.3f}{stats['max_s']:>10.3f}")
+    for index, session in enumerate(report["memory"]):
+        print(f"session {index}: RSS {session['start_mb']:.0f} MB -> {session['end_mb']:.0f} MB "
+              f"(peak {session['peak_mb']:.0f} MB, growth {session['growth_mb']:+.0f} MB)")
+    print(f"RSS total {report['rss_total_end_mb']:.0f} MB, mean growth per session "
+          f"{report['rss_growth_mean_mb']:+.0f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--script', default='Dashboard.py')
+    parser.add_argument('--sessions', type=int, default=4)
+    parser.add_argument('--actions', type=int, default=20, help='interactions per session after opening it')
+    parser.add_argument('--epochs', type=int, default=2, help='training epoch limit (WQ_TRAINING_EPOCHS)')
+    parser.add_argument('--timeout', type=float, default=600, help='seconds allowed for a single rerun')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='also write the report to this path')
+    args = parser.parse_args()
+
+    context = multiprocessing.get_context("spawn")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=args.sessions, mp_context=context) as pool:
+        sessions = list(pool.map(run_session, range(args.sessions), [args] * args.sessions))
+    elapsed = time.perf_counter() - started
+
+    report = summarize(sessions, elapsed)
+    print_report(report)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2, default=float)
+
+
+if __name__ == '__main__':
+    main()
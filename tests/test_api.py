@@ -0,0 +1,66 @@
+import http.client
+import json
+import threading
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from wqcore.api import QueryService, make_handler
+from wqcore.data import PHIVOLCS_FILE, WATER_QUALITY_FILE, DatasetStore
+from wqcore.registry import ModelRegistry
+
+
+@pytest.fixture
+def server(tmp_path):
+    """The API over a two-site dataset, on a free local port."""
+    dates = pd.date_range("2023-01-01", periods=30, freq="D")
+    rng = np.random.default_rng(0)
+    pd.DataFrame({"Site": np.repeat(["A", "B"], 30), "Date": np.tile(dates, 2),
+                  "pH": rng.uniform(size=60), "Nitrate": rng.uniform(size=60)}).to_parquet(
+        tmp_path / WATER_QUALITY_FILE)
+    pd.DataFrame({"Date": dates, "SO2": rng.uniform(size=30)}).to_parquet(tmp_path / PHIVOLCS_FILE)
+    service = QueryService(DatasetStore(str(tmp_path)), ModelRegistry(str(tmp_path / "models")))
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service, max_age=30))
+    threading.Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def get(server, path, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_port, timeout=10)
+    try:
+        connection.request("GET", path, headers=headers or {})
+        response = connection.getresponse()
+        return response.status, dict(response.getheaders()), response.read()
+    finally:
+        connection.close()
+
+
+def test_matching_etag_gets_empty_304(server):
+    status, headers, body = get(server, "/series?site=A&params=pH")
+    assert status == 200 and json.loads(body)["rows"] == 30
+    assert headers["Cache-Control"] == "private, max-age=30"
+    etag = headers["ETag"]
+
+    status, headers, body = get(server, "/series?site=A&params=pH", {"If-None-Match": etag})
+    assert (status, headers["ETag"], body) == (304, etag, b"")
+    assert headers["Content-Length"] == "0"
+
+    status, _, body = get(server, "/series?site=A&params=pH", {"If-None-Match": '"stale"'})
+    assert status == 200 and json.loads(body)["rows"] == 30
+
+
+def test_etag_follows_the_response(server):
+    etags = {get(server, path)[1]["ETag"] for path in ("/series?site=A&params=pH", "/series?site=B&params=pH",
+                                                       "/series?params=pH&site=A")}
+    assert len(etags) == 2
+
+
+def test_uncacheable_responses_carry_no_etag(server):
+    for path, expected in (("/health", 200), ("/series?site=C", 400), ("/nowhere", 404)):
+        status, headers, _ = get(server, path, {"If-None-Match": "*"})
+        assert status == expected
+        assert "ETag" not in headers and headers["Cache-Control"] == "no-store"
@@ -0,0 +1,67 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
+from wqcore.cache import ResultCache
+
+
+def test_concurrent_callers_share_one_computation():
+    cache = ResultCache()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "result"
+
+    with ThreadPoolExecutor(4) as pool:
+        leader = pool.submit(cache.get_or_compute, "key", compute)
+        started.wait(5)
+        followers = [pool.submit(cache.get_or_compute, "key", compute) for _ in range(3)]
+        release.set()
+        assert leader.result() == ("result", False)
+        assert [f.result() for f in followers] == [("result", True)] * 3
+    assert len(calls) == 1
+
+
+def test_failures_are_not_cached():
+    cache = ResultCache()
+    started, release = threading.Event(), threading.Event()
+
+    def fail():
+        started.set()
+        release.wait(5)
+        raise RuntimeError("boom")
+
+    with ThreadPoolExecutor(2) as pool:
+        leader = pool.submit(cache.get_or_compute, "key", fail)
+        started.wait(5)
+        follower = pool.submit(cache.get_or_compute, "key", lambda: "retried")
+        release.set()
+        with pytest.raises(RuntimeError):
+            leader.result()
+        assert follower.result() == ("retried", False)
+    assert cache.get_or_compute("key", lambda: "unused") == ("retried", True)
+
+
+def test_least_recently_used_results_are_evicted():
+    value = np.zeros(100)
+    cache = ResultCache(max_bytes=2 * value.nbytes)
+    cache.put("a", value)
+    cache.put("b", value.copy())
+    cache.get("a")
+    cache.put("c", value.copy())
+    assert cache.get("b") is None
+    assert cache.get("a") is value
+    assert cache.size == 2 * value.nbytes
+
+
+def test_results_over_budget_are_not_cached():
+    cache = ResultCache(max_bytes=100)
+    value, cached = cache.get_or_compute("big", lambda: np.zeros(100))
+    assert len(value) == 100 and not cached
+    assert len(cache) == 0 and cache.size == 0
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+from wqcore.registry import ModelRegistry, grid_registry_key
+from wqcore.training import warm_start_model
+
+
+class FakeModel:
+    """Saves an empty file, counts the windows it is fitted on and reports a fixed validation loss."""
+
+    def __init__(self, val_loss=0.1):
+        self.val_loss = val_loss
+        self.fitted_windows = 0
+
+    def save(self, path):
+        open(path, 'w').close()
+
+    def fit(self, dataset, **kwargs):
+        self.fitted_windows += sum(len(X) for X, _ in dataset)
+
+    def evaluate(self, dataset, verbose=0):
+        return self.val_loss
+
+
+def windows(n, start="2023-01-01"):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(size=(n, 7, 2)).astype(np.float32)
+    y = rng.uniform(size=(n, 2)).astype(np.float32)
+    return X, y, pd.date_range(start, periods=n, freq="D").values
+
+
+def test_versions_count_per_site_and_params(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    first = registry.register(FakeModel(), "cnn", "MANALAW", ["pH"], "2023-01-10", 0.2)
+    second = registry.register(FakeModel(), "cnn", "MANALAW", ["pH"], "2023-02-10", 0.1)
+    other = registry.register(FakeModel(), "cnn", "MANALAW", ["pH", "Nitrate"], "2023-02-10", 0.1)
+    assert (first['version'], second['version'], other['version']) == (1, 2, 1)
+    assert registry.latest("cnn", "MANALAW", ["pH"])['path'] == second['path']
+    assert registry.latest("cnn", "LEVISTE", ["pH"]) is None
+    assert registry.latest("cnn", "MANALAW", ["pH"])['trained_through'] == "2023-02-10T00:00:00"
+    assert len(ModelRegistry(str(tmp_path)).entries("cnn")) == 3
+
+
+def test_grid_registry_key():
+    assert grid_registry_key("cnn", "D") == "cnn"
+    assert grid_registry_key("cnn", "MS") == "cnn_monthly"
+
+
+def test_warm_start_without_model(tmp_path):
+    X, y, dates = windows(30)
+    assert warm_start_model(ModelRegistry(str(tmp_path)), "cnn", "MANALAW", ["pH"], X, y, X, y, dates) == \
+        (None, "no_model")
+
+
+def test_warm_start_reuses_model_without_new_windows(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y, dates = windows(30)
+    registry.register(FakeModel(), "cnn", "MANALAW", ["pH"], dates[-1], 0.1)
+    model = FakeModel()
+    assert warm_start_model(registry, "cnn", "MANALAW", ["pH"], X, y, X[:5], y[:5], dates,
+                            load=lambda entry: model) == (model, "reused")
+    assert model.fitted_windows == 0
+
+
+def test_warm_start_fine_tunes_on_windows_after_cutoff(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y, dates = windows(30)
+    registry.register(FakeModel(), "cnn", "MANALAW", ["pH"], dates[19], 0.1)
+    model = FakeModel(val_loss=0.12)
+    assert warm_start_model(registry, "cnn", "MANALAW", ["pH"], X, y, X[:5], y[:5], dates,
+                            load=lambda entry: model) == (model, "fine_tuned")
+    assert model.fitted_windows == 10
+
+
+def test_warm_start_falls_back_on_drift(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    X, y, dates = windows(30)
+    registry.register(FakeModel(), "cnn", "MANALAW", ["pH"], dates[19], 0.1)
+    model = FakeModel(val_loss=0.2)
+    assert warm_start_model(registry, "cnn", "MANALAW", ["pH"], X, y, X[:5], y[:5], dates,
+                            load=lambda entry: model) == (None, "drift")
+    assert model.fitted_windows == 10
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from wqcore.resample import regular_grid, site_mean
+
+
+def observations():
+    """Site A has a two-day gap; site B starts after A ends, with a NaN reading on its second day."""
+    return pd.DataFrame({
+        "Site": ["A", "A", "A", "B", "B", "B"],
+        "Date": pd.to_datetime(["2023-01-01", "2023-01-02", "2023-01-05",
+                                "2023-01-08", "2023-01-09", "2023-01-10"]),
+        "pH": [1.0, 2.0, 5.0, 10.0, np.nan, 30.0],
+    })
+
+
+def test_grid_covers_each_site_from_first_to_last_bin():
+    grid, gaps = regular_grid(observations(), ["pH"])
+    assert grid.groupby("Site")["Date"].agg(["min", "max", "count"]).values.tolist() == [
+        [pd.Timestamp("2023-01-01"), pd.Timestamp("2023-01-05"), 5],
+        [pd.Timestamp("2023-01-08"), pd.Timestamp("2023-01-10"), 3]]
+    assert gaps["pH"].tolist() == [False, False, True, True, False, False, True, False]
+
+
+@pytest.mark.parametrize("method, expected", [
+    ("linear", [1, 2, 3, 4, 5, 10, 20, 30]),
+    ("ffill", [1, 2, 2, 2, 5, 10, 10, 30]),
+    ("none", [1, 2, np.nan, np.nan, 5, 10, np.nan, 30]),
+])
+def test_gaps_are_filled_within_sites(method, expected):
+    grid, _ = regular_grid(observations(), ["pH"], method=method)
+    np.testing.assert_allclose(grid["pH"], expected)
+
+
+def test_gaps_longer_than_max_gap_stay_missing():
+    grid, gaps = regular_grid(observations(), ["pH"], max_gap=1)
+    np.testing.assert_allclose(grid["pH"], [1, 2, np.nan, np.nan, 5, 10, 20, 30])
+    assert gaps["pH"].sum() == 3
+
+
+def test_monthly_bins_average_their_rows():
+    df = pd.DataFrame({"Site": "A", "Date": pd.to_datetime(["2023-01-03", "2023-01-20", "2023-04-01"]),
+                       "pH": [1.0, 3.0, 8.0]})
+    grid, gaps = regular_grid(df, ["pH"], frequency="MS")
+    assert grid["Date"].tolist() == list(pd.date_range("2023-01-01", "2023-04-01", freq="MS"))
+    np.testing.assert_allclose(grid["pH"], [2, 4, 6, 8])
+    assert gaps["pH"].tolist() == [False, True, True, False]
+
+
+def test_site_mean_gap_only_when_every_site_missed_the_bin():
+    df = observations()
+    df.loc[df["Site"] == "B", "Date"] -= pd.Timedelta(days=7)
+    grid, gaps = regular_grid(df, ["pH"], method="none")
+    mean, mean_gaps = site_mean(grid, gaps, ["pH"])
+    np.testing.assert_allclose(mean["pH"], [5.5, 2, 30, np.nan, 5])
+    assert mean_gaps["pH"].tolist() == [False, False, False, True, False]
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from wqcore.models import MODEL_BUILDERS, build_model
+from wqcore.runtime import NumpyModel, export_model
+
+SMALL = {'cnn': {'filters': 16, 'dense_units': 8}, 'lstm': {'units': 8}, 'hybrid': {'filters': 16, 'units': 8}}
+
+
+@pytest.mark.parametrize("model_key", sorted(MODEL_BUILDERS))
+def test_numpy_runtime_matches_keras(model_key, tmp_path):
+    rng = np.random.default_rng(0)
+    X = rng.uniform(size=(64, 7, 3)).astype(np.float32)
+    y = rng.uniform(size=(64, 3)).astype(np.float32)
+    model = build_model(model_key, X.shape[1:], SMALL[model_key])
+    # One epoch moves the batch-normalization statistics away from their initial values
+    model.fit(X, y, epochs=1, batch_size=16, verbose=0)
+
+    path = str(tmp_path / f"{model_key}.npz")
+    exported = export_model(model, path, sample=X[:8])
+    loaded = NumpyModel.load(path)
+    expected = model.predict(X, verbose=0)
+    np.testing.assert_allclose(exported.predict(X), expected, atol=1e-4)
+    np.testing.assert_allclose(loaded.predict(X), expected, atol=1e-4)
+    assert loaded.nbytes == sum(w.nbytes for w in model.get_weights())
@@ -0,0 +1,39 @@
+import numpy as np
+
+from wqcore.forecasting import forecast_intervals
+from wqcore.wqi import forecast_wqi, wqi_samples
+
+
+class NoisyModel:
+    """Predicts 0.3 for every parameter, with ±0.01 noise when sampling."""
+
+    def predict_stochastic(self, X, rng):
+        return 0.3 + rng.uniform(-0.01, 0.01, size=(X.shape[0], X.shape[2])).astype(np.float32)
+
+
+def test_wqi_samples_match_forecast_wqi():
+    rng = np.random.default_rng(0)
+    values = {"pH": rng.uniform(-0.5, 1.5, (20, 5)), "Nitrate": rng.uniform(0, 1, (20, 5))}
+    values["Nitrate"][3, 2] = np.nan
+    samples = wqi_samples(values, ["pH", "Nitrate"])
+    for i in range(20):
+        wqi, _ = forecast_wqi({param: path[i] for param, path in values.items()}, ["pH", "Nitrate"])
+        np.testing.assert_allclose(samples[i], wqi)
+
+
+def test_point_wqi_lies_inside_band():
+    params = ["pH", "Nitrate"]
+    point_wqi, _ = forecast_wqi({param: np.full(10, 0.3) for param in params}, params)
+    intervals = forecast_intervals(NoisyModel(), np.full((7, 2), 0.3), 10, params, params)
+    assert np.all(intervals["wqi_lower"] <= point_wqi)
+    assert np.all(point_wqi <= intervals["wqi_upper"])
+    assert np.all(intervals["wqi_upper"] - intervals["wqi_lower"] < 2)
+
+
+def test_point_wqi_lies_inside_band_with_context():
+    params = ["pH", "Nitrate", "Ammonia"]
+    context = {"Nitrate": np.full(10, 0.6), "Ammonia": np.full(10, np.nan)}
+    point_wqi, _ = forecast_wqi({"pH": np.full(10, 0.3), **context}, params)
+    intervals = forecast_intervals(NoisyModel(), np.full((7, 1), 0.3), 10, ["pH"], params, context=context)
+    assert np.all(intervals["wqi_lower"] <= point_wqi)
+    assert np.all(point_wqi <= intervals["wqi_upper"])
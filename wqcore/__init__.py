@@ -0,0 +1 @@
+"""Compute helpers for the Water Quality Dashboard that can be used without Streamlit."""
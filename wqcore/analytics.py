@@ -0,0 +1,78 @@
+"""Summary statistics behind the Visualizations tab and the forecast evaluation.
+
+All functions take plain frames or arrays. The statistics return None for
+inputs too small to summarize, so callers can show their own message.
+"""
+import logging
+
+import numpy as np
+from scipy.stats import gaussian_kde
+from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
+
+logger = logging.getLogger(__name__)
+
+# (RMSE, MAE, R²) shown for a forecast that `compute_metrics` could not score
+UNSCORED = (np.nan, np.nan, np.nan)
+
+STATISTICS = {
+    'count': 'Count',
+    'mean': 'Mean',
+    'std': 'Std Dev',
+    'min': 'Min',
+    '25%': 'Q1',
+    '50%': 'Median',
+    '75%': 'Q3',
+    'max': 'Max'
+}
+KDE_POINTS = 100
+
+
+def correlation_matrix(df, params, min_rows=2):
+    """Pearson correlations of `params` over the rows where all of them are present, rounded to 2 decimals."""
+    corr_df = df[params].dropna()
+    if len(corr_df) < min_rows:
+        return None
+    return corr_df.corr().round(2)
+
+
+def descriptive_stats(df, params):
+    """Count, mean, standard deviation, min, quartiles and max of every parameter, one row each."""
+    if not params:
+        return None
+    stats_df = df[params].describe().T
+    stats_df = stats_df[list(STATISTICS)].rename(columns=STATISTICS)
+    return stats_df.round(2)
+
+
+def kde_trend(data, points=KDE_POINTS):
+    """(x, density) of a Gaussian KDE evaluated on `points` points across the range of `data`.
+
+    Returns None when there are fewer than two distinct values.
+    """
+    if len(data) < 2 or data.nunique() < 2:
+        return None
+    kde = gaussian_kde(data)
+    x_range = np.linspace(data.min(), data.max(), points)
+    return x_range, kde(x_range)
+
+
+def compute_metrics(true, pred):
+    """(RMSE, MAE, R²) of a forecast over the points where both values are finite.
+
+    Classical forecasters have no one-step prediction during their warm-up, so those NaN points
+    are dropped rather than scored. None when no point is left or the metrics cannot be computed.
+    """
+    true = np.asarray(true, dtype=np.float64).ravel()
+    pred = np.asarray(pred, dtype=np.float64).ravel()
+    finite = np.isfinite(true) & np.isfinite(pred)
+    if not finite.any():
+        return None
+    true, pred = true[finite], pred[finite]
+    try:
+        rmse = np.sqrt(mean_squared_error(true, pred))
+        mae = mean_absolute_error(true, pred)
+        r2 = r2_score(true, pred) if len(true) > 1 else 0
+        return rmse, mae, r2
+    except Exception as e:
+        logger.error(f"Error computing metrics: {str(e)}")
+        return None
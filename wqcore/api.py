@@ -0,0 +1,318 @@
+"""Local JSON API serving the dashboard's series, statistics, WQI and forecasts.
+
+The API runs as its own process next to the dashboard. It reads the same data
+directory through `DatasetStore`, computes with the same `wqcore` functions and
+forecasts with the models the dashboard registered in `models/`, using the
+NumPy runtime. It needs no network access beyond its own socket. Every endpoint
+is a GET and takes optional `site` (default "All Sites"), `start`, `end` and
+`params` (comma separated, default all) query arguments:
+
+    /health                     dataset version, rows, sites and cache use
+    /sites, /parameters         names accepted by the other endpoints
+    /series                     the filtered parameter series, by column
+    /wqi                        WQI and remarks over time
+    /correlation                correlation matrix of `params`
+    /stats                      descriptive statistics of `params`
+    /forecast                   forecast and forecast WQI; also `model`, `horizon_days`, `frequency`
+                                (D or MS) and `interpolation`
+    /metrics                    request counts and latencies in the Prometheus text format
+
+Responses are cached in a `ResultCache` keyed by endpoint, arguments and
+dataset version (and registry contents for forecasts), so repeated queries
+are served without recomputing and concurrent identical queries compute once.
+They carry an ETag, and a matching If-None-Match gets an empty 304. Connections
+use HTTP/1.1 keep-alive:
+
+    python -m wqcore.api --port 8503
+    curl 'http://127.0.0.1:8503/wqi?site=LEVISTE&start=2023-01-01&params=pH,Ammonia,Nitrate'
+"""
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import numpy as np
+import pandas as pd
+
+from wqcore.analytics import correlation_matrix, descriptive_stats
+from wqcore.cache import ResultCache
+from wqcore.classical import CLASSICAL_FORECASTERS
+from wqcore.data import ALL_SITES, DATA_DIR, DatasetStore
+from wqcore.forecasting import REGISTERED_MODELS, site_forecast
+from wqcore.lifecycle import ModelManager
+from wqcore.metrics import CONTENT_TYPE, MetricsRegistry
+from wqcore.registry import ModelRegistry
+from wqcore.resample import INTERPOLATION_METHODS, STEP_DAYS, forecast_dates, horizon_steps, regular_grid, site_mean
+from wqcore.wqi import forecast_wqi, observed_wqi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PORT = 8503
+API_CACHE_BYTES = 128 * 1024 * 1024
+MAX_AGE = 60
+# Idle keep-alive connections are closed after this many seconds
+KEEP_ALIVE_TIMEOUT = 30
+MAX_HORIZON_DAYS = 366
+
+
+def _column(values):
+    """JSON-ready list of a column: dates as ISO strings, NaN as null."""
+    values = pd.Series(values)
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values.dt.strftime('%Y-%m-%d').tolist()
+    return [None if isinstance(value, float) and np.isnan(value) else value for value in values.tolist()]
+
+
+def _columns(df):
+    return {str(name): _column(column) for name, column in df.items()}
+
+
+class QueryService:
+    """The API endpoints as methods over a dataset store, model registry, model LRU and response cache.
+
+    `handle` returns (status, body, etag) for a path and parsed query, so the service can be used
+    without the HTTP server.
+    """
+
+    ENDPOINTS = ('health', 'sites', 'parameters', 'series', 'wqi', 'correlation', 'stats', 'forecast')
+
+    def __init__(self, store=None, registry=None, cache=None, metrics=None, models=None):
+        self.store = store or DatasetStore()
+        self.registry = registry or ModelRegistry()
+        self.models = models or ModelManager()
+        self.cache = cache or ResultCache(API_CACHE_BYTES)
+        self.metrics = metrics or MetricsRegistry()
+        self.requests = self.metrics.counter("wq_api_requests", "API requests by endpoint and status",
+                                             ("endpoint", "status"))
+        self.cache_requests = self.metrics.counter("wq_api_cache_requests", "API requests by response cache outcome",
+                                                   ("endpoint", "result"))
+        self.latency = self.metrics.histogram("wq_api_seconds", "API response latency", ("endpoint",))
+
+    # ---- arguments ----
+    def _site(self, query):
+        site = query.get('site', [ALL_SITES])[0]
+        if site != ALL_SITES and site not in self.store.sites():
+            raise ValueError(f"unknown site: {site}")
+        return site
+
+    def _params(self, query, minimum=1):
+        available = self.store.parameters()
+        names = [name for value in query.get('params', []) for name in value.split(',') if name]
+        params = names or available
+        unknown = [param for param in params if param not in available]
+        if unknown:
+            raise ValueError(f"unknown parameters: {', '.join(unknown)}")
+        if len(params) < minimum:
+            raise ValueError(f"at least {minimum} parameters are required")
+        return params
+
+    def _dates(self, query):
+        dates = []
+        for name in ('start', 'end'):
+            value = query.get(name, [None])[0]
+            try:
+                dates.append(pd.Timestamp(value) if value else None)
+            except ValueError:
+                raise ValueError(f"invalid {name} date: {value}")
+        if dates[0] is not None and dates[1] is not None and dates[0] > dates[1]:
+            raise ValueError("start date cannot be after end date")
+        return dates
+
+    def _filtered(self, query, minimum=1):
+        site, params = self._site(query), self._params(query, minimum)
+        start, end = self._dates(query)
+        return site, params, start, end, self.store.filter(site, start, end, params)
+
+    # ---- endpoints ----
+    def health(self, query):
+        df = self.store.water_quality
+        return {"status": "ok", "dataset_version": self.store.version(), "rows": len(df),
+                "sites": len(self.store.sites()), "cached_responses": len(self.cache),
+                "cache_bytes": self.cache.size}
+
+    def sites(self, query):
+        return {"sites": self.store.sites()}
+
+    def parameters(self, query):
+        return {"parameters": self.store.parameters()}
+
+    def series(self, query):
+        site, params, _, _, df = self._filtered(query)
+        return {"site": site, "params": params, "rows": len(df), "data": _columns(df)}
+
+    def wqi(self, query):
+        site, params, _, _, df = self._filtered(query)
+        wqi, remarks = observed_wqi({param: df[param].to_numpy(dtype=np.float64) for param in params}, params)
+        return {"site": site, "params": params, "rows": len(df),
+                "data": {"Site": _column(df['Site']), "Date": _column(df['Date']), "Water Quality Index": _column(wqi),
+                         "WQI Remarks": remarks}}
+
+    def correlation(self, query):
+        site, params, _, _, df = self._filtered(query, minimum=2)
+        matrix = correlation_matrix(df, params)
+        if matrix is None:
+            raise ValueError("not enough data points to calculate correlation")
+        return {"site": site, "params": params, "rows": len(df),
+                "matrix": [_column(matrix[param]) for param in params]}
+
+    def stats(self, query):
+        site, params, _, _, df = self._filtered(query)
+        stats = descriptive_stats(df, params)
+        return {"site": site, "params": params, "rows": len(df),
+                "data": _columns(stats.rename_axis("Parameter").reset_index())}
+
+    def forecast(self, query):
+        site, params, start, end, df = self._filtered(query)
+        model = query.get('model', ["Holt-Winters"])[0]
+        if model not in CLASSICAL_FORECASTERS and model not in REGISTERED_MODELS:
+            raise ValueError(f"unknown model: {model}; choose from "
+                             f"{', '.join(list(CLASSICAL_FORECASTERS) + list(REGISTERED_MODELS))}")
+        frequency = query.get('frequency', ["D"])[0]
+        interpolation = query.get('interpolation', ["linear"])[0]
+        if frequency not in STEP_DAYS:
+            raise ValueError(f"unknown frequency: {frequency}; choose from {', '.join(STEP_DAYS)}")
+        if interpolation not in INTERPOLATION_METHODS.values():
+            raise ValueError(f"unknown interpolation: {interpolation}")
+        try:
+            horizon_days = int(query.get('horizon_days', ["30"])[0])
+        except ValueError:
+            raise ValueError("horizon_days must be an integer")
+        if not 1 <= horizon_days <= MAX_HORIZON_DAYS:
+            raise ValueError(f"horizon_days must be between 1 and {MAX_HORIZON_DAYS}")
+        if df.empty:
+            raise ValueError("no data in the selected period")
+
+        grid, gaps = regular_grid(df, params, frequency, interpolation)
+        if site == ALL_SITES:
+            grid, _ = site_mean(grid, gaps, params)
+        steps = horizon_steps(horizon_days, frequency)
+        predictions, note = site_forecast(grid, site, params, model, steps, self.registry, frequency,
+                                          models=self.models)
+        result = {"site": site, "params": params, "model": model, "frequency": frequency, "note": note}
+        if predictions is None:
+            return {**result, "dates": [], "values": {}, "wqi": [], "remarks": []}
+        dates = forecast_dates(len(predictions), frequency, pd.Timestamp.today().normalize())
+        wqi, remarks = forecast_wqi({param: predictions[:, i] for i, param in enumerate(params)}, params)
+        return {**result, "dates": _column(dates), "values": {param: _column(predictions[:, i])
+                                                             for i, param in enumerate(params)},
+                "wqi": _column(wqi), "remarks": remarks}
+
+    # ---- dispatch ----
+    def _registry_version(self):
+        try:
+            return os.path.getmtime(self.registry.index_path)
+        except OSError:
+            return None
+
+    def cache_key(self, endpoint, query):
+        key = (endpoint, tuple(sorted((name, tuple(values)) for name, values in query.items())),
+               self.store.version())
+        if endpoint == 'forecast':
+            # Forecasts are dated from today and may come from newly registered models
+            key += (pd.Timestamp.today().date().isoformat(), self._registry_version())
+        return key
+
+    def _respond(self, endpoint, query):
+        payload = getattr(self, endpoint)(query)
+        body = json.dumps(payload, separators=(',', ':'), allow_nan=False).encode()
+        return body, f'"{hashlib.sha1(body).hexdigest()[:16]}"'
+
+    def handle(self, path, query):
+        """(status, body, etag) of a GET for `path` with `query` as parsed by `parse_qs`."""
+        endpoint = path.strip('/') or 'health'
+        started = time.perf_counter()
+        if endpoint not in self.ENDPOINTS:
+            status, body, etag = 404, json.dumps({"error": f"unknown endpoint: {path}"}).encode(), None
+            endpoint = 'unknown'
+        elif endpoint == 'health':
+            status, body, etag = 200, json.dumps(self.health(query)).encode(), None
+        else:
+            try:
+                (body, etag), cached = self.cache.get_or_compute(self.cache_key(endpoint, query),
+                                                                 lambda: self._respond(endpoint, query))
+                status = 200
+                self.cache_requests.inc(endpoint=endpoint, result="hit" if cached else "miss")
+            except ValueError as e:
+                status, body, etag = 400, json.dumps({"error": str(e)}).encode(), None
+            except Exception as e:
+                logger.error(f"Error serving {path}: {str(e)}")
+                status, body, etag = 500, json.dumps({"error": "internal error"}).encode(), None
+        self.requests.inc(endpoint=endpoint, status=str(status))
+        self.latency.observe(time.perf_counter() - started, endpoint=endpoint)
+        return status, body, etag
+
+
+def make_handler(service, max_age=MAX_AGE):
+    class Handler(BaseHTTPRequestHandler):
+        # HTTP/1.1 keeps connections open between requests; every response carries a Content-Length
+        protocol_version = "HTTP/1.1"
+        timeout = KEEP_ALIVE_TIMEOUT
+
+        def _send(self, status, body, content_type="application/json", headers=()):
+            self.send_response(status)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            for name, value in headers:
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(body)
+
+        def do_GET(self):
+            url = urlsplit(self.path)
+            if url.path == "/metrics":
+                self._send(200, service.metrics.render().encode(), CONTENT_TYPE)
+                return
+            status, body, etag = service.handle(url.path, parse_qs(url.query))
+            if etag is None:
+                self._send(status, body, headers=[("Cache-Control", "no-store")])
+            elif self.headers.get("If-None-Match") == etag:
+                self._send(304, b"", headers=[("ETag", etag)])
+            else:
+                self._send(status, body, headers=[("ETag", etag), ("Cache-Control", f"private, max-age={max_age}")])
+
+        do_HEAD = do_GET
+
+        def log_message(self, format, *args):
+            logger.debug("%s - " + format, self.address_string(), *args)
+
+    return Handler
+
+
+def main():
+    from wqcore.logs import TEXT_FORMAT
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=int(os.environ.get("WQ_API_PORT", DEFAULT_PORT)))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--cache-mb', type=float, default=API_CACHE_BYTES / 2 ** 20,
+                        help='memory budget of cached responses')
+    parser.add_argument('--max-age', type=int, default=MAX_AGE, help='seconds clients may reuse a response')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format=TEXT_FORMAT)
+
+    store = DatasetStore(args.data_dir)
+    if store.water_quality.empty:
+        parser.error(f"no water quality data in {args.data_dir}")
+    logger.info(f"Loaded {len(store.water_quality)} rows of {len(store.sites())} sites, "
+                f"dataset version {store.version()}")
+    service = QueryService(store, ModelRegistry(args.models_dir), ResultCache(int(args.cache_mb * 2 ** 20)))
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(service, args.max_age))
+    server.daemon_threads = True
+    logger.info(f"Serving the query API on http://{args.host}:{server.server_port}/")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+"""Rolling-origin backtesting.
+
+For each series (one per site) the history is cut at several origins, the
+model forecasts `horizon` steps from each cutoff and the forecasts are scored
+against what actually followed. Forecasts for every (series, cutoff) pair run
+together: windowed models get one batched call per step, classical forecasters
+are refit per fold on a thread pool. A trained model is only scored on cutoffs
+after its training data, so every fold is out of sample. Results can be cached
+as JSON, e.g. per registered model version and dataset version.
+"""
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MIN_TRAIN_ROWS = 30
+
+
+def rolling_origins(n_rows, horizon, n_folds=5, min_train=MIN_TRAIN_ROWS):
+    """Cutoff row indices, latest last; consecutive test windows overlap only when the history is short."""
+    last = n_rows - horizon
+    if last < min_train:
+        return []
+    step = max(1, min(horizon, (last - min_train) // max(n_folds - 1, 1)))
+    return sorted({last - step * k for k in range(n_folds) if last - step * k >= min_train})
+
+
+def model_forecaster(model, window_size):
+    """Recursive forecasts of a windowed model (Keras or NumpyModel) for all origins, one call per step."""
+    def forecast(histories, horizon):
+        windows = np.stack([history[-window_size:] for history in histories]).astype(np.float32)
+        predictions = np.empty((len(histories), horizon, windows.shape[2]))
+        for step in range(horizon):
+            pred = np.asarray(model.predict_on_batch(windows))
+            predictions[:, step] = pred
+            windows = np.concatenate([windows[:, 1:], pred[:, None, :]], axis=1)
+        return predictions
+    return forecast
+
+
+def classical_forecaster(forecaster, season_length, max_workers=None):
+    """Refit a classical forecaster (see wqcore.classical) on every fold's history, `season_length` steps per season."""
+    def forecast(histories, horizon):
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            return np.stack(list(pool.map(
+                lambda history: forecaster(history, horizon, season_length=season_length)[0], histories)))
+    return forecast
+
+
+def backtest_metrics(actual, predicted):
+    """RMSE, MAE and R² per fold and parameter, plus RMSE per lead time, for (folds, horizon, params) arrays."""
+    errors = predicted - actual
+    sse = np.sum(errors ** 2, axis=1)
+    sst = np.sum((actual - actual.mean(axis=1, keepdims=True)) ** 2, axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r2 = np.where(sst > 0, 1 - sse / sst, np.nan)
+    return {
+        "rmse": np.sqrt(sse / actual.shape[1]),
+        "mae": np.mean(np.abs(errors), axis=1),
+        "r2": r2,
+        "lead_rmse": np.sqrt(np.mean(errors ** 2, axis=0)),
+    }
+
+
+def run_backtest(series, forecast, horizon, n_folds=5, dates=None, min_train=MIN_TRAIN_ROWS, cache_path=None,
+                 after=None):
+    """Backtest `forecast(histories, horizon)` over rolling origins of every array in `series`.
+
+    `series` is a list of NaN-free (T, P) arrays and `dates` the matching date arrays (for labelling
+    cutoffs). With `after`, e.g. a model's training cutoff, only forecasts starting after that date
+    are scored. Returns a JSON-serialisable dict, read from / written to `cache_path` when given.
+    """
+    if cache_path and os.path.exists(cache_path):
+        with open(cache_path) as f:
+            return json.load(f)
+
+    histories, actuals, folds = [], [], []
+    for i, values in enumerate(series):
+        series_min_train = min_train
+        if after is not None:
+            first_unseen = np.searchsorted(dates[i], np.datetime64(pd.Timestamp(after)), side='right')
+            series_min_train = max(min_train, int(first_unseen))
+        for cutoff in rolling_origins(len(values), horizon, n_folds, series_min_train):
+            histories.append(values[:cutoff])
+            actuals.append(values[cutoff:cutoff + horizon])
+            label = str(pd.Timestamp(dates[i][cutoff]).date()) if dates is not None else int(cutoff)
+            folds.append({"series": i, "cutoff": label})
+    if not folds:
+        logger.warning(f"Not enough history for a {horizon}-step backtest"
+                       + (f" after {after}" if after is not None else ""))
+        return None
+
+    predictions = forecast(histories, horizon)
+    metrics = backtest_metrics(np.stack(actuals), predictions)
+    results = {"horizon": horizon, "folds": folds, **{k: v.tolist() for k, v in metrics.items()}}
+    logger.info(f"Backtested {len(folds)} folds over {len(series)} series, {horizon} steps")
+
+    if cache_path:
+        with open(cache_path, 'w') as f:
+            json.dump(results, f)
+    return results
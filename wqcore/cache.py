@@ -0,0 +1,122 @@
+"""Process-wide cache of prediction results shared by all sessions.
+
+Identical requests are deduplicated while in flight: the first caller computes,
+later callers with the same key block until it finishes and get the same
+result. Finished results are kept in LRU order and the least recently used
+ones are evicted once their estimated size exceeds the memory budget.
+"""
+import hashlib
+import logging
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MAX_CACHE_BYTES = 256 * 1024 * 1024
+
+
+def estimate_size(value):
+    """Approximate memory held by a result: arrays and frames by their buffers, containers recursively."""
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, pd.Categorical):
+        return value.nbytes
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(usage, pd.Series) else int(usage)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(estimate_size(k) + estimate_size(v) for k, v in value.items())
+    if isinstance(value, (list, tuple, set)):
+        return sys.getsizeof(value) + sum(estimate_size(v) for v in value)
+    return sys.getsizeof(value)
+
+
+class _InFlight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.failed = False
+
+
+class ResultCache:
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._entries:
+                return None
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def get_or_compute(self, key, compute):
+        """Return (value, cached) for `key`, calling `compute()` at most once across concurrent callers.
+
+        If the computing caller raises, the exception propagates to it and waiting callers retry
+        the computation themselves; failures are never cached.
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    return self._entries[key][0], True
+                flight = self._in_flight.get(key)
+                leader = flight is None
+                if leader:
+                    flight = self._in_flight[key] = _InFlight()
+            if leader:
+                break
+            logger.info(f"Waiting for in-flight computation of {key}")
+            flight.done.wait()
+            if not flight.failed:
+                return flight.value, True
+
+        try:
+            value = compute()
+        except BaseException:
+            flight.failed = True
+            raise
+        else:
+            flight.value = value
+            self.put(key, value)
+            return value, False
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+            flight.done.set()
+
+    def put(self, key, value):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self.size -= self._entries.pop(key)[1]
+            if size > self.max_bytes:
+                logger.warning(f"Result for {key} ({size} bytes) exceeds the cache budget, not cached")
+                return
+            self._entries[key] = (value, size)
+            self.size += size
+            while self.size > self.max_bytes:
+                evicted, (_, evicted_size) = self._entries.popitem(last=False)
+                self.size -= evicted_size
+                logger.info(f"Evicted cached result {evicted} ({evicted_size} bytes)")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+def dataset_version(df):
+    """Content hash of a dataset, so cached results are invalidated when the data changes."""
+    return hashlib.sha1(pd.util.hash_pandas_object(df, index=False).values.tobytes()).hexdigest()[:12]
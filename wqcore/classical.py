@@ -0,0 +1,142 @@
+"""Classical forecasters that need no training run.
+
+Each forecaster takes a NaN-free `(T, P)` array (one column per parameter) and
+works on every parameter at once. It returns `(forecast, fitted)`: the
+`(horizon, P)` forecast after the last row and the `(T, P)` one-step-ahead
+predictions, where `fitted[t]` only uses rows before `t` (NaN where a model
+has no prediction yet). `train_size` limits the rows used to estimate model
+coefficients so the tail can serve as a validation split.
+
+The season length (and AR order) follows the time grid: a week of daily
+steps or a year of monthly ones, see `grid_season_length`.
+"""
+import itertools
+
+import numpy as np
+
+SEASON_LENGTH = 7
+# One season of the time grids in wqcore.resample: a week of days, a year of months
+SEASON_LENGTHS = {"D": 7, "MS": 12}
+# Holt-Winters smoothing constants searched per parameter: (alpha, beta, gamma, phi)
+SMOOTHING_GRID = np.array(list(itertools.product(
+    (0.05, 0.1, 0.2, 0.3, 0.5, 0.7, 0.9),
+    (0.0, 0.02, 0.05, 0.1, 0.2),
+    (0.0, 0.05, 0.1, 0.2, 0.4),
+    (0.8, 0.9, 0.98),
+)))
+
+
+def grid_season_length(frequency):
+    """Season length in steps of a grid of `frequency` ("D" or "MS")."""
+    return SEASON_LENGTHS.get(frequency, SEASON_LENGTH)
+
+
+def seasonal_naive(values, horizon, train_size=None, season_length=SEASON_LENGTH):
+    """Repeat the last season; it has no coefficients, so `train_size` changes nothing."""
+    values = np.asarray(values, dtype=float)
+    season_length = min(season_length, len(values))
+    last_season = values[-season_length:]
+    forecast = last_season[np.arange(horizon) % season_length]
+    fitted = np.full_like(values, np.nan)
+    fitted[season_length:] = values[:-season_length]
+    return forecast, fitted
+
+
+def _holt_winters_pass(values, season_length, alpha, beta, gamma, phi, sse_rows=None):
+    """Run the damped additive recursion over `values` (T, P) for (C, 1) or (1, P) smoothing constants.
+
+    Returns the final (level, trend, seasonal) state, shaped (C, P) per season, and either the (T, C, P)
+    one-step predictions or, with `sse_rows`, their squared error summed over rows `season_length` to
+    `sse_rows`.
+    """
+    first, second = values[:season_length], values[season_length:2 * season_length]
+    shape = (max(len(alpha), 1), values.shape[1])
+    level = np.broadcast_to(first.mean(axis=0), shape).copy()
+    trend = np.broadcast_to((second.mean(axis=0) - first.mean(axis=0)) / season_length, shape).copy()
+    seasonal = np.broadcast_to((first - first.mean(axis=0))[:, None], (season_length,) + shape).copy()
+
+    sse = np.zeros(shape)
+    fitted = np.empty((len(values),) + shape) if sse_rows is None else None
+    for t in range(len(values) if sse_rows is None else sse_rows):
+        s = t % season_length
+        season = seasonal[s]
+        damped_trend = phi * trend
+        expected = level + damped_trend
+        if fitted is not None:
+            fitted[t] = expected + season
+        elif t >= season_length:
+            sse += (values[t] - expected - season) ** 2
+        new_level = alpha * (values[t] - season) + (1 - alpha) * expected
+        trend = beta * (new_level - level) + (1 - beta) * damped_trend
+        seasonal[s] = gamma * (values[t] - new_level) + (1 - gamma) * season
+        level = new_level
+    return (level, trend, seasonal), (fitted if fitted is not None else sse)
+
+
+def fit_smoothing(values, season_length, train_size=None):
+    """(alpha, beta, gamma, phi), each (P,), minimising the one-step squared error of the first `train_size` rows.
+
+    Every candidate of `SMOOTHING_GRID` runs at once, as one recursion over a (candidates, P) state.
+    """
+    train_size = len(values) if train_size is None else train_size
+    alpha, beta, gamma, phi = (SMOOTHING_GRID[:, i, None] for i in range(4))
+    _, sse = _holt_winters_pass(values, season_length, alpha, beta, gamma, phi, sse_rows=train_size)
+    return SMOOTHING_GRID[np.argmin(sse, axis=0)].T
+
+
+def holt_winters(values, horizon, train_size=None, season_length=SEASON_LENGTH):
+    """Additive Holt-Winters with a damped trend, so long horizons level off instead of diverging.
+
+    The smoothing constants of every parameter are fitted on the first `train_size` rows.
+    """
+    values = np.asarray(values, dtype=float)
+    steps = len(values)
+    train_size = steps if train_size is None else min(train_size, steps)
+    if train_size < 2 * season_length + 1:
+        return seasonal_naive(values, horizon, train_size, season_length=season_length)
+    alpha, beta, gamma, phi = (constant[None] for constant in fit_smoothing(values, season_length, train_size))
+    (level, trend, seasonal), fitted = _holt_winters_pass(values, season_length, alpha, beta, gamma, phi)
+
+    damping = np.cumsum(phi[0] ** np.arange(1, horizon + 1)[:, None], axis=0)
+    forecast = level[0] + damping * trend[0] + seasonal[(steps + np.arange(horizon)) % season_length, 0]
+    return forecast, fitted[:, 0]
+
+
+def autoregressive(values, horizon, train_size=None, season_length=SEASON_LENGTH, order=None, ridge=1e-6):
+    """AR(order) with intercept, one least-squares fit per parameter solved as a single batched system.
+
+    The order defaults to one season, so the lags cover the seasonal cycle.
+    """
+    order = order or season_length
+    values = np.asarray(values, dtype=float)
+    steps, n_params = values.shape
+    train_size = steps if train_size is None else train_size
+    if train_size < 2 * order + 1:
+        return seasonal_naive(values, horizon, season_length=order)
+
+    # Design matrices (P, T - order, order + 1): lagged values plus an intercept column
+    lags = np.lib.stride_tricks.sliding_window_view(values, order, axis=0)[:-1].transpose(1, 0, 2)
+    design = np.concatenate([lags, np.ones(lags.shape[:2] + (1,))], axis=2)
+    targets = values[order:].T
+
+    train_rows = train_size - order
+    A, b = design[:, :train_rows], targets[:, :train_rows]
+    gram = np.einsum('pni,pnj->pij', A, A) + ridge * np.eye(order + 1)
+    coef = np.linalg.solve(gram, np.einsum('pni,pn->pi', A, b)[..., None])[..., 0]
+
+    fitted = np.full_like(values, np.nan)
+    fitted[order:] = np.einsum('pni,pi->np', design, coef)
+
+    # Recursive forecast over a buffer holding the last `order` rows followed by the forecasts
+    weights, intercept = coef[:, :order].T, coef[:, order]
+    buffer = np.concatenate([values[-order:], np.empty((horizon, n_params))])
+    for k in range(horizon):
+        buffer[order + k] = (buffer[k:order + k] * weights).sum(axis=0) + intercept
+    return buffer[order:], fitted
+
+
+CLASSICAL_FORECASTERS = {
+    "Seasonal Naive": seasonal_naive,
+    "Holt-Winters": holt_winters,
+    "Autoregressive (AR)": autoregressive,
+}
@@ -0,0 +1,117 @@
+"""Dataset loading, parameter discovery and filtering, without Streamlit.
+
+`read_dataset` reads one parquet file of the data directory (`datasets/`, or
+the path in `WQ_DATA_DIR`). `DatasetStore` reads the cleaned water-quality
+dataset and the PHIVOLCS bulletins once and shares them read-only between
+threads, so batch jobs and worker processes see the same frames the dashboard
+does:
+
+    store = DatasetStore()
+    params = store.parameters()
+    site_df = store.filter(site="Site A", start_date="2023-01-01", params=params)
+"""
+import logging
+import os
+import threading
+
+import numpy as np
+import pandas as pd
+
+from wqcore.cache import dataset_version
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = os.environ.get("WQ_DATA_DIR", "datasets")
+WATER_QUALITY_FILE = "cleaned_dataset.parquet"
+PHIVOLCS_FILE = "PHIVOLCS.parquet"
+# Numeric columns that are identifiers or encoded categories rather than measured parameters
+EXCLUDED_COLUMNS = ['Date', 'Site', 'Year', 'Month', 'Weather Condition', 'Wind Direction']
+PHIVOLCS_EXCLUDED_COLUMNS = ['Year', 'Month', 'Day', 'Latitude', 'Longitude']
+ALL_SITES = 'All Sites'
+
+
+def read_dataset(name, data_dir=None):
+    """The parquet file `name` of `data_dir`; raises if it is missing or unreadable."""
+    return pd.read_parquet(os.path.join(data_dir or DATA_DIR, name), engine='pyarrow')
+
+
+def numeric_parameters(df, excluded=EXCLUDED_COLUMNS):
+    """Sorted numeric columns of `df` with at least one value, other than the `excluded` ones."""
+    return sorted([col for col in df.select_dtypes(include=np.number).columns
+                   if col not in excluded and df[col].notna().any()])
+
+
+def filter_data(df, site=None, start_date=None, end_date=None, sites=None):
+    """Rows of `df` at `site` (or any of `sites`) between the optional start and end dates, inclusive.
+
+    A `site` of None or "All Sites" keeps every site. Dates may be anything `pd.to_datetime` accepts.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    if site is not None and site != ALL_SITES:
+        mask &= (df['Site'] == site).to_numpy()
+    if sites is not None:
+        mask &= df['Site'].isin(sites).to_numpy()
+    if start_date is not None:
+        mask &= (df['Date'] >= pd.to_datetime(start_date)).to_numpy()
+    if end_date is not None:
+        mask &= (df['Date'] <= pd.to_datetime(end_date)).to_numpy()
+    return df[mask]
+
+
+class DatasetStore:
+    """The water-quality and PHIVOLCS frames of one data directory, read on first use.
+
+    A file that cannot be read leaves an empty frame and is logged. The frames are
+    shared, so callers must copy before modifying them.
+    """
+
+    def __init__(self, data_dir=None):
+        self.data_dir = data_dir or DATA_DIR
+        self._frames = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._frames is None:
+                frames = []
+                for name in (WATER_QUALITY_FILE, PHIVOLCS_FILE):
+                    try:
+                        frames.append(read_dataset(name, self.data_dir))
+                    except Exception as e:
+                        logger.error(f"Error loading {name}: {str(e)}")
+                        frames.append(pd.DataFrame())
+                self._frames = tuple(frames)
+            return self._frames
+
+    @property
+    def water_quality(self):
+        return self._load()[0]
+
+    @property
+    def phivolcs(self):
+        return self._load()[1]
+
+    def version(self):
+        """Content hash of the water-quality frame, for cache keys."""
+        if self._version is None:
+            self._version = dataset_version(self.water_quality)
+        return self._version
+
+    def parameters(self):
+        df = self.water_quality
+        return numeric_parameters(df) if not df.empty else []
+
+    def sites(self):
+        df = self.water_quality
+        return sorted(df['Site'].astype(str).unique()) if not df.empty else []
+
+    def filter(self, site=None, start_date=None, end_date=None, params=None):
+        """Water-quality rows of `site` between the dates, sorted by date, optionally only Site, Date and `params`."""
+        df = self.water_quality
+        if df.empty:
+            return df
+        filtered = filter_data(df, site, start_date, end_date)
+        if params is not None:
+            filtered = filtered[['Site', 'Date'] + list(params)]
+        return filtered.sort_values('Date', kind='stable')
@@ -0,0 +1,171 @@
+"""Recursive forecasts of the windowed models and the classical forecasters.
+
+The `predict_*` functions feed every prediction back as the newest row of the
+window, one `model.predict` call per step; `model` may be a Keras model or a
+`wqcore.runtime.NumpyModel`. Like the windowing functions, they log errors and
+return an empty array (None for intervals) instead of raising.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from wqcore.classical import CLASSICAL_FORECASTERS, SEASON_LENGTH, grid_season_length
+from wqcore.registry import grid_registry_key
+from wqcore.uncertainty import mc_dropout_forecast, quantile_bands
+from wqcore.windowing import prepare_multivariate_prediction_data
+from wqcore.wqi import wqi_samples
+
+logger = logging.getLogger(__name__)
+
+# Windowed models whose trained versions are read from the model registry, by registry key
+REGISTERED_MODELS = {"CNN": "cnn", "LSTM": "lstm", "Hybrid CNN-LSTM": "hybrid"}
+
+
+def predict_univariate(model, X, horizon):
+    """`horizon` steps of one parameter after the last window of X."""
+    try:
+        predictions = []
+        current_input = X[-1].copy()
+        for _ in range(horizon):
+            pred = model.predict(current_input.reshape(1, current_input.shape[0], 1), verbose=0)
+            predictions.append(pred[0, 0])
+            current_input = np.roll(current_input, -1)
+            current_input[-1] = pred[0, 0]
+        predictions = np.array(predictions).flatten()
+        logger.debug("Univariate predictions for %s steps: %s", horizon, predictions[:5])
+        return predictions
+    except Exception as e:
+        logger.error(f"Error in univariate prediction: {str(e)}")
+        return np.array([])
+
+
+def predict_multivariate(model, X, horizon, params):
+    """(horizon, P) forecast after the last window of X."""
+    try:
+        predictions = []
+        current_input = X[-1].copy()
+        for _ in range(horizon):
+            pred = model.predict(current_input.reshape(1, current_input.shape[0], current_input.shape[1]), verbose=0)
+            predictions.append(pred[0])
+            current_input = np.roll(current_input, -1, axis=0)
+            current_input[-1] = pred[0]
+        predictions = np.array(predictions)
+        logger.debug("Multivariate predictions for %s: %s", params, predictions[:5])
+        return predictions
+    except Exception as e:
+        logger.error(f"Error in multivariate prediction: {str(e)}")
+        return np.array([])
+
+
+def forecast_intervals(model, window, horizon, params, wqi_params, context=None):
+    """Monte-Carlo dropout bands for each of `params` and for the WQI of `wqi_params`.
+
+    `context` holds the fixed series of WQI parameters that are not forecast.
+    """
+    try:
+        samples = mc_dropout_forecast(model, window, horizon)
+        bands = quantile_bands(samples)
+        wqi_values = {param: samples[:, :, i] for i, param in enumerate(params)}
+        for param, values in (context or {}).items():
+            wqi_values[param] = np.broadcast_to(values, samples.shape[:2])
+        wqi_bands = quantile_bands(wqi_samples(wqi_values, wqi_params))
+        logger.info(f"Monte-Carlo dropout intervals from {len(samples)} samples, {horizon} steps")
+        return {
+            "lower": {param: bands[0, :, i] for i, param in enumerate(params)},
+            "upper": {param: bands[1, :, i] for i, param in enumerate(params)},
+            "wqi_lower": wqi_bands[0],
+            "wqi_upper": wqi_bands[1]
+        }
+    except Exception as e:
+        logger.error(f"Error computing prediction intervals: {str(e)}")
+        return None
+
+
+def predict_multivariate_batch(model, last_windows, horizon):
+    """(series, horizon, P) forecasts of every window in `last_windows`, one batched call per step."""
+    try:
+        n_sites, _, n_params = last_windows.shape
+        predictions = np.empty((n_sites, horizon, n_params))
+        current_input = last_windows.copy()
+        for step in range(horizon):
+            pred = np.asarray(model.predict_on_batch(current_input))
+            predictions[:, step] = pred
+            current_input = np.concatenate([current_input[:, 1:], pred[:, None, :]], axis=1)
+        logger.info(f"Batch predictions for {n_sites} sites, {horizon} steps")
+        return predictions
+    except Exception as e:
+        logger.error(f"Error in batch prediction: {str(e)}")
+        return np.array([])
+
+
+def classical_site_forecasts(model_name, data, params, horizon, by_site=False, window_size=7,
+                             val_split=0.2, season_length=SEASON_LENGTH):
+    """Classical forecasts need no training; their one-step predictions cover the same validation split.
+
+    `data` is one series, or one per site when `by_site`, on a grid of `season_length` steps per season. Returns (sites, forecasts, fitted): the site of
+    every series, the (series, horizon, P) forecasts and the one-step predictions of the validation windows of every series, concatenated.
+    The one-step predictions stay aligned with the validation targets, NaN where a forecaster is still warming up; `compute_metrics`
+    scores only their finite points.
+    """
+    forecaster = CLASSICAL_FORECASTERS[model_name]
+    groups = data.groupby('Site', sort=True) if by_site else [(None, data)]
+    forecast_sites, forecasts, fitted = [], [], []
+    for site, site_df in groups:
+        values = site_df.sort_values('Date', kind='stable')[params].dropna().values
+        if len(values) < window_size + 2:
+            continue
+        n_windows = len(values) - window_size
+        n_val = n_windows - int(n_windows * (1 - val_split))
+        forecast, site_fitted = forecaster(values, horizon, train_size=len(values) - n_val,
+                                           season_length=season_length)
+        forecast_sites.append(str(site))
+        forecasts.append(forecast)
+        fitted.append(site_fitted[-n_val:])
+    if not forecasts:
+        return None, np.array([]), np.array([])
+    logger.info(f"{model_name} forecasts for {len(forecasts)} series, {horizon} steps")
+    return forecast_sites, np.stack(forecasts), np.concatenate(fitted)
+
+
+def build_forecast_table(predictions, batch_sites, dates, params):
+    """Long table of Site, Date, Parameter and Value from (sites, horizon, P) predictions."""
+    n_sites, horizon, n_params = predictions.shape
+    return pd.DataFrame({
+        "Site": np.repeat(batch_sites, horizon * n_params),
+        "Date": np.tile(np.repeat(dates.values, n_params), n_sites),
+        "Parameter": np.tile(params, n_sites * horizon),
+        "Value": predictions.reshape(-1)
+    })
+
+
+def site_forecast(grid, site, params, model_name, horizon, registry=None, frequency="D", models=None):
+    """(forecast, note) of one site's regular grid, where `forecast` is (horizon, P) or None.
+
+    Classical forecasters are fitted on the spot. The windowed models use the latest version in
+    `registry` for the site, `params` and grid (see `grid_registry_key`), run through the
+    NumPy runtime, loaded through the `models` ModelManager when given; `note` then names the
+    version. When there is no forecast, `note` says why.
+    """
+    if model_name in CLASSICAL_FORECASTERS:
+        _, forecasts, _ = classical_site_forecasts(model_name, grid, params, horizon,
+                                                   season_length=grid_season_length(frequency))
+        if not len(forecasts):
+            return None, "not enough data to forecast"
+        return forecasts[0], None
+    registry_key = grid_registry_key(REGISTERED_MODELS[model_name], frequency)
+    entry = registry.latest(registry_key, site, params) if registry is not None else None
+    if entry is None:
+        return None, f"no registered {model_name} model for these parameters"
+    window_size = (entry.get('hyperparameters') or {}).get('window_size', 7)
+    X = prepare_multivariate_prediction_data(grid, params, window_size)
+    if X.shape[0] == 0:
+        return None, "not enough data to forecast"
+    if models is not None:
+        runtime_model = models.get(entry['runtime_path'], lambda: registry.load_runtime(entry))
+    else:
+        runtime_model = registry.load_runtime(entry)
+    predictions = predict_multivariate(runtime_model, X, horizon, params)
+    if predictions.size == 0:
+        return None, "forecast failed"
+    return predictions, f"{model_name} v{entry['version']} trained through {entry['trained_through']}"
@@ -0,0 +1,161 @@
+"""Lifecycle of the Keras models held by a dashboard process.
+
+`ModelManager` keeps registered models, Keras or `wqcore.runtime.NumpyModel`,
+in an LRU bounded by the memory of their weights and optimizer state: models
+are loaded with `get(key, loader)` and newly registered ones added with
+`put`, keyed by their file path. It also tracks every model built for
+training. When the last training scope exits, or a cached model is evicted, it
+clears the Keras session, collects garbage and hands freed heap back to the
+OS, so worker RSS stays flat across reruns. `memory_usage()` reports the
+current footprint.
+"""
+import ctypes
+import ctypes.util
+import gc
+import logging
+import os
+import sys
+import threading
+import weakref
+from collections import OrderedDict
+from contextlib import contextmanager
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+MAX_MODEL_BYTES = 512 * 1024 * 1024
+
+
+def model_memory(model):
+    """Bytes held by a model's weights and optimizer variables."""
+    if hasattr(model, 'nbytes'):
+        return int(model.nbytes)
+    variables = list(model.weights)
+    optimizer = getattr(model, 'optimizer', None)
+    if optimizer is not None and getattr(optimizer, 'built', False):
+        variables += list(optimizer.variables)
+    return int(sum(np.prod(v.shape, dtype=np.int64) * np.dtype(getattr(v.dtype, 'as_numpy_dtype', v.dtype)).itemsize
+                   for v in variables))
+
+
+def process_rss():
+    """Resident set size of this process in bytes.
+
+    Falls back to the peak RSS reported by getrusage where /proc is unavailable, and to None
+    where neither is.
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, IndexError, ValueError, AttributeError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _malloc_trim():
+    # glibc keeps freed TensorFlow buffers in its arenas; trimming returns them to the OS
+    libc_path = ctypes.util.find_library('c')
+    if libc_path is None:
+        return
+    try:
+        ctypes.CDLL(libc_path).malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+
+
+class ModelManager:
+    def __init__(self, max_bytes=MAX_MODEL_BYTES):
+        self.max_bytes = max_bytes
+        self._models = OrderedDict()
+        self._live = weakref.WeakSet()
+        self._active = 0
+        self._lock = threading.RLock()
+
+    def get(self, key, loader):
+        """Return the cached model for `key`, loading it with `loader()` on a miss."""
+        with self._lock:
+            if key in self._models:
+                self._models.move_to_end(key)
+                return self._models[key][0]
+        with self.training():
+            return self.put(key, loader())
+
+    def put(self, key, model):
+        """Cache `model` under `key` as the most recently used, evicting the least recent ones over budget."""
+        size = model_memory(model)
+        with self._lock:
+            self._models[key] = (model, size)
+            self._models.move_to_end(key)
+            self._live.add(model)
+            evicted = []
+            while len(self._models) > 1 and sum(s for _, s in self._models.values()) > self.max_bytes:
+                evicted.append(self._models.popitem(last=False)[0])
+        for evicted_key in evicted:
+            logger.info(f"Evicted model {evicted_key} from memory")
+        if evicted:
+            self.collect()
+        return model
+
+    def track(self, model):
+        """Count a freshly built model in `memory_usage()` for as long as it is referenced."""
+        if model is not None:
+            with self._lock:
+                self._live.add(model)
+        return model
+
+    @contextmanager
+    def training(self):
+        """Scope for building, loading or training models; memory is released when the last scope exits."""
+        with self._lock:
+            self._active += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self._active -= 1
+            self.collect()
+
+    def collect(self):
+        """Clear the Keras session and free memory, unless a training scope is active. Returns whether it ran.
+
+        Processes that only hold NumPy runtime models never import TensorFlow here.
+        """
+        with self._lock:
+            if self._active:
+                return False
+            if 'tensorflow' in sys.modules:
+                from tensorflow.keras.backend import clear_session
+                clear_session(free_memory=True)
+            else:
+                gc.collect()
+            _malloc_trim()
+        return True
+
+    def evict(self, key=None):
+        """Drop one cached model, or all of them, and release their memory."""
+        with self._lock:
+            if key is None:
+                self._models.clear()
+            else:
+                self._models.pop(key, None)
+        self.collect()
+
+    def memory_usage(self):
+        with self._lock:
+            cached_bytes = sum(size for _, size in self._models.values())
+            live = list(self._live)
+            return {
+                "cached_models": len(self._models),
+                "cached_bytes": cached_bytes,
+                "live_models": len(live),
+                "live_bytes": sum(model_memory(model) for model in live),
+                "active_trainings": self._active,
+                "process_rss": process_rss(),
+            }
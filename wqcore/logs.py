@@ -0,0 +1,122 @@
+"""Non-blocking logging for the dashboard process.
+
+`configure_logging` routes every record through a queue: request threads only
+enqueue, and a background listener formats and writes them, as plain text to
+stderr and as JSON lines to a rotating file. Records keep their arguments until
+the listener formats them, so array previews logged with %-style arguments are
+rendered off the request path. DEBUG records from the dashboard loggers, which
+carry array dumps, are sampled: one in `debug_sample_rate` per call site is
+kept, and none when the rate is 0.
+
+    WQ_LOG_LEVEL=INFO WQ_LOG_FILE=dashboard.log WQ_LOG_DEBUG_SAMPLE=100 streamlit run Dashboard.py
+"""
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import threading
+from collections import defaultdict
+from datetime import datetime, timezone
+
+LOG_FILE = "dashboard.log"
+MAX_LOG_BYTES = 10 * 1024 * 1024
+BACKUP_COUNT = 5
+TEXT_FORMAT = '%(asctime)s - %(levelname)s - %(message)s'
+
+_listener = None
+_lock = threading.Lock()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "thread": record.threadName,
+            "location": f"{record.module}:{record.lineno}",
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class DebugSampler(logging.Filter):
+    """Keep every record above DEBUG and one in `rate` DEBUG records per call site."""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+        self._seen = defaultdict(int)
+
+    def filter(self, record):
+        if record.levelno > logging.DEBUG:
+            return True
+        if self.rate <= 0:
+            return False
+        key = (record.pathname, record.lineno)
+        self._seen[key] += 1
+        return (self._seen[key] - 1) % self.rate == 0
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """Enqueue records unformatted; only tracebacks are rendered here, while the frames still exist."""
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+
+def _env_int(name, default):
+    try:
+        return int(os.environ.get(name, default))
+    except ValueError:
+        return default
+
+
+def configure_logging(path=None, level=None, debug_loggers=(), debug_sample_rate=None,
+                      max_bytes=MAX_LOG_BYTES, backup_count=BACKUP_COUNT):
+    """Install the queue handler on the root logger and start the writer thread, once per process.
+
+    `debug_loggers` are set to DEBUG when sampling is on, so their array dumps reach the sampler.
+    """
+    global _listener
+    with _lock:
+        if _listener is not None:
+            return _listener
+        path = path or os.environ.get("WQ_LOG_FILE", LOG_FILE)
+        level = level or os.environ.get("WQ_LOG_LEVEL", "INFO").upper()
+        rate = _env_int("WQ_LOG_DEBUG_SAMPLE", 0) if debug_sample_rate is None else debug_sample_rate
+
+        stream_handler = logging.StreamHandler()
+        stream_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+        file_handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backup_count,
+                                                            encoding='utf-8')
+        file_handler.setFormatter(JsonFormatter())
+
+        log_queue = queue.SimpleQueue()
+        queue_handler = DeferredQueueHandler(log_queue)
+        queue_handler.addFilter(DebugSampler(rate))
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            if isinstance(handler, (logging.FileHandler, DeferredQueueHandler)):
+                root.removeHandler(handler)
+        root.addHandler(queue_handler)
+        root.setLevel(level)
+        for name in debug_loggers:
+            logging.getLogger(name).setLevel(logging.DEBUG if rate > 0 else level)
+
+        _listener = logging.handlers.QueueListener(log_queue, stream_handler, file_handler,
+                                                   respect_handler_level=True)
+        _listener.start()
+        atexit.register(_listener.stop)
+        return _listener
@@ -0,0 +1,249 @@
+"""In-process counters, gauges and histograms in the Prometheus text format.
+
+Metrics are registered once per process and updated from any thread; an
+update is a dict lookup, a bisect for histograms and a short lock. The
+exposition is served over HTTP, written to a file periodically, or both:
+
+    WQ_METRICS_PORT=9464 streamlit run Dashboard.py       # GET http://127.0.0.1:9464/metrics
+    WQ_METRICS_FILE=metrics.prom streamlit run Dashboard.py
+
+The file suits node_exporter's textfile collector; it is replaced atomically
+every `WQ_METRICS_INTERVAL` seconds (default 15).
+"""
+import bisect
+import logging
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = list(zip(names, values)) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def _samples(self):
+        raise NotImplementedError
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, labels, extra, value in self._samples():
+            lines.append(f"{self.name}{suffix}{_format_labels(self.labelnames, labels, extra)} {_format_value(value)}")
+        return "\n".join(lines)
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self):
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("_total", key, None, value) for key, value in items]
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labelnames=(), function=None):
+        super().__init__(name, help_text, labelnames)
+        self.function = function
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = float(value)
+
+    def _samples(self):
+        if self.function is not None:
+            try:
+                return [("", (), None, float(self.function()))]
+            except Exception as e:
+                logger.error(f"Failed to read gauge {self.name}: {str(e)}")
+                return []
+        with self._lock:
+            items = sorted(self._values.items())
+        return [("", key, None, value) for key, value in items]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def timed(self, **labels):
+        """Decorator observing the duration of every call."""
+        def decorator(func):
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.time(**labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def _samples(self):
+        with self._lock:
+            items = sorted((key, (list(counts), total)) for key, (counts, total) in self._values.items())
+        samples = []
+        for key, (counts, total) in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (math.inf,), counts):
+                cumulative += count
+                samples.append(("_bucket", key, ("le", _format_value(bound)), cumulative))
+            samples.append(("_sum", key, None, total))
+            samples.append(("_count", key, None, cumulative))
+        return samples
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, *args, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, *args, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=(), function=None):
+        return self._get_or_create(Gauge, name, help_text, labelnames, function=function)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def render(self):
+        with self._lock:
+            metrics = [self._metrics[name] for name in sorted(self._metrics)]
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+def start_http_server(registry, port, host="127.0.0.1"):
+    """Serve `registry` at http://host:port/metrics from a daemon thread and return the server."""
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] not in ("/", "/metrics"):
+                self.send_error(404)
+                return
+            body = registry.render().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", CONTENT_TYPE)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+    logger.info(f"Serving metrics on http://{host}:{server.server_port}/metrics")
+    return server
+
+
+def write_metrics(registry, path):
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(registry.render())
+    os.replace(tmp_path, path)
+
+
+def start_file_exporter(registry, path, interval=15.0):
+    """Rewrite `path` with the current metrics every `interval` seconds from a daemon thread."""
+    def run():
+        while True:
+            try:
+                write_metrics(registry, path)
+            except OSError as e:
+                logger.error(f"Failed to write metrics to {path}: {str(e)}")
+            time.sleep(interval)
+
+    threading.Thread(target=run, name="metrics-file", daemon=True).start()
+    logger.info(f"Writing metrics to {path} every {interval:g}s")
+
+
+def start_exporters(registry):
+    """Start the exporters configured by WQ_METRICS_PORT, WQ_METRICS_HOST, WQ_METRICS_FILE and WQ_METRICS_INTERVAL."""
+    port = os.environ.get("WQ_METRICS_PORT")
+    if port:
+        try:
+            start_http_server(registry, int(port), os.environ.get("WQ_METRICS_HOST", "127.0.0.1"))
+        except (OSError, ValueError) as e:
+            logger.error(f"Could not serve metrics on port {port}: {str(e)}")
+    path = os.environ.get("WQ_METRICS_FILE")
+    if path:
+        try:
+            interval = float(os.environ.get("WQ_METRICS_INTERVAL", 15))
+        except ValueError:
+            interval = 15.0
+        start_file_exporter(registry, path, interval)
@@ -0,0 +1,99 @@
+"""Keras model builders shared by the Prediction tab, benchmarks and batch jobs.
+
+Builder keyword arguments default to the dashboard's original architecture.
+`DEFAULT_HYPERPARAMETERS` also holds the training settings (window size and
+batch size) that `build_model` leaves to the caller. Models are compiled with
+XLA when `jit_compile` is enabled in `wqcore.tfconfig`.
+"""
+import logging
+
+from tensorflow.keras.models import Sequential
+from tensorflow.keras.layers import Input, Conv1D, MaxPooling1D, Flatten, Dense, LSTM, Dropout, BatchNormalization, Bidirectional
+from tensorflow.keras.optimizers import Adam
+
+from wqcore.tfconfig import active_settings
+
+logger = logging.getLogger(__name__)
+
+
+TRAINING_HYPERPARAMETERS = ('window_size', 'batch_size')
+
+DEFAULT_HYPERPARAMETERS = {
+    'cnn': {'window_size': 7, 'batch_size': 16, 'filters': 128, 'dense_units': 100, 'dropout': 0.3,
+            'learning_rate': 0.001},
+    'lstm': {'window_size': 7, 'batch_size': 16, 'units': 100, 'dropout': 0.3, 'learning_rate': 0.001},
+    'hybrid': {'window_size': 7, 'batch_size': 16, 'filters': 128, 'units': 100, 'dropout': 0.3,
+               'learning_rate': 0.001},
+}
+
+
+def build_cnn(input_shape, filters=128, dense_units=100, dropout=0.3, learning_rate=0.001):
+    try:
+        model = Sequential([
+            Input(shape=input_shape),
+            Conv1D(filters=filters, kernel_size=3, activation='relu', padding='same'),
+            BatchNormalization(),
+            Conv1D(filters=filters // 2, kernel_size=3, activation='relu', padding='same'),
+            MaxPooling1D(pool_size=2),
+            Flatten(),
+            Dense(dense_units, activation='relu'),
+            Dropout(dropout),
+            Dense(1 if input_shape[-1] == 1 else input_shape[-1])
+        ])
+        model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse',
+                      jit_compile=active_settings()['jit_compile'])
+        logger.info(f"Optimized CNN built: {input_shape}")
+        return model
+    except Exception as e:
+        logger.error(f"Error building CNN: {str(e)}")
+        return None
+
+
+def build_lstm(input_shape, units=100, dropout=0.3, learning_rate=0.001):
+    try:
+        model = Sequential([
+            Input(shape=input_shape),
+            Bidirectional(LSTM(units, activation='relu', return_sequences=True)),
+            Dropout(dropout),
+            Bidirectional(LSTM(units // 2, activation='relu')),
+            Dropout(dropout),
+            Dense(1 if input_shape[-1] == 1 else input_shape[-1])
+        ])
+        model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse',
+                      jit_compile=active_settings()['jit_compile'])
+        logger.info(f"Optimized LSTM built: {input_shape}")
+        return model
+    except Exception as e:
+        logger.error(f"Error building LSTM: {str(e)}")
+        return None
+
+
+def build_hybrid(input_shape, filters=128, units=100, dropout=0.3, learning_rate=0.001):
+    try:
+        model = Sequential([
+            Input(shape=input_shape),
+            Conv1D(filters=filters, kernel_size=3, activation='relu', padding='same'),
+            BatchNormalization(),
+            Conv1D(filters=filters // 2, kernel_size=3, activation='relu', padding='same'),
+            MaxPooling1D(pool_size=2),
+            Bidirectional(LSTM(units, activation='relu', return_sequences=False)),
+            Dropout(dropout),
+            Dense(1 if input_shape[-1] == 1 else input_shape[-1])
+        ])
+        model.compile(optimizer=Adam(learning_rate=learning_rate), loss='mse',
+                      jit_compile=active_settings()['jit_compile'])
+        logger.info(f"Optimized Hybrid built: {input_shape}")
+        return model
+    except Exception as e:
+        logger.error(f"Error building Hybrid: {str(e)}")
+        return None
+
+
+MODEL_BUILDERS = {'cnn': build_cnn, 'lstm': build_lstm, 'hybrid': build_hybrid}
+
+
+def build_model(model_key, input_shape, hyperparameters=None):
+    """Build `model_key` with the architecture and optimizer settings in `hyperparameters`."""
+    config = {**DEFAULT_HYPERPARAMETERS[model_key], **(hyperparameters or {})}
+    kwargs = {k: v for k, v in config.items() if k not in TRAINING_HYPERPARAMETERS}
+    return MODEL_BUILDERS[model_key](input_shape, **kwargs)
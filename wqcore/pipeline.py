@@ -0,0 +1,61 @@
+"""tf.data input pipeline for model training.
+
+Windowed arrays are cast to float32 once and cached per (site, params, window)
+key and a digest of the targets, so repeated trainings on the same data skip the
+host-side conversion while differently resampled data never shares an entry. Each
+call returns shuffled, batched and prefetched train/validation datasets.
+"""
+import hashlib
+import logging
+from collections import OrderedDict
+
+import numpy as np
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 16
+MAX_CACHED_DATASETS = 32
+
+_dataset_cache = OrderedDict()
+
+
+def _digest(*arrays):
+    digest = hashlib.sha1()
+    for array in arrays:
+        digest.update(np.ascontiguousarray(array, dtype=np.float32).tobytes())
+    return digest.hexdigest()[:12]
+
+
+def _cached_slices(key, X_train, y_train, X_val, y_val):
+    key = key + (X_train.shape, X_val.shape, _digest(y_train, y_val))
+    if key in _dataset_cache:
+        _dataset_cache.move_to_end(key)
+        return _dataset_cache[key]
+    train = tf.data.Dataset.from_tensor_slices(
+        (np.asarray(X_train, dtype=np.float32), np.asarray(y_train, dtype=np.float32))).cache()
+    val = tf.data.Dataset.from_tensor_slices(
+        (np.asarray(X_val, dtype=np.float32), np.asarray(y_val, dtype=np.float32))).cache()
+    _dataset_cache[key] = (train, val, len(X_train))
+    if len(_dataset_cache) > MAX_CACHED_DATASETS:
+        _dataset_cache.popitem(last=False)
+    logger.info(f"Cached float32 windows for {key[:3]}")
+    return _dataset_cache[key]
+
+
+def training_datasets(key, X_train, y_train, X_val, y_val, batch_size=BATCH_SIZE, shuffle=True, seed=None):
+    """Return (train_ds, val_ds) ready for `model.fit(train_ds, validation_data=val_ds)`.
+
+    `key` identifies the windowed data, e.g. (site, tuple(params), window_size). Training windows are
+    reshuffled every epoch, as `model.fit` does for NumPy inputs.
+    """
+    train, val, n_train = _cached_slices(tuple(key), X_train, y_train, X_val, y_val)
+    if shuffle:
+        train = train.shuffle(n_train, seed=seed, reshuffle_each_iteration=True)
+    train = train.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    val = val.batch(batch_size).prefetch(tf.data.AUTOTUNE)
+    return train, val
+
+
+def clear_dataset_cache():
+    _dataset_cache.clear()
@@ -0,0 +1,158 @@
+"""Wall-clock profiling of dashboard sections.
+
+Profiling is off unless the `WQ_PROFILE` environment variable is set, in which
+case every section keeps its last `window` durations and logs p50/p95 every
+`log_every` calls:
+
+    WQ_PROFILE=1 streamlit run Dashboard.py
+
+Sections nest per thread, so a section opened inside another is recorded as
+"outer/inner". When profiling is off, `section` returns a shared no-op context
+manager and `timed` functions only check a flag.
+
+    with profiler.section("load_data"):
+        ...
+
+    timer = profiler.begin("visualization/Box Plot")   # for blocks too long to indent
+    profiler.lap("filter")                              # time since begin or the last lap
+    timer.end()
+"""
+import logging
+import os
+import threading
+import time
+from collections import defaultdict, deque
+from contextlib import nullcontext
+from functools import wraps
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+PROFILE_ENV = "WQ_PROFILE"
+_DISABLED = nullcontext()
+
+
+def _enabled_from_env():
+    return os.environ.get(PROFILE_ENV, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+class _Timer:
+    __slots__ = ("profiler", "name", "start", "lap_start")
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        stack = self.profiler._stack()
+        self.name = f"{stack[-1].name}/{self.name}" if stack else self.name
+        stack.append(self)
+        self.start = self.lap_start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.end()
+        return False
+
+    def end(self):
+        elapsed = time.perf_counter() - self.start
+        stack = self.profiler._stack()
+        if self in stack:
+            del stack[stack.index(self):]
+        self.profiler.record(self.name, elapsed)
+
+
+class _NullTimer:
+    def end(self):
+        pass
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class Profiler:
+    def __init__(self, enabled=None, window=500, log_every=100):
+        self.enabled = _enabled_from_env() if enabled is None else enabled
+        self.window = window
+        self.log_every = log_every
+        self._samples = defaultdict(lambda: deque(maxlen=self.window))
+        self._calls = defaultdict(int)
+        self._local = threading.local()
+        self._lock = threading.Lock()
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def new_run(self):
+        """Drop sections left open on this thread by an interrupted run, e.g. one ended by st.stop()."""
+        if self.enabled:
+            self._stack().clear()
+
+    def section(self, name):
+        """Context manager timing its block as `name`."""
+        if not self.enabled:
+            return _DISABLED
+        return _Timer(self, name)
+
+    def begin(self, name):
+        """Start a section without a `with` block; call `.end()` on the result to record it."""
+        if not self.enabled:
+            return _NULL_TIMER
+        return _Timer(self, name).__enter__()
+
+    def lap(self, name):
+        """Record the time since the innermost section began, or since its last lap, as a subsection."""
+        if not self.enabled:
+            return
+        stack = self._stack()
+        if not stack:
+            return
+        timer, now = stack[-1], time.perf_counter()
+        self.record(f"{timer.name}/{name}", now - timer.lap_start)
+        timer.lap_start = now
+
+    def timed(self, name=None):
+        """Decorator timing every call of a function."""
+        def decorator(func):
+            section_name = name or func.__name__
+
+            @wraps(func)
+            def wrapper(*args, **kwargs):
+                if not self.enabled:
+                    return func(*args, **kwargs)
+                with _Timer(self, section_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def record(self, name, seconds):
+        with self._lock:
+            self._samples[name].append(seconds)
+            self._calls[name] += 1
+            calls = self._calls[name]
+            samples = np.array(self._samples[name]) if calls % self.log_every == 0 else None
+        if samples is not None:
+            p50, p95 = np.percentile(samples, [50, 95]) * 1000
+            logger.info(f"Profile {name}: {calls} calls, p50 {p50:.1f} ms, p95 {p95:.1f} ms "
+                        f"over the last {len(samples)}")
+
+    def summary(self):
+        """Per-section call counts and p50/p95/mean/max of the retained durations, in milliseconds."""
+        with self._lock:
+            sections = {name: (self._calls[name], np.array(samples)) for name, samples in self._samples.items()}
+        rows = []
+        for name, (calls, samples) in sorted(sections.items()):
+            p50, p95 = np.percentile(samples, [50, 95]) * 1000
+            rows.append({"section": name, "calls": calls, "p50_ms": p50, "p95_ms": p95,
+                         "mean_ms": samples.mean() * 1000, "max_ms": samples.max() * 1000,
+                         "last_ms": samples[-1] * 1000})
+        return rows
+
+    def reset(self):
+        with self._lock:
+            self._samples.clear()
+            self._calls.clear()
@@ -0,0 +1,109 @@
+"""Versioned registry of trained models.
+
+Every trained model is saved as `models/<model_key>_<digest>_v<version>.keras`
+(plus the `.npz` NumPy runtime export next to it) and recorded in
+`models/registry.json` with its site, parameters, training cutoff and
+validation loss. The registry itself does not import TensorFlow.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime
+
+import pandas as pd
+
+from wqcore.resample import FREQUENCIES
+
+logger = logging.getLogger(__name__)
+
+REGISTRY_FILE = "registry.json"
+
+
+def grid_registry_key(model_key, frequency):
+    """Registry key of a model trained on a grid of `frequency`; daily models keep the plain model key."""
+    if frequency == "D":
+        return model_key
+    return f"{model_key}_{next(label for label, f in FREQUENCIES.items() if f == frequency).lower()}"
+
+
+def _digest(site, params):
+    return hashlib.sha1(json.dumps([str(site), list(params)]).encode()).hexdigest()[:10]
+
+
+class ModelRegistry:
+    def __init__(self, root='models'):
+        self.root = root
+        self.index_path = os.path.join(root, REGISTRY_FILE)
+        self._lock = threading.Lock()
+
+    def _read_index(self):
+        try:
+            with open(self.index_path) as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return []
+        except Exception as e:
+            logger.error(f"Failed to read {self.index_path}: {str(e)}")
+            return []
+
+    def _write_index(self, entries):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(entries, f, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def entries(self, model_key=None, site=None, params=None):
+        entries = self._read_index()
+        if model_key is not None:
+            entries = [e for e in entries if e['model_key'] == model_key]
+        if site is not None and params is not None:
+            digest = _digest(site, params)
+            entries = [e for e in entries if e['digest'] == digest]
+        return entries
+
+    def latest(self, model_key, site, params):
+        entries = self.entries(model_key, site, params)
+        return max(entries, key=lambda e: e['version']) if entries else None
+
+    def hyperparameters(self, model_key, site, params):
+        """Hyperparameters of the latest version, or None when it was trained with the builder defaults."""
+        entry = self.latest(model_key, site, params)
+        return entry.get('hyperparameters') if entry else None
+
+    def register(self, model, model_key, site, params, trained_through, val_loss, **metadata):
+        """Save `model` as the next version for (model_key, site, params) and return its registry entry."""
+        os.makedirs(self.root, exist_ok=True)
+        digest = _digest(site, params)
+        with self._lock:
+            entries = self._read_index()
+            version = 1 + max((e['version'] for e in entries
+                               if e['model_key'] == model_key and e['digest'] == digest), default=0)
+            stem = os.path.join(self.root, f"{model_key}_{digest}_v{version}")
+            model.save(f"{stem}.keras")
+            entry = {
+                "model_key": model_key,
+                "site": str(site),
+                "params": list(params),
+                "digest": digest,
+                "version": version,
+                "path": f"{stem}.keras",
+                "runtime_path": f"{stem}.npz",
+                "trained_through": pd.Timestamp(trained_through).isoformat() if trained_through is not None else None,
+                "val_loss": float(val_loss),
+                "created": datetime.now().isoformat(timespec='seconds'),
+                **metadata
+            }
+            entries.append(entry)
+            self._write_index(entries)
+        logger.info(f"Registered {model_key} v{version} for {site}: {entry['path']}")
+        return entry
+
+    def load(self, entry):
+        from tensorflow.keras.models import load_model
+        return load_model(entry['path'])
+
+    def load_runtime(self, entry):
+        from wqcore.runtime import NumpyModel
+        return NumpyModel.load(entry['runtime_path'])
@@ -0,0 +1,267 @@
+"""Headless site report: WQI over time, descriptive statistics and forecasts for every site.
+
+Each site is computed in its own task on a process pool, one worker per core
+by default. Workers read the dataset once through `wqcore.data.DatasetStore`
+and run NumPy single-threaded, so the runtime falls with the number of cores.
+Forecasts come from a classical forecaster, or from the latest model
+registered for the site when a CNN, LSTM or Hybrid model is chosen; like the
+Prediction tab, they are dated from today. The output directory receives a
+self-contained `report.html` (Plotly is embedded, so it opens offline) and
+the tables behind it as parquet files:
+
+    python -m wqcore.report --out reports/today
+    python -m wqcore.report --sites LEVISTE MANALAW --params pH Ammonia Nitrate --horizon-days 90 --workers 4
+    python -m wqcore.report --model CNN --data-dir datasets/synthetic --start 2020-01-01
+    python -m wqcore.report --frequency MS --interpolation ffill --horizon-days 365
+"""
+import argparse
+import html
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+from wqcore.analytics import descriptive_stats
+from wqcore.classical import CLASSICAL_FORECASTERS
+from wqcore.data import DATA_DIR, DatasetStore
+from wqcore.forecasting import REGISTERED_MODELS, build_forecast_table, site_forecast
+from wqcore.registry import ModelRegistry
+from wqcore.resample import FREQUENCIES, INTERPOLATION_METHODS, forecast_dates, horizon_steps, regular_grid
+from wqcore.wqi import forecast_wqi, observed_wqi
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MODEL = "Holt-Winters"
+DEFAULT_HORIZON_DAYS = 30
+# Longer WQI series are plotted as monthly means to keep the report small
+PLOT_MAX_POINTS = 2000
+# Environment variables that size the BLAS and OpenMP thread pools of worker processes
+THREAD_VARIABLES = ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS')
+TABLES = ('summary', 'wqi', 'stats', 'forecast', 'forecast_wqi')
+
+_store = None
+
+
+def _init_worker(data_dir):
+    global _store
+    _store = DatasetStore(data_dir)
+
+
+def site_report(site, params, options, store=None):
+    """WQI, statistics and forecast tables of one site; runs in a worker unless `store` is given."""
+    started = time.perf_counter()
+    df = (store or _store).filter(site, options['start'], options['end'], params)
+    result = {'site': site, 'rows': len(df), 'note': None, 'wqi': None, 'stats': None, 'forecast': None,
+              'forecast_wqi': None}
+    if df.empty:
+        result['note'] = "no data in the selected period"
+        result['seconds'] = time.perf_counter() - started
+        return result
+
+    wqi, remarks = observed_wqi({param: df[param].to_numpy(dtype=np.float64) for param in params}, params)
+    result['wqi'] = pd.DataFrame({"Site": site, "Date": df['Date'].to_numpy(), "Water Quality Index": wqi,
+                                  "WQI Remarks": remarks})
+    stats = descriptive_stats(df, params)
+    result['stats'] = stats.rename_axis("Parameter").reset_index()
+    result['stats'].insert(0, "Site", site)
+
+    grid, _ = regular_grid(df, params, options['frequency'], options['interpolation'])
+    steps = horizon_steps(options['horizon_days'], options['frequency'])
+    predictions, result['note'] = site_forecast(grid, site, params, options['model'], steps,
+                                                ModelRegistry(options['models_dir']), options['frequency'])
+    if predictions is not None:
+        dates = forecast_dates(len(predictions), options['frequency'], pd.Timestamp.today().normalize())
+        result['forecast'] = build_forecast_table(predictions[None], [site], dates, params)
+        wqi, remarks = forecast_wqi({param: predictions[:, i] for i, param in enumerate(params)}, params)
+        result['forecast_wqi'] = pd.DataFrame({"Site": site, "Date": dates, "Water Quality Index": wqi,
+                                               "WQI Remarks": remarks})
+    result['seconds'] = time.perf_counter() - started
+    return result
+
+
+def run_reports(sites, params, options, workers=None, data_dir=None, progress=None, store=None):
+    """Site results in `sites` order, computed on `workers` processes.
+
+    With one worker the sites are computed in this process, from `store` when given.
+    """
+    workers = min(workers or os.cpu_count() or 1, len(sites)) or 1
+    results = {}
+    if workers == 1:
+        store = store or DatasetStore(data_dir)
+        for site in sites:
+            results[site] = site_report(site, params, options, store)
+            if progress:
+                progress(results[site], len(results), len(sites))
+        return [results[site] for site in sites]
+
+    # Workers are spawned with these variables, so each one runs BLAS on a single core
+    saved = {name: os.environ.get(name) for name in THREAD_VARIABLES}
+    os.environ.update({name: "1" for name in THREAD_VARIABLES})
+    try:
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context('spawn'),
+                                 initializer=_init_worker, initargs=(data_dir,)) as pool:
+            futures = [pool.submit(site_report, site, params, options) for site in sites]
+            for future in as_completed(futures):
+                result = future.result()
+                results[result['site']] = result
+                if progress:
+                    progress(result, len(results), len(sites))
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+    return [results[site] for site in sites]
+
+
+def summary_table(results):
+    rows = []
+    for result in results:
+        wqi, forecast = result['wqi'], result['forecast_wqi']
+        rows.append({
+            "Site": result['site'],
+            "Rows": result['rows'],
+            "Mean WQI": wqi["Water Quality Index"].mean() if wqi is not None else np.nan,
+            "Latest WQI": wqi["Water Quality Index"].iloc[-1] if wqi is not None else np.nan,
+            "Primary Remark": wqi["WQI Remarks"].value_counts().idxmax() if wqi is not None else "N/A",
+            "Forecast Mean WQI": forecast["Water Quality Index"].mean() if forecast is not None else np.nan,
+            "Forecast Remark": (forecast["WQI Remarks"].value_counts().idxmax()
+                                if forecast is not None else "N/A"),
+            "Note": result['note'] or "",
+        })
+    return pd.DataFrame(rows)
+
+
+def write_tables(results, out_dir):
+    """Write every table as `<name>.parquet`; returns {name: frame}."""
+    tables = {'summary': summary_table(results)}
+    for name in TABLES[1:]:
+        frames = [result[name] for result in results if result[name] is not None]
+        tables[name] = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    for name, table in tables.items():
+        table.to_parquet(os.path.join(out_dir, f"{name}.parquet"), engine='pyarrow', index=False)
+    return tables
+
+
+def _figure_html(fig):
+    fig.update_layout(plot_bgcolor='white', paper_bgcolor='white', height=380, title_x=0.03,
+                      margin=dict(l=20, r=20, t=60, b=20), font=dict(family='Montserrat, sans-serif'))
+    return fig.to_html(full_html=False, include_plotlyjs=False, config={'displaylogo': False})
+
+
+def _table_html(df):
+    return df.to_html(index=False, float_format=lambda value: f"{value:.2f}", na_rep="-", border=0,
+                      classes="table")
+
+
+def site_section(index, result):
+    import plotly.express as px
+
+    parts = [f"<section><h2 id='site-{index}'>{html.escape(str(result['site']))}</h2>"]
+    if result['note']:
+        parts.append(f"<p class='note'>{html.escape(result['note'])}</p>")
+    wqi = result['wqi']
+    if wqi is not None:
+        title = "Water Quality Index Over Time"
+        if len(wqi) > PLOT_MAX_POINTS:
+            wqi = wqi.resample('MS', on='Date')["Water Quality Index"].mean().reset_index()
+            title += " (monthly mean)"
+        fig = px.line(wqi, x="Date", y="Water Quality Index", title=title, color_discrete_sequence=['#004A99'])
+        parts.append(_figure_html(fig))
+    if result['forecast'] is not None:
+        fig = px.line(result['forecast'], x="Date", y="Value", color="Parameter", title="Forecast")
+        parts.append(_figure_html(fig))
+        parts.append("<h3>Forecast WQI</h3>" + _table_html(result['forecast_wqi'].drop(columns="Site")))
+    if result['stats'] is not None:
+        parts.append("<h3>Descriptive Statistics</h3>" + _table_html(result['stats'].drop(columns="Site")))
+    parts.append("</section>")
+    return "\n".join(parts)
+
+
+def render_html(results, tables, options, params, path):
+    """Write the report to `path`, with plotly.js inlined so it needs no network access."""
+    from plotly.offline import get_plotlyjs
+
+    period = f"{options['start'] or 'start'} to {options['end'] or 'end'}"
+    header = (f"<h1>Water Quality Report</h1><p>Generated {datetime.now().isoformat(timespec='seconds')} from "
+              f"{html.escape(str(options['data_dir']))}: {len(results)} sites, {period}. Forecast: "
+              f"{html.escape(options['model'])}, {options['horizon_days']} days on a "
+              f"{'daily' if options['frequency'] == 'D' else 'monthly'} grid. Parameters: "
+              f"{html.escape(', '.join(params))}.</p>")
+    index = " ".join(f"<a href='#site-{i}'>{html.escape(str(result['site']))}</a>"
+                     for i, result in enumerate(results))
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write("<!DOCTYPE html><html><head><meta charset='utf-8'><title>Water Quality Report</title>")
+        f.write(f"<script type='text/javascript'>{get_plotlyjs()}</script>")
+        f.write("<style>body{font-family:Montserrat,sans-serif;color:#222831;margin:24px 40px}"
+                "h1,h2{color:#004A99}section{border-top:1px solid #748DA6;margin-top:24px}"
+                ".table{border-collapse:collapse;font-size:13px}.table td,.table th{padding:3px 10px;"
+                "border-bottom:1px solid #ddd;text-align:right}.note{color:#8a6d3b}nav a{margin-right:8px}"
+                "</style></head><body>")
+        f.write(header)
+        f.write(f"<nav>{index}</nav><h2>Summary</h2>{_table_html(tables['summary'])}")
+        for i, result in enumerate(results):
+            f.write(site_section(i, result))
+        f.write("</body></html>")
+
+
+def main():
+    from wqcore.logs import TEXT_FORMAT
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--out', default=os.path.join('reports', datetime.now().strftime('%Y-%m-%d')))
+    parser.add_argument('--data-dir', default=DATA_DIR)
+    parser.add_argument('--sites', nargs='+', help='default: every site')
+    parser.add_argument('--params', nargs='+', help='default: every numeric parameter')
+    parser.add_argument('--start', help='first date included, e.g. 2022-01-01')
+    parser.add_argument('--end', help='last date included')
+    parser.add_argument('--model', default=DEFAULT_MODEL, choices=list(CLASSICAL_FORECASTERS) + list(REGISTERED_MODELS))
+    parser.add_argument('--horizon-days', type=int, default=DEFAULT_HORIZON_DAYS)
+    parser.add_argument('--frequency', default="D", choices=list(FREQUENCIES.values()),
+                        help=', '.join(f"{value}: {label}" for label, value in FREQUENCIES.items()))
+    parser.add_argument('--interpolation', default="linear", choices=list(INTERPOLATION_METHODS.values()),
+                        help=', '.join(f"{value}: {label}" for label, value in INTERPOLATION_METHODS.items()))
+    parser.add_argument('--models-dir', default='models', help='model registry used by the CNN, LSTM and Hybrid')
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help='processes; 1 runs in this process')
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format=TEXT_FORMAT)
+
+    store = DatasetStore(args.data_dir)
+    if store.water_quality.empty:
+        parser.error(f"no water quality data in {args.data_dir}")
+    available = store.parameters()
+    params = args.params or available
+    sites = args.sites or store.sites()
+    unknown = set(params) - set(available)
+    if unknown:
+        parser.error(f"unknown parameters: {', '.join(sorted(unknown))}; choose from {', '.join(available)}")
+    unknown = set(sites) - set(store.sites())
+    if unknown:
+        parser.error(f"unknown sites: {', '.join(sorted(unknown))}")
+
+    options = {'start': args.start, 'end': args.end, 'model': args.model, 'horizon_days': args.horizon_days,
+               'frequency': args.frequency, 'interpolation': args.interpolation,
+               'models_dir': args.models_dir, 'data_dir': args.data_dir}
+
+    def progress(result, done, total):
+        logger.info(f"[{done}/{total}] {result['site']}: {result['rows']} rows in {result['seconds']:.2f}s"
+                    + (f" ({result['note']})" if result['note'] else ""))
+
+    started = time.perf_counter()
+    results = run_reports(sites, params, options, args.workers, args.data_dir, progress, store)
+    computed = time.perf_counter() - started
+    os.makedirs(args.out, exist_ok=True)
+    tables = write_tables(results, args.out)
+    render_html(results, tables, options, params, os.path.join(args.out, 'report.html'))
+    logger.info(f"Report of {len(sites)} sites written to {args.out} in {time.perf_counter() - started:.1f}s "
+                f"({computed:.1f}s computing on {min(args.workers or 1, len(sites))} workers)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,108 @@
+"""Regular per-site time grids for model windowing.
+
+The raw dataset has one row per site and PHIVOLCS date: monthly BFAR samples
+are repeated on every day of their month, some sites skip dates, and "All
+Sites" interleaves rows of different sites. `regular_grid` bins each site's
+rows to a daily or monthly grid, reindexes it to a complete date range and
+fills missing bins by interpolation within the site. The returned gap mask
+marks the bins that had no observation, so callers can tell measured values
+from filled ones. `site_mean` collapses the grid to a single regional series.
+"""
+import logging
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+FREQUENCIES = {"Daily": "D", "Monthly": "MS"}
+INTERPOLATION_METHODS = {"Linear": "linear", "Forward Fill": "ffill", "None": "none"}
+STEP_DAYS = {"D": 1.0, "MS": 365.25 / 12}
+MAX_GAP = {"D": 31, "MS": 3}
+# Period frequency whose ordinals count the steps of each grid frequency
+PERIODS = {"D": "D", "MS": "M"}
+
+
+def _fill_gaps(values, starts, ends, method, max_gap):
+    """Fill NaNs of an (N, P) array without crossing segment boundaries, all columns at once.
+
+    `starts` and `ends` hold the first and last row index of each row's segment. Gaps longer
+    than `max_gap` rows, and leading gaps, stay NaN; linear interpolation leaves trailing gaps too.
+    """
+    n = len(values)
+    rows = np.arange(n)[:, None]
+    valid = ~np.isnan(values)
+    prev = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    nxt = np.minimum.accumulate(np.where(valid, rows, n)[::-1], axis=0)[::-1]
+    has_prev = prev >= starts[:, None]
+    has_next = nxt <= ends[:, None]
+    prev_values = np.take_along_axis(values, np.clip(prev, 0, n - 1), axis=0)
+
+    filled = values.copy()
+    if method == "ffill":
+        fill = ~valid & has_prev & (rows - prev <= max_gap)
+        filled[fill] = prev_values[fill]
+    elif method == "linear":
+        fill = ~valid & has_prev & has_next & (nxt - prev - 1 <= max_gap)
+        next_values = np.take_along_axis(values, np.clip(nxt, 0, n - 1), axis=0)
+        weight = (rows - prev) / np.maximum(nxt - prev, 1)
+        filled[fill] = (prev_values + (next_values - prev_values) * weight)[fill]
+    return filled
+
+
+def regular_grid(df, params, frequency="D", method="linear", max_gap=None):
+    """Resample every site onto a regular `frequency` grid ("D" or "MS").
+
+    Returns (grid, gaps): `grid` has Site, Date and `params` columns, sorted by site and date;
+    `gaps` is a boolean frame of `params` on the same index, True where a bin had no observation.
+    """
+    if method not in INTERPOLATION_METHODS.values():
+        raise ValueError(f"Unknown interpolation method: {method}")
+    max_gap = MAX_GAP[frequency] if max_gap is None else max_gap
+    binned = (df.dropna(subset=['Date'])
+              .groupby([df['Site'].astype(str), pd.Grouper(key='Date', freq=frequency)], sort=True)[params]
+              .mean())
+    # Each site's range runs from its first to last bin: step ordinals from the first bin's ordinal
+    ordinals = pd.PeriodIndex(binned.index.get_level_values(1), freq=PERIODS[frequency]).asi8
+    site_codes, bounds = pd.factorize(binned.index.get_level_values(0))
+    starts = np.flatnonzero(np.diff(site_codes, prepend=-1))
+    ends = np.flatnonzero(np.diff(site_codes, append=-1))
+    lengths = ordinals[ends] - ordinals[starts] + 1
+    first = np.cumsum(lengths) - lengths
+    offsets = np.arange(lengths.sum()) - np.repeat(first, lengths)
+    index = pd.MultiIndex.from_arrays(
+        [np.repeat(bounds, lengths),
+         pd.PeriodIndex.from_ordinals(np.repeat(ordinals[starts], lengths) + offsets,
+                                      freq=PERIODS[frequency]).to_timestamp()],
+        names=['Site', 'Date'])
+    grid = binned.reindex(index)
+
+    values = grid.to_numpy(dtype=np.float64)
+    gaps = np.isnan(values)
+    if len(values):
+        values = _fill_gaps(values, np.repeat(first, lengths), np.repeat(first + lengths - 1, lengths),
+                            method, max_gap)
+
+    grid = pd.DataFrame(values, columns=params, index=grid.index).reset_index()
+    gaps = pd.DataFrame(gaps, columns=params, index=grid.index)
+    logger.info(f"Resampled {len(df)} rows to {len(grid)} {frequency} bins over {len(bounds)} sites, "
+                f"{gaps.to_numpy().mean():.1%} missing, filled by {method}")
+    return grid, gaps
+
+
+def site_mean(grid, gaps, params):
+    """Average the sites of a grid into one series; a bin is a gap only when every site missed it."""
+    dates = grid['Date']
+    mean = grid.groupby('Date', sort=True)[params].mean().reset_index()
+    mean.insert(0, 'Site', 'All Sites')
+    mean_gaps = gaps.groupby(dates.values, sort=True).all().reset_index(drop=True)
+    return mean, mean_gaps
+
+
+def horizon_steps(days, frequency):
+    """Number of grid steps covering a horizon of `days`."""
+    return max(1, int(round(days / STEP_DAYS[frequency])))
+
+
+def forecast_dates(steps, frequency, start=None):
+    return pd.date_range(start=start if start is not None else pd.Timestamp.today(), periods=steps, freq=frequency)
@@ -0,0 +1,83 @@
+"""Append-only columnar store for training histories and validation predictions.
+
+Each training run writes two immutable Parquet files under the store root,
+keyed by run ID:
+
+    <run_id>.history.parquet      epoch, loss, val_loss
+    <run_id>.predictions.parquet  actual/<param>, predicted/<param> (float32)
+
+Run metadata (model, site, parameters, ...) is kept in the Parquet schema, so
+listing runs or reading a single parameter's columns never parses the rest.
+"""
+import json
+import logging
+import os
+import uuid
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+METADATA_KEY = b"wqcore"
+
+
+def _write(table, path, metadata):
+    table = table.replace_schema_metadata({METADATA_KEY: json.dumps(metadata).encode()})
+    tmp_path = f"{path}.tmp"
+    pq.write_table(table, tmp_path, compression='zstd')
+    os.replace(tmp_path, path)
+
+
+class TrainingResultsStore:
+    def __init__(self, root='training_results'):
+        self.root = root
+
+    def _path(self, run_id, table):
+        return os.path.join(self.root, f"{run_id}.{table}.parquet")
+
+    def append(self, losses, val_losses, actual, predicted, params, **metadata):
+        """Write a new run and return its ID. `actual` and `predicted` are (N, P) arrays, one column per param."""
+        os.makedirs(self.root, exist_ok=True)
+        run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        metadata = {"run_id": run_id, "params": list(params), "created": datetime.now().isoformat(timespec='seconds'),
+                    **metadata}
+
+        history = pa.table({
+            "epoch": pa.array(np.arange(1, len(losses) + 1), pa.int32()),
+            "loss": pa.array(np.asarray(losses, dtype=np.float64).reshape(-1), pa.float64()),
+            "val_loss": pa.array(np.asarray([np.nan if v is None else v for v in val_losses], dtype=np.float64)
+                                 .reshape(-1), pa.float64()),
+        })
+        actual = np.asarray(actual, dtype=np.float32).reshape(len(actual), -1)
+        predicted = np.asarray(predicted, dtype=np.float32).reshape(len(predicted), -1)
+        columns = {}
+        for i, param in enumerate(params):
+            columns[f"actual/{param}"] = actual[:, i]
+            columns[f"predicted/{param}"] = predicted[:, i]
+        _write(history, self._path(run_id, "history"), metadata)
+        _write(pa.table(columns), self._path(run_id, "predictions"), metadata)
+        logger.info(f"Saved training run {run_id} to {self.root}")
+        return run_id
+
+    def history(self, run_id):
+        return pd.read_parquet(self._path(run_id, "history"), engine='pyarrow')
+
+    def predictions(self, run_id, param):
+        """Validation actual and predicted values of one parameter, reading only its two columns."""
+        df = pd.read_parquet(self._path(run_id, "predictions"), engine='pyarrow',
+                             columns=[f"actual/{param}", f"predicted/{param}"])
+        return df.set_axis(["Actual", "Predicted"], axis=1)
+
+    def metadata(self, run_id):
+        schema = pq.read_schema(self._path(run_id, "history"))
+        return json.loads(schema.metadata[METADATA_KEY])
+
+    def runs(self):
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(name[:-len(".history.parquet")] for name in os.listdir(self.root)
+                      if name.endswith(".history.parquet"))
@@ -0,0 +1,224 @@
+"""TensorFlow-free inference for the dashboard's CNN, LSTM and Hybrid models.
+
+`export_model` writes the layers of a trained Keras `Sequential` model to a
+portable `.npz` file (weights plus a JSON layer spec). `NumpyModel` loads that
+file and runs the forward pass with NumPy only, so read-only workers can serve
+forecasts without importing TensorFlow.
+"""
+import json
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+SPEC_KEY = "__spec__"
+
+
+# ==== ACTIVATIONS ====
+def _sigmoid(x):
+    return 1.0 / (1.0 + np.exp(-x))
+
+
+ACTIVATIONS = {
+    'linear': lambda x: x,
+    'relu': lambda x: np.maximum(x, 0.0),
+    'sigmoid': _sigmoid,
+    'tanh': np.tanh,
+}
+
+
+def _activation(name):
+    if name not in ACTIVATIONS:
+        raise ValueError(f"Unsupported activation: {name}")
+    return ACTIVATIONS[name]
+
+
+# ==== EXPORT ====
+def _lstm_spec(layer):
+    config = layer.get_config()
+    return {
+        "units": config['units'],
+        "activation": config['activation'],
+        "recurrent_activation": config['recurrent_activation'],
+        "return_sequences": config['return_sequences'],
+        "go_backwards": config.get('go_backwards', False),
+    }
+
+
+def export_model(model, file_path, sample=None, atol=1e-4):
+    """Write the layer spec and float32 weights of a Keras Sequential model to `file_path` (.npz).
+
+    Returns the exported model as a `NumpyModel`. When `sample` inputs are given, the NumPy
+    outputs are checked against Keras and a ValueError is raised if they differ by more than `atol`.
+    """
+    spec = []
+    arrays = {}
+    for i, layer in enumerate(model.layers):
+        kind = type(layer).__name__
+        config = layer.get_config()
+        entry = {"type": kind}
+        weights = []
+        if kind == 'Conv1D':
+            if tuple(config['strides']) != (1,) or tuple(config['dilation_rate']) != (1,):
+                raise ValueError("Only stride 1, dilation 1 Conv1D layers are supported")
+            entry.update(padding=config['padding'], activation=config['activation'], use_bias=config['use_bias'])
+            weights = layer.get_weights()
+        elif kind == 'BatchNormalization':
+            entry.update(epsilon=config['epsilon'], center=config['center'], scale=config['scale'])
+            weights = layer.get_weights()
+        elif kind == 'MaxPooling1D':
+            entry.update(pool_size=config['pool_size'][0], strides=config['strides'][0], padding=config['padding'])
+        elif kind == 'Dense':
+            entry.update(activation=config['activation'], use_bias=config['use_bias'])
+            weights = layer.get_weights()
+        elif kind == 'LSTM':
+            entry.update(_lstm_spec(layer))
+            weights = layer.get_weights()
+        elif kind == 'Bidirectional':
+            entry.update(merge_mode=config['merge_mode'], forward=_lstm_spec(layer.forward_layer),
+                         backward=_lstm_spec(layer.backward_layer))
+            weights = layer.forward_layer.get_weights() + layer.backward_layer.get_weights()
+        elif kind in ('Flatten', 'Dropout'):
+            if kind == 'Dropout':
+                entry.update(rate=config['rate'])
+        else:
+            raise ValueError(f"Unsupported layer for export: {kind}")
+        entry["weights"] = len(weights)
+        for j, weight in enumerate(weights):
+            arrays[f"{i}.{j}"] = np.asarray(weight, dtype=np.float32)
+        spec.append(entry)
+
+    arrays[SPEC_KEY] = np.array(json.dumps({"input_shape": list(model.input_shape[1:]), "layers": spec}))
+    numpy_model = NumpyModel.load_arrays(arrays)
+    if sample is not None:
+        error = np.abs(np.asarray(model.predict(sample, verbose=0)) - numpy_model.predict(sample)).max()
+        if error > atol:
+            raise ValueError(f"NumPy runtime differs from Keras by {error:.2e} (tolerance {atol:.0e})")
+    np.savez(file_path, **arrays)
+    logger.info(f"Exported {len(spec)} layers to {file_path}")
+    return numpy_model
+
+
+# ==== FORWARD PASS ====
+def _conv1d(x, kernel, bias, padding, activation):
+    size = kernel.shape[0]
+    if padding == 'same':
+        left = (size - 1) // 2
+        x = np.pad(x, ((0, 0), (left, size - 1 - left), (0, 0)))
+    elif padding != 'valid':
+        raise ValueError(f"Unsupported Conv1D padding: {padding}")
+    windows = np.lib.stride_tricks.sliding_window_view(x, size, axis=1)  # (N, T, C, K)
+    out = np.einsum('ntck,kco->nto', windows, kernel, optimize=True)
+    if bias is not None:
+        out = out + bias
+    return _activation(activation)(out)
+
+
+def _max_pool1d(x, pool_size, strides, padding):
+    if padding != 'valid':
+        raise ValueError(f"Unsupported MaxPooling1D padding: {padding}")
+    windows = np.lib.stride_tricks.sliding_window_view(x, pool_size, axis=1)[:, ::strides]
+    return windows.max(axis=-1)
+
+
+def _lstm(x, spec, kernel, recurrent_kernel, bias):
+    activation = _activation(spec['activation'])
+    recurrent_activation = _activation(spec['recurrent_activation'])
+    units = spec['units']
+    if spec['go_backwards']:
+        x = x[:, ::-1]
+    n, steps = x.shape[:2]
+    # Input projection for every step at once, as one 2-D matmul (3-D matmul falls back to per-sample BLAS calls)
+    inputs = (x.reshape(n * steps, -1) @ kernel + bias).reshape(n, steps, -1)
+    h = np.zeros((n, units), dtype=x.dtype)
+    c = np.zeros((n, units), dtype=x.dtype)
+    outputs = np.empty((n, steps, units), dtype=x.dtype) if spec['return_sequences'] else None
+    for t in range(steps):
+        z = inputs[:, t] + h @ recurrent_kernel
+        i = recurrent_activation(z[:, :units])
+        f = recurrent_activation(z[:, units:2 * units])
+        c = f * c + i * activation(z[:, 2 * units:3 * units])
+        h = recurrent_activation(z[:, 3 * units:]) * activation(c)
+        if outputs is not None:
+            outputs[:, t] = h
+    return h if outputs is None else outputs
+
+
+class NumpyModel:
+    """Forward pass of an exported model using NumPy only."""
+
+    def __init__(self, spec, weights):
+        self.input_shape = (None,) + tuple(spec['input_shape'])
+        self.layers = spec['layers']
+        self.weights = weights
+
+    @property
+    def nbytes(self):
+        return sum(weight.nbytes for layer_weights in self.weights for weight in layer_weights)
+
+    @classmethod
+    def load_arrays(cls, arrays):
+        spec = json.loads(str(arrays[SPEC_KEY]))
+        weights = []
+        for i, layer in enumerate(spec['layers']):
+            weights.append([arrays[f"{i}.{j}"] for j in range(layer['weights'])])
+        return cls(spec, weights)
+
+    @classmethod
+    def load(cls, file_path):
+        with np.load(file_path) as data:
+            return cls.load_arrays(data)
+
+    def _forward(self, x, rng=None):
+        for layer, weights in zip(self.layers, self.weights):
+            kind = layer['type']
+            if kind == 'Conv1D':
+                bias = weights[1] if layer['use_bias'] else None
+                x = _conv1d(x, weights[0], bias, layer['padding'], layer['activation'])
+            elif kind == 'BatchNormalization':
+                weights = list(weights)
+                gamma = weights.pop(0) if layer['scale'] else 1.0
+                beta = weights.pop(0) if layer['center'] else 0.0
+                moving_mean, moving_var = weights
+                x = (x - moving_mean) / np.sqrt(moving_var + layer['epsilon']) * gamma + beta
+            elif kind == 'MaxPooling1D':
+                x = _max_pool1d(x, layer['pool_size'], layer['strides'], layer['padding'])
+            elif kind == 'Flatten':
+                x = x.reshape(x.shape[0], -1)
+            elif kind == 'Dense':
+                x = x @ weights[0]
+                if layer['use_bias']:
+                    x = x + weights[1]
+                x = _activation(layer['activation'])(x)
+            elif kind == 'LSTM':
+                x = _lstm(x, layer, *weights)
+            elif kind == 'Bidirectional':
+                forward = _lstm(x, layer['forward'], *weights[:3])
+                backward = _lstm(x, layer['backward'], *weights[3:])
+                if layer['backward']['return_sequences']:
+                    backward = backward[:, ::-1]
+                if layer['merge_mode'] != 'concat':
+                    raise ValueError(f"Unsupported Bidirectional merge mode: {layer['merge_mode']}")
+                x = np.concatenate([forward, backward], axis=-1)
+            elif kind == 'Dropout' and rng is not None:
+                keep = 1.0 - layer['rate']
+                x = x * (rng.random(x.shape, dtype=np.float32) < keep) / np.float32(keep)
+            # Otherwise Dropout is the identity at inference time
+        return x
+
+    def predict(self, X, batch_size=None, verbose=0):
+        X = np.asarray(X, dtype=np.float32)
+        if batch_size is None:
+            return self._forward(X)
+        return np.concatenate([self._forward(X[i:i + batch_size]) for i in range(0, len(X), batch_size)])
+
+    def predict_on_batch(self, X):
+        return self.predict(X)
+
+    def predict_stochastic(self, X, rng):
+        """Forward pass with dropout active, drawing the masks from `rng` (Monte-Carlo dropout)."""
+        return self._forward(np.asarray(X, dtype=np.float32), rng=rng)
+
+    def __call__(self, X, training=False):
+        return self.predict(X)
@@ -0,0 +1,212 @@
+"""Per-session storage of heavy results, with memory accounting, compaction and spill to disk.
+
+Each browser session keeps its prediction and comparison results in a
+`SessionSlots` object registered with one process-wide `SessionStore`, which
+knows every session's footprint. After each store, `enforce` spills the results
+of sessions idle for `idle_timeout` to pickles under `spill_dir` and, while the
+total still exceeds `max_bytes`, the least recently active sessions' results
+too. A spilled slot is read back transparently on its session's next access.
+Spill files of sessions not seen for `expire_after` are deleted.
+
+`compact` shrinks results before they are stored: float64 arrays and frame
+columns become float32, and repetitive string lists and columns (WQI remarks,
+site names) become categoricals.
+
+A result shared with the prediction cache counts toward every session holding
+it; spilling drops the session's reference, and the memory is freed once the
+cache has evicted the result as well.
+
+    WQ_SESSION_MEMORY_MB=256 WQ_SESSION_IDLE_MINUTES=10 streamlit run Dashboard.py
+"""
+import logging
+import os
+import pickle
+import shutil
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from wqcore.cache import estimate_size
+
+logger = logging.getLogger(__name__)
+
+SPILL_DIR = "session_spill"
+MAX_SESSION_BYTES = 512 * 1024 * 1024
+IDLE_TIMEOUT = 10 * 60
+EXPIRE_AFTER = 24 * 60 * 60
+# Strings repeated at least this often on average are stored as categoricals
+CATEGORICAL_MIN_REPEATS = 2
+CATEGORICAL_MIN_LENGTH = 32
+
+
+def _is_categorical_candidate(values):
+    if len(values) < CATEGORICAL_MIN_LENGTH or not all(isinstance(v, str) for v in values):
+        return False
+    return len(set(values)) * CATEGORICAL_MIN_REPEATS <= len(values)
+
+
+def compact(value):
+    """Copy of `value` with float64 data as float32 and repetitive strings as categoricals, containers recursively."""
+    if isinstance(value, np.ndarray):
+        return value.astype(np.float32) if value.dtype == np.float64 else value
+    if isinstance(value, pd.DataFrame):
+        columns = {}
+        for name, column in value.items():
+            if column.dtype == np.float64:
+                columns[name] = column.astype(np.float32)
+            elif column.dtype == object and _is_categorical_candidate(column.tolist()):
+                columns[name] = column.astype('category')
+            else:
+                columns[name] = column
+        return pd.DataFrame(columns, index=value.index)
+    if isinstance(value, dict):
+        return {key: compact(item) for key, item in value.items()}
+    if isinstance(value, list) and _is_categorical_candidate(value):
+        return pd.Categorical(value)
+    return value
+
+
+class _Spilled:
+    __slots__ = ("path", "size")
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+
+
+class SessionSlots:
+    """Named results of one session; values may be spilled to disk and are reloaded on `get`."""
+
+    def __init__(self, session_id, spill_dir):
+        self.session_id = session_id
+        self.spill_dir = os.path.join(spill_dir, session_id)
+        self.last_seen = time.time()
+        self._values = {}
+        self._sizes = {}
+        self._lock = threading.Lock()
+
+    def get(self, name, default=None):
+        with self._lock:
+            value = self._values.get(name, default)
+            if not isinstance(value, _Spilled):
+                return value
+            try:
+                with open(value.path, 'rb') as f:
+                    loaded = pickle.load(f)
+            except (OSError, pickle.UnpicklingError, EOFError) as e:
+                logger.error(f"Failed to reload spilled {name} of session {self.session_id}: {str(e)}")
+                self._values.pop(name)
+                self._sizes.pop(name, None)
+                return default
+            self._values[name] = loaded
+            self._sizes[name] = value.size
+            os.remove(value.path)
+            logger.info(f"Reloaded {name} of session {self.session_id} ({value.size} bytes) from disk")
+            return loaded
+
+    def set(self, name, value):
+        with self._lock:
+            previous = self._values.get(name)
+            if isinstance(previous, _Spilled) and os.path.exists(previous.path):
+                os.remove(previous.path)
+            self._values[name] = value
+            self._sizes[name] = estimate_size(value) if value is not None else 0
+
+    def memory_bytes(self):
+        """Bytes of results held in memory; spilled ones count as zero."""
+        with self._lock:
+            return sum(size for name, size in self._sizes.items() if not isinstance(self._values[name], _Spilled))
+
+    def spilled_bytes(self):
+        with self._lock:
+            return sum(value.size for value in self._values.values() if isinstance(value, _Spilled))
+
+    def spill(self):
+        """Write every in-memory result to disk and drop it from memory; returns the bytes released."""
+        released = 0
+        with self._lock:
+            for name, value in list(self._values.items()):
+                if value is None or isinstance(value, _Spilled):
+                    continue
+                os.makedirs(self.spill_dir, exist_ok=True)
+                path = os.path.join(self.spill_dir, f"{name}.pkl")
+                try:
+                    with open(path, 'wb') as f:
+                        pickle.dump(value, f, protocol=pickle.HIGHEST_PROTOCOL)
+                except (OSError, pickle.PicklingError) as e:
+                    logger.error(f"Failed to spill {name} of session {self.session_id}: {str(e)}")
+                    continue
+                self._values[name] = _Spilled(path, self._sizes[name])
+                released += self._sizes[name]
+        return released
+
+
+class SessionStore:
+    def __init__(self, max_bytes=None, idle_timeout=None, spill_dir=SPILL_DIR, expire_after=EXPIRE_AFTER):
+        self.max_bytes = max_bytes if max_bytes is not None else \
+            int(float(os.environ.get("WQ_SESSION_MEMORY_MB", MAX_SESSION_BYTES / 2 ** 20)) * 2 ** 20)
+        self.idle_timeout = idle_timeout if idle_timeout is not None else \
+            float(os.environ.get("WQ_SESSION_IDLE_MINUTES", IDLE_TIMEOUT / 60)) * 60
+        self.spill_dir = spill_dir
+        self.expire_after = expire_after
+        self.spills = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+
+    def session(self, session_id):
+        """The slots of `session_id`, created on first use; marks the session as active now."""
+        with self._lock:
+            slots = self._sessions.get(session_id)
+            if slots is None:
+                slots = self._sessions[session_id] = SessionSlots(session_id, self.spill_dir)
+            slots.last_seen = time.time()
+            return slots
+
+    def memory_bytes(self):
+        with self._lock:
+            sessions = list(self._sessions.values())
+        return sum(slots.memory_bytes() for slots in sessions)
+
+    def usage(self):
+        """Per-session memory and spilled bytes and idle seconds, most recently active first."""
+        now = time.time()
+        with self._lock:
+            sessions = sorted(self._sessions.values(), key=lambda slots: slots.last_seen, reverse=True)
+        return [{"session_id": slots.session_id, "memory_bytes": slots.memory_bytes(),
+                 "spilled_bytes": slots.spilled_bytes(), "idle_seconds": now - slots.last_seen}
+                for slots in sessions]
+
+    def _spill(self, slots, reason):
+        released = slots.spill()
+        if released:
+            self.spills += 1
+            logger.info(f"Spilled {released} bytes of session {slots.session_id} to disk ({reason})")
+        return released
+
+    def enforce(self, current=None):
+        """Spill idle sessions, then the least recently active ones until the total fits `max_bytes`.
+
+        The `current` session is spilled last. Returns the bytes released.
+        """
+        now = time.time()
+        with self._lock:
+            for session_id, slots in list(self._sessions.items()):
+                if now - slots.last_seen > self.expire_after:
+                    del self._sessions[session_id]
+                    shutil.rmtree(slots.spill_dir, ignore_errors=True)
+            sessions = sorted(self._sessions.values(), key=lambda slots: (slots.session_id == current,
+                                                                         slots.last_seen))
+        released = 0
+        for slots in sessions:
+            if now - slots.last_seen > self.idle_timeout and slots.session_id != current:
+                released += self._spill(slots, "idle")
+        total = sum(slots.memory_bytes() for slots in sessions)
+        for slots in sessions:
+            if total <= self.max_bytes:
+                break
+            freed = self._spill(slots, "over budget")
+            total -= freed
+            released += freed
+        return released
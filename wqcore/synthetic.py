@@ -0,0 +1,260 @@
+"""Synthetic BFAR, PHIVOLCS and cleaned datasets at any scale, with the shipped schemas.
+
+`generate_bfar` draws monthly water-quality surveys per site: a seasonal cycle
+(temperatures peak in May, nutrients in the wet season), site offsets,
+month-to-month persistence, skipped surveys, sites that join late, and the
+per-parameter missingness of the real surveys. Winds follow the monsoons.
+`generate_phivolcs` draws one daily bulletin: a persistent unrest level
+drives seismicity, SO2, plume height and the rare eruption counts, while
+crater-lake acidity and temperature change between sparse measurements.
+`cleaned_chunks` joins the two the way cleaned_dataset.parquet does: each
+survey repeated on every day of its month, gaps filled within the site,
+min-max normalized, with some missing days. `write_dataset` writes all three
+files site chunk by site chunk, so the daily table never has to fit in memory:
+
+    write_dataset("datasets/synthetic", sites=100, years=30)
+    WQ_DATA_DIR=datasets/synthetic streamlit run Dashboard.py
+"""
+import logging
+import os
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from scipy.signal import lfilter
+
+logger = logging.getLogger(__name__)
+
+SITE_NAMES = ['TANAUAN', 'TALISAY', 'AYA', 'TUMAWAY', 'SAMPALOC', 'BERINAYAN', 'BALAKILONG', 'BUSO-BUSO', 'BAÑAGA',
+              'BILIBINWANG', 'SUBIC-ILAYA', 'SAN NICOLAS', 'MATAAS NA KAHOY', 'QUILING', 'SAN ISIDRO', 'LEVISTE',
+              'MANALAW', 'PULANG-BATO', 'NANGKAAN', 'AMBULONG', 'BOOT']
+
+# Monthly survey parameters. Values are base + site offset + a cosine peaking in `peak_month` + AR(1) noise,
+# in log space for the skewed nutrients, clipped to [low, high]; `missing` is the share of unreported values
+BFAR_PARAMETERS = {
+    'Surface Temperature': dict(base=29.4, amplitude=1.8, peak_month=5, noise=0.9, low=24.3, high=37.0, missing=0.016),
+    'Middle Temperature': dict(base=28.0, amplitude=1.5, peak_month=5, noise=0.9, low=20.0, high=33.0, missing=0.019),
+    'Bottom Temperature': dict(base=27.4, amplitude=1.2, peak_month=6, noise=0.7, low=24.9, high=33.0, missing=0.072),
+    'pH': dict(base=8.05, amplitude=0.15, peak_month=4, noise=0.25, low=5.15, high=9.25, missing=0.002),
+    'Ammonia': dict(base=0.15, amplitude=0.5, peak_month=8, noise=0.9, low=0.0, high=22.92, missing=0.078, log=True),
+    'Nitrate': dict(base=0.08, amplitude=0.4, peak_month=8, noise=0.7, low=0.0, high=1.38, missing=0.748, log=True),
+    'Phosphate': dict(base=2.3, amplitude=0.15, peak_month=9, noise=0.2, low=0.0, high=3.76, missing=0.583, log=True),
+    'Dissolved Oxygen': dict(base=5.4, amplitude=-0.8, peak_month=5, noise=1.4, low=0.46, high=12.9, missing=0.003),
+    'Sulfide': dict(base=0.15, amplitude=0.3, peak_month=8, noise=0.8, low=0.0, high=3.0, missing=0.239, log=True),
+    'Carbon Dioxide': dict(base=4.0, amplitude=0.3, peak_month=8, noise=0.5, low=0.0, high=16.0, missing=0.401,
+                           log=True),
+    'Air Temperature': dict(base=28.5, amplitude=1.6, peak_month=5, noise=1.1, low=21.0, high=35.5, missing=0.029),
+}
+# Northeast monsoon (amihan) from October to April, southwest monsoon (habagat) from June to September
+WIND_DIRECTIONS = {
+    'dry': {'NE': 0.45, 'ENE': 0.25, 'E': 0.12, 'N': 0.04, 'ESE': 0.04, 'SE': 0.03, 'Calm': 0.03, 'NNW': 0.02,
+            'NW': 0.02},
+    'wet': {'SW': 0.38, 'WSW': 0.28, 'W': 0.12, 'SE': 0.06, 'WNW': 0.06, 'S': 0.04, 'Calm': 0.04, 'E': 0.02},
+}
+WEATHER_CONDITIONS = {
+    'dry': {'Sunny': 0.45, 'Mostly Sunny': 0.12, 'Partly Cloudy': 0.15, 'Fair': 0.13, 'Cloudy': 0.1,
+            'Partly Sunny': 0.05},
+    'wet': {'Cloudy': 0.3, 'Mostly Cloudy': 0.2, 'Partly Cloudy': 0.12, 'Rainy': 0.1, 'Sunny': 0.12,
+            'Rainshowers': 0.08, 'Mostly Cloudy w/ Rainshowers': 0.08},
+}
+GROUND_DEFORMATION = [
+    'Deflation of TVI and Taal Caldera (since October 2021)',
+    'Long-term deflation of the Taal Caldera; short-term inflation of the northern flanks of the Taal Volcano Island',
+    'Slight inflation of TVI and Western Taal Caldera, while deflation of Eastern Taal Caldera',
+    'Long-term deflation of the Taal Caldera and Taal Volcano Island',
+    'Short-term inflation of the northwestern sector of Taal; long-term deflation of the Taal Caldera',
+    'Inflation on the northern flank of Taal Volcano Island',
+]
+CLEANED_COLUMNS = ['Year', 'Month', 'Site', 'Surface Temperature', 'Middle Temperature', 'pH', 'Ammonia', 'Nitrate',
+                   'Phosphate', 'Dissolved Oxygen', 'Weather Condition', 'Wind Direction', 'Air Temperature', 'Date',
+                   'Seismicity', 'Acidity', 'Temperature (in Celsius)', 'SO2', 'Plume (in meters)',
+                   'Ground Deformation']
+PHIVOLCS_NUMERIC = ['Seismicity', 'Acidity', 'Temperature (in Celsius)', 'SO2', 'Plume (in meters)']
+
+
+def site_names(count):
+    return SITE_NAMES[:count] + [f"SITE {i + 1:03d}" for i in range(len(SITE_NAMES), count)]
+
+
+def _ar1(rng, shape, phi):
+    """Unit-variance AR(1) noise along the last axis."""
+    shocks = rng.standard_normal(shape) * np.sqrt(1 - phi ** 2)
+    return lfilter([1.0], [1.0, -phi], shocks, axis=-1)
+
+
+def _categorical(rng, months, choices):
+    """One draw per month from choices['wet'] in June to September, else from choices['dry']."""
+    wet = np.isin(months, [6, 7, 8, 9])
+    result = np.empty(months.shape, dtype=object)
+    for season, mask in (('wet', wet), ('dry', ~wet)):
+        labels, weights = zip(*choices[season].items())
+        weights = np.array(weights) / sum(weights)
+        result[mask] = rng.choice(labels, size=int(mask.sum()), p=weights)
+    return result
+
+
+def generate_bfar(sites=12, years=11, start="2013-01-01", seed=0, skip_rate=0.08, late_start_rate=0.4):
+    """Monthly surveys of `sites` sites over `years` years, in the schema of BFAR.parquet.
+
+    `skip_rate` of site-months have no survey; `late_start_rate` of the sites join at a random month
+    in the first half of the period.
+    """
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=years * 12, freq='MS')
+    names = site_names(sites)
+    months = np.broadcast_to(dates.month.to_numpy(), (sites, len(dates)))
+
+    surveyed = rng.random((sites, len(dates))) >= skip_rate
+    first = np.where(rng.random(sites) < late_start_rate, rng.integers(0, max(len(dates) // 2, 1), sites), 0)
+    surveyed &= np.arange(len(dates)) >= first[:, None]
+
+    values = {}
+    for name, spec in BFAR_PARAMETERS.items():
+        season = spec['amplitude'] * np.cos(2 * np.pi * (months - spec['peak_month']) / 12)
+        offsets = rng.normal(0, spec['noise'] * 0.4, (sites, 1))
+        noise = spec['noise'] * _ar1(rng, (sites, len(dates)), 0.5)
+        if spec.get('log'):
+            series = np.exp(np.log(spec['base']) + season + offsets + noise)
+        else:
+            series = spec['base'] + season + offsets + noise
+        series = np.round(np.clip(series, spec['low'], spec['high']), 2)
+        series[rng.random(series.shape) < spec['missing']] = np.nan
+        values[name] = series
+
+    site_index, month_index = np.nonzero(surveyed)
+    bfar = pd.DataFrame({
+        'Year': dates.year.to_numpy()[month_index].astype(np.int64),
+        'Month': dates.month.to_numpy()[month_index].astype(np.float64),
+        'Site': np.array(names, dtype=object)[site_index],
+    })
+    for name in list(BFAR_PARAMETERS)[:-1]:
+        bfar[name] = values[name][site_index, month_index]
+    bfar['Weather Condition'] = _categorical(rng, months, WEATHER_CONDITIONS)[site_index, month_index]
+    bfar['Wind Direction'] = _categorical(rng, months, WIND_DIRECTIONS)[site_index, month_index]
+    bfar['Air Temperature'] = values['Air Temperature'][site_index, month_index]
+    bfar['Date'] = dates[month_index]
+    return bfar
+
+
+def generate_phivolcs(start="2013-01-01", end=None, days=None, seed=0):
+    """Daily volcano bulletins from `start` to `end` (or for `days` days), in the schema of PHIVOLCS.parquet."""
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, end=end, periods=None if end is not None else days, freq='D')
+    n = len(dates)
+
+    # Unrest is a slow log-scale process with occasional spikes; the observables respond to it
+    spikes = lfilter([1.0], [1.0, -0.7], np.where(rng.random(n) < 0.01, rng.exponential(1.5, n), 0.0))
+    unrest = np.clip(0.9 * _ar1(rng, n, 0.97) + spikes, -2.5, 3.5)
+    seismicity = rng.poisson(np.exp(1.2 + unrest)).astype(np.float64)
+    eruption = np.where(unrest > np.quantile(unrest, 0.96), rng.integers(1, 7, n), np.nan).astype(np.float64)
+    so2 = np.round(np.exp(7.6 + 0.45 * unrest + rng.normal(0, 0.4, n))).astype(np.int64)
+    plume = np.round(np.clip(300 * np.exp(1.0 + 0.35 * unrest + rng.normal(0, 0.3, n)), 0, 3000) / 300) * 300
+
+    # Crater-lake acidity and temperature are measured every few weeks and carried forward in between
+    measured = rng.random(n) < 1 / 14
+    measured[0] = True
+    acidity = pd.Series(np.where(measured, np.clip(0.5 + 0.3 * _ar1(rng, n, 0.999), 0.2, 1.59), np.nan)).ffill()
+    temperature = pd.Series(np.where(measured, np.clip(71 + 2.5 * _ar1(rng, n, 0.999), 63.7, 74.9), np.nan)).ffill()
+    regimes = np.cumsum(rng.random(n) < 1 / 60)
+    regime_labels = rng.integers(0, len(GROUND_DEFORMATION), regimes.max() + 1)
+    deformation = np.array(GROUND_DEFORMATION, dtype=object)[regime_labels[regimes]]
+
+    def strings(values, missing):
+        result = values.astype(np.int64).astype(str).astype(object)
+        result[rng.random(n) < missing] = None
+        return result
+
+    phivolcs = pd.DataFrame({
+        'Date': dates,
+        'Eruption': eruption,
+        'Seismicity': seismicity,
+        'Acidity': np.round(acidity.to_numpy(), 2),
+        'Temperature (in Celsius)': np.round(temperature.to_numpy(), 1),
+        'SO2': strings(so2, 0.004),
+        'Plume (in meters)': strings(plume, 0.017),
+        'Ground Deformation': deformation,
+    })
+    phivolcs.loc[rng.random(n) < 0.17, 'Acidity'] = np.nan
+    phivolcs.loc[rng.random(n) < 0.002, ['Seismicity', 'Temperature (in Celsius)']] = np.nan
+    return phivolcs
+
+
+def _min_max(values):
+    low, high = np.nanmin(values, axis=0), np.nanmax(values, axis=0)
+    span = np.where(high > low, high - low, 1.0)
+    return (values - low) / span
+
+
+def cleaned_chunks(bfar, phivolcs, sites_per_chunk=10, gap_rate=0.02, seed=0):
+    """Yield the daily cleaned dataset for `sites_per_chunk` sites at a time, in the schema of cleaned_dataset.parquet.
+
+    Survey values are filled within each site and min-max normalized over the whole of `bfar` first, so every
+    chunk shares one scale. Each site's days run from its first to its last survey month, less `gap_rate`
+    of days lost in week-long blocks.
+    """
+    rng = np.random.default_rng(seed)
+    params = [name for name in CLEANED_COLUMNS if name in BFAR_PARAMETERS]
+    bfar = bfar.sort_values(['Site', 'Date'], kind='stable').reset_index(drop=True)
+    filled = bfar.groupby('Site', sort=False)[params].transform(lambda column: column.ffill().bfill())
+    filled = filled.fillna(filled.mean())
+    monthly = bfar[['Site', 'Date', 'Weather Condition', 'Wind Direction']].copy()
+    monthly[params] = _min_max(filled.to_numpy(dtype=np.float64))
+    monthly['Weather Condition'] = monthly['Weather Condition'].fillna('Sunny')
+    monthly['Wind Direction'] = monthly['Wind Direction'].fillna('NE')
+
+    daily = phivolcs[['Date', 'Ground Deformation']].copy()
+    numeric = phivolcs[PHIVOLCS_NUMERIC].apply(pd.to_numeric, errors='coerce').ffill().bfill()
+    daily[PHIVOLCS_NUMERIC] = _min_max(numeric.to_numpy(dtype=np.float64))
+    daily['Ground Deformation'] = daily['Ground Deformation'].ffill().bfill()
+    years = daily['Date'].dt.year
+    year_span = max(years.max() - years.min(), 1)
+
+    sites = monthly['Site'].unique()
+    for start in range(0, len(sites), sites_per_chunk):
+        frames = []
+        for site in sites[start:start + sites_per_chunk]:
+            surveys = monthly[monthly['Site'] == site]
+            days = pd.date_range(surveys['Date'].min(), surveys['Date'].max() + pd.offsets.MonthEnd(0), freq='D')
+            keep = ~np.repeat(rng.random(len(days) // 7 + 1) < gap_rate, 7)[:len(days)]
+            days = days[keep]
+            month_start = days.to_period('M').to_timestamp()
+            # Months without a survey take the previous survey's values
+            site_frame = (pd.DataFrame({'Date': days, 'month_start': month_start})
+                          .merge(surveys.rename(columns={'Date': 'month_start'}), on='month_start', how='left')
+                          .ffill())
+            frames.append(site_frame)
+        chunk = pd.concat(frames, ignore_index=True).merge(daily, on='Date', how='inner')
+        chunk['Year'] = ((chunk['Date'].dt.year - years.min()) / year_span).astype(np.float64)
+        chunk['Month'] = chunk['Date'].dt.month_name()
+        yield chunk[CLEANED_COLUMNS]
+
+
+def _write_chunks(path, chunks):
+    writer, rows = None, 0
+    try:
+        for chunk in chunks:
+            table = pa.Table.from_pandas(chunk, schema=writer.schema if writer else None, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(path, table.schema)
+            writer.write_table(table)
+            rows += len(chunk)
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def write_dataset(directory, sites=100, years=30, start="1995-01-01", seed=0, sites_per_chunk=10):
+    """Write BFAR.parquet, PHIVOLCS.parquet and cleaned_dataset.parquet to `directory`; returns rows per file."""
+    os.makedirs(directory, exist_ok=True)
+    bfar = generate_bfar(sites, years, start, seed)
+    end = pd.Timestamp(start) + pd.DateOffset(years=years) - pd.Timedelta(days=1)
+    phivolcs = generate_phivolcs(start, end, seed=seed + 1)
+    bfar.to_parquet(os.path.join(directory, 'BFAR.parquet'), engine='pyarrow', index=False)
+    phivolcs.to_parquet(os.path.join(directory, 'PHIVOLCS.parquet'), engine='pyarrow', index=False)
+    cleaned_rows = _write_chunks(os.path.join(directory, 'cleaned_dataset.parquet'),
+                                 cleaned_chunks(bfar, phivolcs, sites_per_chunk, seed=seed + 2))
+    rows = {'BFAR.parquet': len(bfar), 'PHIVOLCS.parquet': len(phivolcs), 'cleaned_dataset.parquet': cleaned_rows}
+    logger.info(f"Wrote synthetic dataset of {sites} sites over {years} years to {directory}: {rows}")
+    return rows
@@ -0,0 +1,78 @@
+"""TensorFlow execution settings for dashboard and worker processes.
+
+Settings are read from a JSON file (`tf_config.json` in the working directory,
+or the path in `WQ_TF_CONFIG`) and each can be overridden by an environment
+variable:
+
+    {"intra_op_threads": 4, "inter_op_threads": 1, "jit_compile": false}
+
+    WQ_TF_INTRA_OP_THREADS=4 WQ_TF_INTER_OP_THREADS=1 WQ_TF_JIT_COMPILE=1 streamlit run Dashboard.py
+
+Thread counts of 0 keep TensorFlow's default of one thread per core. Thread
+pools can only be sized before TensorFlow executes its first op, so call
+`configure_tensorflow` once per process, before training. Keras is always set
+to float32; model inputs are cast to float32 by the data preparation code.
+"""
+import json
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+CONFIG_FILE = "tf_config.json"
+
+DEFAULT_SETTINGS = {"intra_op_threads": 0, "inter_op_threads": 0, "jit_compile": False}
+ENV_VARS = {
+    "intra_op_threads": "WQ_TF_INTRA_OP_THREADS",
+    "inter_op_threads": "WQ_TF_INTER_OP_THREADS",
+    "jit_compile": "WQ_TF_JIT_COMPILE",
+}
+
+_active_settings = None
+
+
+def _parse(name, value):
+    if name == "jit_compile":
+        return str(value).strip().lower() in ("1", "true", "yes", "on")
+    return max(int(value), 0)
+
+
+def load_settings(path=None):
+    """Defaults, overridden by the config file, overridden by environment variables."""
+    settings = dict(DEFAULT_SETTINGS)
+    path = path or os.environ.get("WQ_TF_CONFIG", CONFIG_FILE)
+    if os.path.exists(path):
+        try:
+            with open(path) as f:
+                settings.update({k: _parse(k, v) for k, v in json.load(f).items() if k in DEFAULT_SETTINGS})
+        except Exception as e:
+            logger.error(f"Failed to read {path}, using defaults: {str(e)}")
+    for name, var in ENV_VARS.items():
+        if os.environ.get(var):
+            try:
+                settings[name] = _parse(name, os.environ[var])
+            except ValueError:
+                logger.error(f"Ignoring invalid {var}={os.environ[var]!r}")
+    return settings
+
+
+def configure_tensorflow(settings=None):
+    """Apply `settings` (default: `load_settings()`) to this process and return them."""
+    global _active_settings
+    import tensorflow as tf
+
+    settings = {**DEFAULT_SETTINGS, **(settings if settings is not None else load_settings())}
+    try:
+        tf.config.threading.set_intra_op_parallelism_threads(settings["intra_op_threads"])
+        tf.config.threading.set_inter_op_parallelism_threads(settings["inter_op_threads"])
+    except RuntimeError as e:
+        logger.warning(f"TensorFlow is already initialized, thread settings not applied: {str(e)}")
+    tf.keras.backend.set_floatx('float32')
+    _active_settings = settings
+    logger.info(f"TensorFlow settings: {settings}")
+    return settings
+
+
+def active_settings():
+    """Settings applied by `configure_tensorflow`, or the configured ones if it has not run yet."""
+    return _active_settings if _active_settings is not None else load_settings()
@@ -0,0 +1,56 @@
+"""Training helpers: warm-start fine-tuning from the model registry."""
+import logging
+
+import numpy as np
+import pandas as pd
+
+from wqcore.pipeline import training_datasets
+
+logger = logging.getLogger(__name__)
+
+FINE_TUNE_EPOCHS = 5
+# Fall back to a full retrain when the fine-tuned validation loss exceeds the registered one by this factor
+DRIFT_TOLERANCE = 1.5
+
+
+def windows_since(cutoff, target_dates, *arrays):
+    """Select the windows whose target date falls after `cutoff`."""
+    if cutoff is None:
+        return arrays
+    mask = np.asarray(target_dates) > np.datetime64(pd.Timestamp(cutoff))
+    return tuple(array[mask] for array in arrays)
+
+
+def warm_start_model(registry, model_key, site, params, X_train, y_train, X_val, y_val, target_dates,
+                     callbacks=None, epochs=FINE_TUNE_EPOCHS, drift_tolerance=DRIFT_TOLERANCE, load=None):
+    """Fine-tune the last registered model on the training windows added since its training cutoff.
+
+    `target_dates` holds the date of each window's target, train windows first. The validation
+    windows are never trained on, so they stay an unbiased drift check. `load(entry)` loads the
+    registered model, `registry.load` by default. Returns (model, outcome) where outcome is "reused"
+    (no new windows), "fine_tuned", "no_model" or "drift"; the model is None for the last two and the
+    caller should train from scratch. A fine-tuned or drifted model was changed in place.
+    """
+    entry = registry.latest(model_key, site, params)
+    if entry is None:
+        return None, "no_model"
+    try:
+        model = (load or registry.load)(entry)
+    except Exception as e:
+        logger.error(f"Failed to load {entry['path']}: {str(e)}")
+        return None, "no_model"
+
+    X_new, y_new = windows_since(entry['trained_through'], target_dates[:len(X_train)], X_train, y_train)
+    if len(X_new) == 0:
+        logger.info(f"No new training windows since {entry['trained_through']}, reusing {entry['path']}")
+        return model, "reused"
+
+    new_ds, val_ds = training_datasets((site, tuple(params), X_train.shape[1], entry['trained_through']),
+                                       X_new, y_new, X_val, y_val)
+    model.fit(new_ds, epochs=epochs, validation_data=val_ds, callbacks=callbacks or [], verbose=0)
+    val_loss = model.evaluate(val_ds, verbose=0)
+    if val_loss > entry['val_loss'] * drift_tolerance:
+        logger.warning(f"Validation loss drifted from {entry['val_loss']:.5f} to {val_loss:.5f}, retraining {model_key}")
+        return None, "drift"
+    logger.info(f"Fine-tuned {entry['path']} on {len(X_new)} new training windows, val_loss {val_loss:.5f}")
+    return model, "fine_tuned"
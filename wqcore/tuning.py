@@ -0,0 +1,113 @@
+"""Hyperparameter search with successive halving.
+
+A random sample of configurations from `SEARCH_SPACE` is trained for a few
+epochs; the best third (`eta`) continues from its weights for three times as
+many epochs, and so on until one configuration or the epoch budget is left.
+Each rung trains its candidates in parallel on a process pool, so the cost
+grows with the number of promising candidates rather than the grid size.
+"""
+import itertools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from wqcore.models import DEFAULT_HYPERPARAMETERS
+
+logger = logging.getLogger(__name__)
+
+COMMON_SPACE = {'window_size': [7, 14, 30], 'batch_size': [16, 32]}
+SEARCH_SPACE = {
+    'cnn': {**COMMON_SPACE, 'filters': [64, 128], 'dense_units': [50, 100], 'dropout': [0.2, 0.3, 0.4],
+            'learning_rate': [0.0005, 0.001, 0.002]},
+    'lstm': {**COMMON_SPACE, 'units': [50, 100], 'dropout': [0.2, 0.3, 0.4],
+             'learning_rate': [0.0005, 0.001, 0.002]},
+    'hybrid': {**COMMON_SPACE, 'filters': [64, 128], 'units': [50, 100], 'dropout': [0.2, 0.3, 0.4],
+               'learning_rate': [0.0005, 0.001, 0.002]},
+}
+
+
+def sample_configs(model_key, n_candidates, seed=0):
+    """Distinct configurations drawn from the grid; the default configuration is always included."""
+    space = SEARCH_SPACE[model_key]
+    grid = [dict(zip(space, values)) for values in itertools.product(*space.values())]
+    default = DEFAULT_HYPERPARAMETERS[model_key]
+    others = [config for config in grid if config != default]
+    picks = np.random.default_rng(seed).permutation(len(others))[:max(n_candidates - 1, 0)]
+    return [dict(default)] + [others[i] for i in picks]
+
+
+def window_arrays(values, window_size, n_val):
+    """Windows over a (T, P) array, split so the last `n_val` targets are validation for every window size."""
+    windows = np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0).transpose(0, 2, 1)
+    X, y = windows[:-1], values[window_size:]
+    return X[:-n_val], y[:-n_val], X[-n_val:], y[-n_val:]
+
+
+def _init_worker(threads):
+    from wqcore.tfconfig import configure_tensorflow, load_settings
+    configure_tensorflow({**load_settings(), "intra_op_threads": threads, "inter_op_threads": threads})
+
+
+def _train_candidate(task):
+    """Train one candidate for `epochs` more epochs, starting from `weights` when given."""
+    from tensorflow.keras.utils import set_random_seed
+
+    from wqcore.models import build_model
+    from wqcore.pipeline import training_datasets
+
+    model_key, config, weights, values, n_val, epochs, seed = task
+    set_random_seed(seed)
+    X_train, y_train, X_val, y_val = window_arrays(values, config['window_size'], n_val)
+    model = build_model(model_key, (X_train.shape[1], X_train.shape[2]), config)
+    if model is None:
+        return float('inf'), None
+    if weights is not None:
+        model.set_weights(weights)
+    train_ds, val_ds = training_datasets(('tuning', config['window_size']), X_train, y_train, X_val, y_val,
+                                         batch_size=config['batch_size'], seed=seed)
+    history = model.fit(train_ds, epochs=epochs, validation_data=val_ds, verbose=0)
+    val_loss = float(history.history['val_loss'][-1])
+    return (val_loss if np.isfinite(val_loss) else float('inf')), model.get_weights()
+
+
+def successive_halving(model_key, values, n_candidates=9, min_epochs=3, max_epochs=27, eta=3, val_split=0.2,
+                       max_workers=None, seed=0):
+    """Search hyperparameters of `model_key` on a NaN-free (T, P) array.
+
+    Returns (best, trials): `best` is {"config", "val_loss", "weights", "epochs", "n_val"} for the
+    winner, `n_val` being the number of trailing rows held out as validation targets, and `trials` lists every evaluated (config, epochs, val_loss), best rungs last.
+    """
+    values = np.asarray(values, dtype=np.float32)
+    n_val = int((len(values) - max(COMMON_SPACE['window_size'])) * val_split)
+    if n_val < 1:
+        raise ValueError(f"Not enough rows to tune: {len(values)}")
+    candidates = [{"config": config, "weights": None, "epochs": 0, "val_loss": None}
+                  for config in sample_configs(model_key, n_candidates, seed)]
+    max_workers = max_workers or min(len(candidates), os.cpu_count() or 1)
+    threads = max(1, (os.cpu_count() or 1) // max_workers)
+
+    trials = []
+    budget = min_epochs
+    # Spawned workers start without the parent's TensorFlow state
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=multiprocessing.get_context('spawn'),
+                             initializer=_init_worker, initargs=(threads,)) as pool:
+        while True:
+            tasks = [(model_key, c["config"], c["weights"], values, n_val, budget - c["epochs"], seed)
+                     for c in candidates]
+            for candidate, (val_loss, weights) in zip(candidates, pool.map(_train_candidate, tasks)):
+                candidate.update(val_loss=val_loss, weights=weights, epochs=budget)
+                trials.append({"config": candidate["config"], "epochs": budget, "val_loss": val_loss})
+            candidates.sort(key=lambda c: c["val_loss"])
+            logger.info(f"Successive halving rung at {budget} epochs: {len(candidates)} candidates, "
+                        f"best val_loss {candidates[0]['val_loss']:.5f}")
+            if len(candidates) == 1 or budget >= max_epochs:
+                break
+            candidates = candidates[:max(1, len(candidates) // eta)]
+            budget = min(budget * eta, max_epochs)
+
+    best = candidates[0]
+    return {"config": best["config"], "val_loss": best["val_loss"], "weights": best["weights"],
+            "epochs": best["epochs"], "n_val": n_val}, trials
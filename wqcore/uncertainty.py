@@ -0,0 +1,34 @@
+"""Monte-Carlo dropout prediction intervals.
+
+The forecast start window is repeated once per sample and the whole stack is
+run through the NumPy runtime with dropout active, so each recursive step is a
+single batched forward pass regardless of the number of samples. Every sample
+path feeds its own predictions back, so the bands widen with the horizon.
+"""
+import numpy as np
+
+MC_SAMPLES = 100
+# Lower and upper bounds of the shaded 90% band
+QUANTILES = (0.05, 0.95)
+
+
+def mc_dropout_forecast(model, window, horizon, n_samples=MC_SAMPLES, seed=None):
+    """(n_samples, horizon, P) recursive forecasts from one (window_size, P) window.
+
+    `model` must provide `predict_stochastic(X, rng)`, as `wqcore.runtime.NumpyModel` does.
+    """
+    if not hasattr(model, 'predict_stochastic'):
+        raise TypeError(f"{type(model).__name__} does not support Monte-Carlo dropout")
+    rng = np.random.default_rng(seed)
+    windows = np.repeat(np.asarray(window, dtype=np.float32)[None], n_samples, axis=0)
+    samples = np.empty((n_samples, horizon, windows.shape[2]), dtype=np.float32)
+    for step in range(horizon):
+        pred = model.predict_stochastic(windows, rng)
+        samples[:, step] = pred
+        windows = np.concatenate([windows[:, 1:], pred[:, None, :]], axis=1)
+    return samples
+
+
+def quantile_bands(samples, quantiles=QUANTILES):
+    """Per-step quantiles over the sample axis, shape (len(quantiles),) + samples.shape[1:]."""
+    return np.nanquantile(samples, quantiles, axis=0)
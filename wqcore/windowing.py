@@ -0,0 +1,181 @@
+"""Sliding-window arrays for training and forecasting the windowed models.
+
+Every window holds `window_size` consecutive rows and its target is the row
+after it; the last `val_split` of the windows is held out for validation. The
+`prepare_*` functions log and return None (or an empty array) when a series is
+too short or cannot be windowed, so callers check the result instead of
+catching exceptions.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_univariate_data(data, param, window_size=7, val_split=0.2):
+    """(X_train, y_train, X_val, y_val) of one parameter, with NaN rows dropped."""
+    try:
+        values = data[param].dropna().values.reshape(-1, 1)
+        if len(values) < window_size + 1:
+            logger.warning(f"Insufficient data for {param}: {len(values)} rows")
+            return None, None, None, None
+        logger.debug("Pre-normalized %s: %s", param, values[:5].flatten())
+        X, y = [], []
+        for i in range(len(values) - window_size):
+            X.append(values[i:i + window_size])
+            y.append(values[i + window_size])
+        X, y = np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+        if len(X) < 2:
+            logger.warning(f"Not enough data points for {param}: {len(X)} samples")
+            return None, None, None, None
+        split_idx = int(len(X) * (1 - val_split))
+        X_train, X_val = X[:split_idx], X[split_idx:]
+        y_train, y_val = y[:split_idx], y[split_idx:]
+        logger.info(f"Univariate {param}: {len(X_train)} train, {len(X_val)} val samples")
+        return X_train, y_train, X_val, y_val
+    except Exception as e:
+        logger.error(f"Error preparing univariate data for {param}: {str(e)}")
+        return None, None, None, None
+
+
+def prepare_multivariate_data(data, params, window_size=7, val_split=0.2):
+    """(X_train, y_train, X_val, y_val) of all `params` together, with rows missing any of them dropped."""
+    try:
+        values = data[params].dropna().values
+        if len(values) < window_size + 1:
+            logger.warning(f"Insufficient multivariate data: {len(values)} rows")
+            return None, None, None, None
+        logger.debug("Pre-normalized multivariate: %s", values[:5])
+        X, y = [], []
+        for i in range(len(values) - window_size):
+            X.append(values[i:i + window_size])
+            y.append(values[i + window_size])
+        X, y = np.array(X, dtype=np.float32), np.array(y, dtype=np.float32)
+        if len(X) < 2:
+            logger.warning(f"Not enough multivariate data points: {len(X)} samples")
+            return None, None, None, None
+        split_idx = int(len(X) * (1 - val_split))
+        X_train, X_val = X[:split_idx], X[split_idx:]
+        y_train, y_val = y[:split_idx], y[split_idx:]
+        logger.info(f"Multivariate: {len(X_train)} train, {len(X_val)} val samples")
+        return X_train, y_train, X_val, y_val
+    except Exception as e:
+        logger.error(f"Error preparing multivariate data: {str(e)}")
+        return None, None, None, None
+
+
+def prepare_prediction_data(data, param, window_size=7):
+    """Every window of one parameter; the last one starts a forecast."""
+    try:
+        values = data[param].dropna().values.reshape(-1, 1)
+        if len(values) < window_size + 1:
+            logger.warning(f"Insufficient data for {param}: {len(values)} rows")
+            return np.array([])
+        logger.debug("Pre-normalized prediction data for %s: %s", param, values[:5].flatten())
+        X = []
+        for i in range(len(values) - window_size):
+            X.append(values[i:i + window_size])
+        return np.array(X, dtype=np.float32)
+    except Exception as e:
+        logger.error(f"Error preparing prediction data for {param}: {str(e)}")
+        return np.array([])
+
+
+def prepare_multivariate_prediction_data(data, params, window_size=7):
+    """Every window of all `params` together; the last one starts a forecast."""
+    try:
+        values = data[params].dropna().values
+        if len(values) < window_size + 1:
+            logger.warning(f"Insufficient multivariate data: {len(values)} rows")
+            return np.array([])
+        logger.debug("Pre-normalized multivariate prediction data: %s", values[:5])
+        X = []
+        for i in range(len(values) - window_size):
+            X.append(values[i:i + window_size])
+        return np.array(X, dtype=np.float32)
+    except Exception as e:
+        logger.error(f"Error preparing multivariate prediction data: {str(e)}")
+        return np.array([])
+
+
+def prepare_site_batch_data(data, params, window_size=7, val_split=0.2):
+    """Batch forecasting: every site is one row of the batch, windows never cross sites.
+
+    Returns (X_train, y_train, X_val, y_val, last_windows, sites, target_dates), with one last window
+    per site, where `target_dates` holds the dates of all training targets followed by those of all
+    validation targets.
+    """
+    try:
+        X_train, y_train, X_val, y_val, last_windows, batch_sites = [], [], [], [], [], []
+        train_dates, val_dates = [], []
+        for site, site_df in data.groupby('Site', sort=True):
+            site_df = site_df.sort_values('Date').dropna(subset=params)
+            values = site_df[params].values.astype(np.float32)
+            if len(values) < window_size + 2:
+                logger.warning(f"Insufficient multivariate data for {site}: {len(values)} rows")
+                continue
+            windows = np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0)
+            windows = windows.transpose(0, 2, 1)
+            X, y = windows[:-1], values[window_size:]
+            dates = site_df['Date'].values[window_size:]
+            split_idx = int(len(X) * (1 - val_split))
+            X_train.append(X[:split_idx])
+            y_train.append(y[:split_idx])
+            X_val.append(X[split_idx:])
+            y_val.append(y[split_idx:])
+            train_dates.append(dates[:split_idx])
+            val_dates.append(dates[split_idx:])
+            last_windows.append(windows[-1])
+            batch_sites.append(str(site))
+        if not batch_sites:
+            return None, None, None, None, None, None, None
+        logger.info(f"Batch: {len(batch_sites)} sites, {sum(map(len, X_train))} train, "
+                    f"{sum(map(len, X_val))} val samples")
+        return (np.concatenate(X_train), np.concatenate(y_train), np.concatenate(X_val),
+                np.concatenate(y_val), np.stack(last_windows), batch_sites,
+                np.concatenate(train_dates + val_dates))
+    except Exception as e:
+        logger.error(f"Error preparing batch data: {str(e)}")
+        return None, None, None, None, None, None, None
+
+
+def prepare_parameter_batch_data(data, params, window_size=7, val_split=0.2):
+    """Grouped univariate training: every parameter's series is a row of the batch.
+
+    One shared-weight model learns all of them and one recursive pass forecasts them together.
+    Returns (X_train, y_train, X_val, y_val, last_windows, params, target_dates), where
+    `target_dates` holds the dates of all training targets followed by those of all validation targets.
+    """
+    try:
+        X_train, y_train, X_val, y_val, last_windows, group_params = [], [], [], [], [], []
+        train_dates, val_dates = [], []
+        for param in params:
+            series = data.dropna(subset=[param])
+            values = series[param].values.astype(np.float32).reshape(-1, 1)
+            if len(values) < window_size + 2:
+                logger.warning(f"Insufficient data for {param}: {len(values)} rows")
+                continue
+            windows = np.lib.stride_tricks.sliding_window_view(values, window_size, axis=0)
+            windows = windows.transpose(0, 2, 1)
+            X, y = windows[:-1], values[window_size:]
+            dates = series['Date'].values[window_size:]
+            split_idx = int(len(X) * (1 - val_split))
+            X_train.append(X[:split_idx])
+            y_train.append(y[:split_idx])
+            X_val.append(X[split_idx:])
+            y_val.append(y[split_idx:])
+            train_dates.append(dates[:split_idx])
+            val_dates.append(dates[split_idx:])
+            last_windows.append(windows[-1])
+            group_params.append(param)
+        if not group_params:
+            return None, None, None, None, None, None, None
+        logger.info(f"Grouped: {len(group_params)} parameters, {sum(map(len, X_train))} train, "
+                    f"{sum(map(len, X_val))} val samples")
+        return (np.concatenate(X_train), np.concatenate(y_train), np.concatenate(X_val),
+                np.concatenate(y_val), np.stack(last_windows), group_params,
+                np.concatenate(train_dates + val_dates))
+    except Exception as e:
+        logger.error(f"Error preparing grouped data: {str(e)}")
+        return None, None, None, None, None, None, None
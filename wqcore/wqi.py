@@ -0,0 +1,85 @@
+"""Water Quality Index of observed and forecast parameter series.
+
+The WQI is the mean of the parameters after normalization to [0, 1], scaled to
+0-100, and every value gets a remark from "Poor" to "Excellent":
+
+- `observed_wqi` min-max normalizes each raw series over its own range and
+  grades in bands of 20.
+- `forecast_wqi` takes values already normalized like cleaned_dataset.parquet,
+  clips the WQI to 50 and grades in bands of 10, as the Prediction tab does.
+- `wqi_samples` computes the forecast WQI of many sample paths at once, so
+  its quantiles bracket the `forecast_wqi` of the point forecast.
+
+Missing values count as 0 in `observed_wqi` and are skipped in `forecast_wqi`.
+"""
+import logging
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+REMARKS = ("Poor", "Fair", "Good", "Very Good", "Excellent")
+# Upper bounds of every remark but the last
+OBSERVED_BANDS = (20, 40, 60, 80)
+FORECAST_BANDS = (10, 20, 30, 40)
+_REMARK_LABELS = np.array(REMARKS + ("N/A",), dtype=object)
+
+
+def wqi_remarks(wqi, bands):
+    """The remark of every WQI value, "N/A" for NaN."""
+    wqi = np.asarray(wqi, dtype=float)
+    # The first band whose upper bound is at least the value; NaN sorts past the last band
+    index = np.searchsorted(bands, wqi, side='left')
+    index[np.isnan(wqi)] = len(REMARKS)
+    return _REMARK_LABELS[index].tolist()
+
+
+def observed_wqi(values_dict, params):
+    """(wqi, remarks) of raw series, each min-max normalized over its own range."""
+    normalized = []
+    for param in params:
+        values = values_dict[param]
+        # Remove NaN values for normalization
+        valid_values = values[~np.isnan(values)]
+        if len(valid_values) == 0:
+            normalized.append(np.full_like(values, np.nan))
+            continue
+        # Min-max normalization to [0, 1]
+        min_val = valid_values.min()
+        max_val = valid_values.max()
+        if max_val == min_val:
+            normalized_values = np.zeros_like(values)
+        else:
+            normalized_values = (values - min_val) / (max_val - min_val)
+        # Replace NaN values with 0 for WQI calculation
+        normalized_values = np.nan_to_num(normalized_values, nan=0.0)
+        normalized.append(normalized_values)
+    normalized = np.array(normalized)
+    # Calculate WQI as mean of normalized values, scaled to 0-100
+    wqi = np.mean(normalized, axis=0, where=~np.isnan(normalized)) * 100
+    wqi = np.clip(wqi, 0, 100)  # Ensure [0, 100]
+    return wqi, wqi_remarks(wqi, OBSERVED_BANDS)
+
+
+def _forecast_index(values):
+    """WQI of pre-normalized values stacked on the first axis, over any trailing shape."""
+    normalized = np.clip(values, 0, 1)  # Ensure [0, 1]
+    wqi = np.mean(normalized, axis=0, where=~np.isnan(normalized)) * 100
+    return np.clip(wqi, 0, 50)
+
+
+def forecast_wqi(values_dict, params):
+    """(wqi, remarks) of pre-normalized series such as model forecasts."""
+    for param in params:
+        logger.debug("Using pre-normalized %s for WQI: %s", param, values_dict[param][:5])
+    wqi = _forecast_index(np.array([values_dict[param] for param in params]))
+    remarks = wqi_remarks(wqi, FORECAST_BANDS)
+    logger.debug("WQI: %s, Remarks: %s", wqi[:5], remarks[:5])
+    return wqi, remarks
+
+
+def wqi_samples(values_dict, params):
+    """WQI of many sample paths at once, (samples, horizon) per parameter, as `forecast_wqi` computes it per path."""
+    values = np.stack([np.asarray(values_dict[param], dtype=float) for param in params])
+    with np.errstate(invalid='ignore'):
+        return _forecast_index(values)